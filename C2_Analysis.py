@@ -0,0 +1,156 @@
+# Analyse complète d'un tableau de contraintes, sans aucun affichage.
+# Le résultat (Analysis) regroupe toutes les données calculées ; l'affichage console
+# est une couche séparée et facultative (C2_Interface.print_analysis).
+
+import os
+
+import C2_Main as Main
+import C2_Parallel as Parallel
+import C2_Profiling as Profiling
+import C2_ResultCache as ResultCache
+from C2_Parser import TABLE_CACHE_DIR, load_constraints_table
+
+
+class Analysis:
+    """
+    Résultat structuré de l'analyse d'un tableau de contraintes.
+    Les données par nœud sont des tableaux NumPy indexés par identifiant de nœud.
+    """
+
+    def __init__(self, name):
+        self.name = name  # Nom du tableau de contraintes
+        self.graph = None  # Graphe d'ordonnancement (None si le tableau est invalide)
+
+        # Diagnostics
+        self.errors = []  # Lignes invalides du tableau : (numéro de ligne, texte), ou (None, message)
+        self.warnings = []  # Avertissements (durées nulles, tâches en double, ...)
+        self.negative_durations = []  # Tâches de durée négative : (identifiant, durée)
+        self.source_successors = []  # Successeurs du nœud initial (0)
+
+        # Détection de circuit (tri topologique de Kahn)
+        self.order = None  # Nœuds éliminés, niveau par niveau
+        self.level_offsets = None  # Bornes des niveaux dans order
+        self.cycle = None  # Circuit trouvé, ou None
+
+        # Ordonnancement (uniquement pour un graphe d'ordonnancement)
+        self.ranks = None  # Rang de chaque nœud
+        self.ids = None  # Identifiants triés par rang
+        self.early_schedule = None  # Calendrier au plus tôt
+        self.late_schedule = None  # Calendrier au plus tard
+        self.total_margin = None  # Marges totales
+        self.free_margin = None  # Marges libres
+        self.critical_paths = None  # Chemins critiques (CriticalPaths, énumérés à la demande)
+        self.near_critical_paths = None  # Plus longs chemins : (chemin, longueur, marge)
+        self.project_duration = None  # Durée minimale du projet
+
+    def is_valid(self):
+        # Le tableau a pu être lu et transformé en graphe
+        return self.graph is not None
+
+    def is_scheduling_graph(self):
+        # Propriétés d'un graphe d'ordonnancement : acyclique, sans durée négative, avec une source
+        return self.is_valid() and self.cycle is None and not self.negative_durations and \
+            len(self.source_successors) > 0
+
+
+def analyze_file(path, name=None, cache_dir=TABLE_CACHE_DIR, **options):
+    """
+    Lit un tableau de contraintes et l'analyse (voir analyze_table).
+    Lève FileNotFoundError si le fichier n'existe pas.
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    with Profiling.phase("read_constraints_table"):
+        table = load_constraints_table(path, cache_dir)
+        Profiling.count("lines", len(table.tasks) + len(table.errors))
+    return analyze_table(name, table, **options)
+
+
+def analyze_table(name, table, **options):
+    """
+    Analyse un tableau de contraintes déjà lu (ConstraintsTable) : si ses lignes sont valides,
+    construit son graphe et l'analyse (voir analyze_graph).
+    """
+    analysis = Analysis(name)
+    analysis.warnings = Main.get_table_warnings(table)
+    analysis.errors = list(table.errors)
+    if analysis.errors:
+        return analysis
+    with Profiling.phase("get_graph_from_table"):
+        try:
+            graph = Main.get_graph_from_table(name, table)
+        except ValueError as error:
+            # Tableau cohérent ligne par ligne mais pas dans son ensemble (prédécesseur inconnu, ...)
+            analysis.errors = [(None, str(error))]
+            return analysis
+        Profiling.count("nodes", len(graph.node_ids))
+        Profiling.count("edges", graph.number_of_edges)
+    return analyze_graph(graph, analysis, **options)
+
+
+def analyze_graph(graph, analysis=None, max_paths=None, time_budget=None, near_critical_paths=0, workers=None,
+                  result_cache=None):
+    """
+    Analyse un graphe : vérification des propriétés d'un graphe d'ordonnancement, puis rangs,
+    calendriers, marges et chemins critiques. max_paths et time_budget limitent l'énumération
+    des chemins critiques ; near_critical_paths est le nombre de plus longs chemins à calculer.
+    Si workers > 1, les rangs, calendriers et marges des grands graphes (PARALLEL_MIN_NODES nœuds)
+    sont calculés par sous-projet indépendant dans workers processus (voir C2_Parallel).
+    Si result_cache (C2_ResultCache.ResultCache) est donné, les résultats d'un graphe déjà analysé
+    y sont repris au lieu d'être recalculés, et ceux d'un nouveau graphe d'ordonnancement y sont ajoutés.
+    """
+    if analysis is None:
+        analysis = Analysis(graph.name)
+    analysis.graph = graph
+    analysis.warnings += graph.warnings
+
+    digest = cached = None
+    if result_cache is not None:
+        digest, cached = ResultCache.lookup(result_cache, graph)
+
+    # Vérification des propriétés d'un graphe d'ordonnancement (seuls les graphes d'ordonnancement sont en cache)
+    if cached is not None:
+        cached.restore(analysis)
+    else:
+        with Profiling.phase("is_acyclic"):
+            analysis.order, analysis.level_offsets, analysis.cycle = graph.topological_sort()
+    with Profiling.phase("has_no_negative_edges"):
+        analysis.negative_durations = Main.get_negative_durations(graph)
+    with Profiling.phase("check_alpha"):
+        analysis.source_successors = graph.get_successors_of(0).tolist()
+    if not analysis.is_scheduling_graph():
+        return analysis
+    
+    # Rangs, calendriers et marges
+    if cached is not None:
+        graph.ranks_and_ids = analysis.ranks, analysis.ids
+        graph.early_schedule, graph.late_schedule = analysis.early_schedule, analysis.late_schedule
+    elif workers is not None and workers > 1 and graph.get_number_of_nodes() >= Parallel.PARALLEL_MIN_NODES:
+        with Profiling.phase("get_schedules_and_margins"):
+            (analysis.ranks, analysis.ids, analysis.early_schedule, analysis.late_schedule, analysis.total_margin,
+             analysis.free_margin) = Parallel.get_schedules_and_margins(graph, workers)
+        graph.ranks_and_ids = analysis.ranks, analysis.ids
+        graph.early_schedule, graph.late_schedule = analysis.early_schedule, analysis.late_schedule
+    else:
+        with Profiling.phase("get_node_ranks"):
+            graph.ranks_and_ids = Main.get_node_ranks(graph)
+        analysis.ranks, analysis.ids = graph.ranks_and_ids
+        with Profiling.phase("get_schedules"):
+            analysis.early_schedule, analysis.late_schedule = Main.get_schedules(graph)
+        with Profiling.phase("get_marges"):
+            analysis.total_margin, analysis.free_margin = Main.get_marges(graph, analysis.early_schedule,
+                                                                          analysis.late_schedule)
+
+    analysis.project_duration = int(analysis.early_schedule[graph.omega_node_id])
+    
+    # Chemins critiques (énumérés à la demande, lors de leur affichage ou exportation)
+    with Profiling.phase("get_chemins_critiques"):
+        analysis.critical_paths = Main.get_chemins_critiques(analysis.total_margin, graph, max_paths, time_budget)
+    if cached is not None:
+        analysis.critical_paths.number_of_paths = cached.critical_path_count
+    elif result_cache is not None:
+        ResultCache.store(result_cache, digest, analysis)
+    if near_critical_paths:
+        with Profiling.phase("get_chemins_quasi_critiques"):
+            analysis.near_critical_paths = Main.get_chemins_quasi_critiques(graph, near_critical_paths)
+    return analysis
@@ -0,0 +1,269 @@
+# Mode batch : analyse non interactive de nombreux tableaux de contraintes,
+# répartis sur un ensemble de processus.
+#
+# Usage :
+#   python C2_Batch.py C2_Tables                      (tous les .txt d'un dossier)
+#   python C2_Batch.py "tables/*.txt" -o resultats -j 8
+#   python C2_Batch.py C2_Tables --export csv          (résultats par tâche en CSV)
+#   python C2_Batch.py "projets/*.txt" --portfolio      (petits tableaux analysés ensemble, par lots)
+#   python C2_Batch.py C2_Tables --profile              (durée, mémoire et compteurs de chaque étape)
+
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from C2_Analysis import analyze_file
+import C2_Profiling as Profiling
+from C2_Export import EXPORT_FORMATS, TASK_FIELDS, export, task_columns, task_ids
+from C2_Interface import format_path_count, printError, printGreen, printShift, printTitle
+from C2_Portfolio import analyze_files
+
+# Dossier des résultats (un fichier JSON par tableau)
+RESULTS_DIR = "C2_Resultats"
+# Nombre maximal de tableaux analysés ensemble par un processus en mode portefeuille
+PORTFOLIO_SIZE = 1000
+
+
+def find_tables(patterns):
+    """
+    Liste les tableaux de contraintes désignés par des dossiers (tous leurs fichiers .txt)
+    ou des motifs glob, triés et sans doublon.
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.txt")
+        paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def analyze_table(path, cache_dir=None, output_dir=RESULTS_DIR, export_format=None):
+    """
+    Analyse complète d'un tableau de contraintes, sans affichage.
+    Retourne un dictionnaire sérialisable en JSON : validité, circuit éventuel, et pour un graphe
+    d'ordonnancement la durée du projet, le nombre de chemins critiques et, par tâche, le rang,
+    la durée, les dates au plus tôt et au plus tard et les marges. Si export_format est donné
+    (csv, jsonl ou npy), les résultats par tâche sont exportés dans output_dir (voir C2_Export).
+    """
+    return get_result(analyze_file(path, cache_dir=cache_dir), path, output_dir, export_format)
+
+
+def get_result(analysis, path, output_dir=RESULTS_DIR, export_format=None):
+    # Résultat sérialisable en JSON d'une analyse terminée (voir analyze_table)
+    result = {"table": analysis.name, "path": path, "status": "ok", "warnings": analysis.warnings}
+    if not analysis.is_valid():
+        result["status"] = "invalid"
+        result["errors"] = [{"line": num_line, "text": line} for num_line, line in analysis.errors]
+        return result
+
+    graph = analysis.graph
+    result["number_of_tasks"] = len(graph.node_ids)
+    result["number_of_edges"] = graph.number_of_edges
+    if analysis.cycle is not None:
+        result["status"] = "cyclic"
+        result["cycle"] = graph.labels.to_labels(analysis.cycle).tolist()
+        return result
+    if not analysis.is_scheduling_graph():
+        result["status"] = "not_scheduling"
+        return result
+
+    result["project_duration"] = analysis.project_duration
+    result["number_of_critical_paths"] = format_path_count(analysis.critical_paths.total_count())
+    if export_format is None:
+        columns = task_columns(analysis, task_ids(analysis))
+        result["tasks"] = {field: columns[field].tolist() for field in TASK_FIELDS}
+    else:
+        # Résultats par tâche exportés à part, par blocs, plutôt que dans le fichier JSON
+        extension = "" if export_format == "npy" else f".{export_format}"
+        result["tasks_file"] = os.path.join(output_dir, f"{analysis.name}{extension}")
+        export(analysis, result["tasks_file"], export_format)
+    return result
+
+
+def process_table(path, output_dir, cache_dir=None, export_format=None, profile=False):
+    """
+    Analyse un tableau dans un processus de travail et écrit son résultat dans output_dir.
+    Seul un résumé est renvoyé au processus principal (les tableaux par tâche restent sur disque).
+    Si profile est vrai, le profil de l'analyse (voir C2_Profiling) est ajouté au résultat.
+    """
+    start = time.perf_counter()
+    profiler = Profiling.Profiler() if profile else None
+    with profiler or Profiling.NO_PHASE:
+        try:
+            result = analyze_table(path, cache_dir, output_dir, export_format)
+        except Exception as error:
+            # Toute erreur est rapportée dans le résultat du tableau, sans interrompre le reste du lot
+            result = error_result(os.path.splitext(os.path.basename(path))[0], path, error)
+    result["seconds"] = time.perf_counter() - start
+    if profiler is not None:
+        result["profile"] = profiler.report()
+    return write_result(result, output_dir)
+
+
+def process_portfolio(paths, output_dirs, cache_dir=None, export_format=None, profile=False):
+    """
+    Analyse un lot de tableaux ensemble (C2_Portfolio), dans un processus de travail, et écrit
+    le résultat de chacun dans son dossier (output_dirs, un par tableau) ; renvoie leurs résumés.
+    La durée d'analyse du lot est répartie également entre ses tableaux. Si profile est vrai,
+    le profil de l'analyse du lot est ajouté au résultat de chacun de ses tableaux. Si l'analyse
+    du lot échoue (tableau illisible, ...), le lot est traité tableau par tableau.
+    """
+    start = time.perf_counter()
+    profiler = Profiling.Profiler() if profile else None
+    try:
+        with profiler or Profiling.NO_PHASE:
+            analyses = analyze_files(paths, cache_dir)
+    except Exception:
+        return [process_table(path, output_dir, cache_dir, export_format, profile)
+                for path, output_dir in zip(paths, output_dirs)]
+    seconds = (time.perf_counter() - start) / len(paths)
+
+    summaries = []
+    for path, output_dir, analysis in zip(paths, output_dirs, analyses):
+        start = time.perf_counter()
+        try:
+            result = get_result(analysis, path, output_dir, export_format)
+        except Exception as error:
+            result = error_result(analysis.name, path, error)
+        result["seconds"] = seconds + time.perf_counter() - start
+        if profiler is not None:
+            result["profile"] = profiler.report()
+        summaries.append(write_result(result, output_dir))
+    return summaries
+
+
+def error_result(name, path, error):
+    # Résultat d'un tableau dont l'analyse ou l'écriture a échoué
+    return {"table": name, "path": path, "status": "error", "message": str(error)}
+
+
+def write_result(result, output_dir):
+    """
+    Écrit le résultat d'un tableau dans output_dir et renvoie son résumé. Le résultat est sérialisé
+    avant l'ouverture du fichier, écrit dans un fichier temporaire puis renommé : un fichier de résultats
+    visible est toujours complet. Un résultat qui ne peut être sérialisé ou écrit devient une erreur.
+    """
+    output_path = os.path.join(output_dir, f"{result['table']}.json")
+    try:
+        text = json.dumps(result)
+    except (TypeError, ValueError) as error:
+        result = dict(error_result(result["table"], result["path"], error), seconds=result["seconds"])
+        text = json.dumps(result)
+    try:
+        descriptor, temporary = tempfile.mkstemp(prefix=f".{result['table']}-", suffix=".tmp", dir=output_dir)
+        try:
+            with os.fdopen(descriptor, "w") as f:
+                f.write(text)
+            os.replace(temporary, output_path)
+        except OSError:
+            os.remove(temporary)
+            raise
+    except OSError as error:
+        result = dict(error_result(result["table"], result["path"], error), seconds=result["seconds"])
+    return {key: result[key] for key in ("table", "status", "seconds", "project_duration") if key in result}
+
+
+def run_batch(paths, output_dir=RESULTS_DIR, workers=None, cache_dir=None, export_format=None, profile=False,
+              portfolio=False):
+    """
+    Analyse tous les tableaux en parallèle (workers processus, par défaut un par cœur)
+    et renvoie la liste des résumés, dans l'ordre des chemins. Si portfolio est vrai, chaque processus
+    analyse ses tableaux par lots d'au plus PORTFOLIO_SIZE, regroupés en un seul graphe (C2_Portfolio).
+    """
+    directories = get_output_dirs(paths, output_dir)
+    for directory in set(directories) | {output_dir}:
+        os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if portfolio:
+        size = max(1, min(PORTFOLIO_SIZE, -(-len(paths) // workers)))
+        lots = [slice(start, start + size) for start in range(0, len(paths), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [summary for summaries in executor.map(process_portfolio, [paths[lot] for lot in lots],
+                                                          [directories[lot] for lot in lots],
+                                                          [cache_dir] * len(lots), [export_format] * len(lots),
+                                                          [profile] * len(lots))
+                    for summary in summaries]
+    # Regrouper les petits tableaux par lots pour amortir les échanges entre processus
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(process_table, paths, directories, [cache_dir] * len(paths),
+                                 [export_format] * len(paths), [profile] * len(paths), chunksize=chunksize))
+
+
+def get_output_dirs(paths, output_dir):
+    """
+    Dossier des résultats de chaque tableau : output_dir suivi du dossier du tableau relatif au dossier
+    commun à tous les tableaux, si bien que deux tableaux de même nom pris dans des dossiers différents
+    ont des fichiers de résultats distincts. Lève ValueError si deux tableaux auraient quand même
+    le même fichier de résultats (même nom à l'extension près, dans le même dossier).
+    """
+    if not paths:
+        return []
+    sources = [os.path.dirname(os.path.abspath(path)) for path in paths]
+    root = os.path.commonpath(sources)
+    directories = [os.path.normpath(os.path.join(output_dir, os.path.relpath(source, root))) for source in sources]
+    written = {}
+    for path, directory in zip(paths, directories):
+        result_path = os.path.join(directory, f"{os.path.splitext(os.path.basename(path))[0]}.json")
+        if result_path in written:
+            raise ValueError(f"Les tableaux {written[result_path]} et {path} auraient le même fichier "
+                             f"de résultats {result_path}")
+        written[result_path] = path
+    return directories
+
+
+def print_summary(summaries, elapsed):
+    # Affiche le bilan global du traitement
+    printTitle("* Bilan du traitement :\n")
+    printShift(f"{len(summaries)} tableaux analysés en {elapsed:.2f} s "
+               f"({len(summaries) / elapsed if elapsed else 0:.1f} tableaux/s)")
+    for status, label in (("ok", "graphes d'ordonnancement"), ("cyclic", "graphes avec circuit"),
+                          ("not_scheduling", "autres graphes non ordonnançables"),
+                          ("invalid", "tableaux invalides"), ("error", "erreurs de lecture")):
+        printShift(f"{sum(summary['status'] == status for summary in summaries)} {label}")
+    durations = [summary["project_duration"] for summary in summaries if summary["status"] == "ok"]
+    if durations:
+        printShift(f"Durée des projets : min {min(durations)}, moyenne {sum(durations) / len(durations):.1f}, "
+                   f"max {max(durations)} jours")
+    slowest = max(summaries, key=lambda summary: summary["seconds"], default=None)
+    if slowest:
+        printShift(f"Tableau le plus long à analyser : {slowest['table']} ({slowest['seconds']:.3f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse non interactive de tableaux de contraintes.")
+    parser.add_argument("tables", nargs="+", help="dossiers ou motifs glob des tableaux à analyser")
+    parser.add_argument("-o", "--output", default=RESULTS_DIR, help="dossier des résultats JSON")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="nombre de processus (un par cœur)")
+    parser.add_argument("--cache-dir", default=None, help="dossier du cache binaire des tableaux")
+    parser.add_argument("--export", choices=EXPORT_FORMATS, default=None,
+                        help="exporte les résultats par tâche dans ce format plutôt que dans le JSON")
+    parser.add_argument("--profile", action="store_true",
+                        help="ajoute au JSON la durée, la mémoire et les compteurs de chaque étape")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="analyse les tableaux par lots, en un seul graphe par lot (petits tableaux)")
+    args = parser.parse_args(argv)
+
+    paths = find_tables(args.tables)
+    if not paths:
+        printError("Aucun tableau de contraintes trouvé")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        summaries = run_batch(paths, args.output, args.workers, args.cache_dir, args.export, args.profile,
+                              args.portfolio)
+    except ValueError as error:
+        printError(str(error))
+        return 1
+    print_summary(summaries, time.perf_counter() - start)
+    printGreen(f"Résultats écrits dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
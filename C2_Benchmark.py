@@ -0,0 +1,258 @@
+# Banc d'essai : génère des graphes d'ordonnancement synthétiques au format de C2_Tables,
+# chronomètre chaque étape de l'analyse et vérifie que les résultats sur les tableaux fournis
+# sont toujours identiques aux traces d'exécution (C2_Traces_execution).
+#
+# Usage :
+#   python C2_Benchmark.py                                   (toutes les formes, tailles par défaut)
+#   python C2_Benchmark.py --shapes chain random --sizes 10000 1000000 -r 3 -o bench.json
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+import C2_Analysis as Analysis
+import C2_Main as Main
+from C2_Interface import print_analysis, printGreen, printError, printShift, printTitle
+from C2_Parser import parse_constraints_table
+
+# Tailles (nombre de tâches) par défaut des graphes générés
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Nombre de tâches par couche (formes "layers" et "tied") et de prédécesseurs par tâche
+LAYER_WIDTH = 100
+TIED_WIDTH = 3
+PREDECESSORS_PER_TASK = 3
+# Nombre maximal de chemins critiques énumérés (find_paths)
+BENCHMARK_MAX_PATHS = 10000
+# Nombre de lignes écrites par bloc dans les tableaux générés
+GENERATOR_CHUNK_ROWS = 1 << 16
+# Fichier des résultats par défaut
+RESULTS_FILE = "C2_Benchmark.json"
+
+
+# ====================   GÉNÉRATEURS   ==================================
+
+def generate_chain(n, rng):
+    # Chaîne : chaque tâche dépend de la précédente (profondeur maximale, un seul chemin critique)
+    for start in range(1, n + 1, GENERATOR_CHUNK_ROWS):
+        tasks = np.arange(start, min(start + GENERATOR_CHUNK_ROWS, n + 1))
+        durations = rng.integers(1, 100, len(tasks))
+        yield [f"{task} {duration} {task - 1}" if task > 1 else f"{task} {duration}"
+               for task, duration in zip(tasks.tolist(), durations.tolist())]
+
+
+def generate_layers(n, rng, width=LAYER_WIDTH, degree=PREDECESSORS_PER_TASK):
+    # Couches larges : chaque tâche dépend de tâches prises au hasard dans la couche précédente
+    for start in range(1, n + 1, GENERATOR_CHUNK_ROWS):
+        tasks = np.arange(start, min(start + GENERATOR_CHUNK_ROWS, n + 1))
+        durations = rng.integers(1, 100, len(tasks))
+        layer_starts = (tasks - 1) // width * width + 1
+        preds = layer_starts[:, None] - width + rng.integers(0, width, (len(tasks), degree))
+        lines = []
+        for task, duration, layer_start, task_preds in zip(tasks.tolist(), durations.tolist(),
+                                                           layer_starts.tolist(), preds.tolist()):
+            if layer_start == 1:
+                lines.append(f"{task} {duration}")
+            else:
+                lines.append(f"{task} {duration} " + " ".join(map(str, sorted(set(task_preds)))))
+        yield lines
+
+
+def generate_random(n, rng, degree=PREDECESSORS_PER_TASK):
+    # Graphe aléatoire : chaque tâche dépend de tâches antérieures prises au hasard
+    for start in range(1, n + 1, GENERATOR_CHUNK_ROWS):
+        tasks = np.arange(start, min(start + GENERATOR_CHUNK_ROWS, n + 1))
+        durations = rng.integers(1, 100, len(tasks))
+        counts = rng.integers(0, degree + 1, len(tasks))
+        preds = (rng.random((len(tasks), degree)) * (tasks[:, None] - 1)).astype(np.int64) + 1
+        lines = []
+        for task, duration, count, task_preds in zip(tasks.tolist(), durations.tolist(), counts.tolist(),
+                                                     preds.tolist()):
+            task_preds = sorted(set(task_preds[:count])) if task > 1 else []
+            lines.append(" ".join(map(str, [task, duration] + task_preds)))
+        yield lines
+
+
+def generate_tied(n, rng, width=TIED_WIDTH):
+    # Chemins critiques ex aequo : couches de tâches de même durée, chacune dépendant de toute la couche
+    # précédente ; le nombre de chemins critiques croît exponentiellement avec le nombre de couches
+    duration = int(rng.integers(1, 100))
+    for start in range(1, n + 1, GENERATOR_CHUNK_ROWS):
+        lines = []
+        for task in range(start, min(start + GENERATOR_CHUNK_ROWS, n + 1)):
+            layer_start = (task - 1) // width * width + 1
+            preds = range(layer_start - width, layer_start) if layer_start > 1 else ()
+            lines.append(" ".join(map(str, [task, duration, *preds])))
+        yield lines
+
+
+GENERATORS = {
+    "chain": generate_chain,
+    "layers": generate_layers,
+    "random": generate_random,
+    "tied": generate_tied,
+}
+
+
+def write_table(path, shape, n, seed=0):
+    # Écrit un tableau de contraintes synthétique de n tâches, bloc par bloc
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        for lines in GENERATORS[shape](n, rng):
+            f.write("\n".join(lines) + "\n")
+    return path
+
+
+# ====================   MESURES   ==================================
+
+def time_phases(path, max_paths=BENCHMARK_MAX_PATHS):
+    """
+    Analyse un tableau de contraintes étape par étape et renvoie la durée (secondes) de chaque étape,
+    ainsi que la taille du graphe et quelques résultats (durée du projet, chemins énumérés).
+    """
+    phases = {}
+
+    def timed(phase, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        phases[phase] = time.perf_counter() - start
+        return result
+
+    table = timed("parse", parse_constraints_table, path)
+    graph = timed("adjacency", Main.get_graph_from_table, os.path.basename(path), table)
+    _, _, cycle = timed("is_acyclic", graph.topological_sort)
+    if cycle is not None:
+        raise ValueError(f"Le graphe généré {path} contient un circuit")
+    graph.ranks_and_ids = timed("get_node_ranks", Main.get_node_ranks, graph)
+    early_schedule = timed("early_schedule", Main.get_calendrier_au_plus_tot, graph)
+    late_schedule = timed("late_schedule", Main.get_calendrier_au_plus_tard, graph, early_schedule)
+    graph.early_schedule, graph.late_schedule = early_schedule, late_schedule
+    total_margin, _ = timed("margins", Main.get_marges, graph, early_schedule, late_schedule)
+    paths = Main.get_chemins_critiques(total_margin, graph, max_paths)
+    number_of_paths = timed("find_paths", lambda: sum(1 for _ in paths))
+
+    return {
+        "tasks": len(graph.node_ids) - 2,
+        "edges": graph.number_of_edges,
+        "project_duration": int(early_schedule[graph.omega_node_id]),
+        "critical_paths": number_of_paths,
+        "truncated": paths.truncated,
+        "phases": phases,
+        "total": sum(phases.values()),
+    }
+
+
+def run_benchmark(shapes, sizes, repeat=1, seed=0, work_dir=None):
+    """
+    Mesure chaque forme de graphe à chaque taille ; chaque mesure est répétée repeat fois
+    et on garde, pour chaque étape, la durée minimale.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+        for shape in shapes:
+            for n in sizes:
+                path = write_table(os.path.join(directory, f"{shape}_{n}.txt"), shape, n, seed)
+                runs = [time_phases(path) for _ in range(repeat)]
+                result = runs[0]
+                result["phases"] = {phase: min(run["phases"][phase] for run in runs) for phase in result["phases"]}
+                result["total"] = min(run["total"] for run in runs)
+                results.append({"shape": shape, "size": n, **result})
+                print_result(results[-1])
+    return results
+
+
+# ====================   TRACES D'EXÉCUTION   ==================================
+
+def check_traces(tables_dir="C2_Tables", traces_dir="C2_Traces_execution"):
+    """
+    Compare l'affichage de l'analyse de chaque tableau fourni à sa trace d'exécution.
+    Renvoie un dictionnaire nom du tableau -> vrai si l'affichage est identique.
+    """
+    results = {}
+    for trace_name in sorted(os.listdir(traces_dir)):
+        table_name = trace_name.replace("C2_trace_table_", "C2_table_")
+        table_path = os.path.join(tables_dir, table_name)
+        if not os.path.exists(table_path):
+            continue
+        with open(os.path.join(traces_dir, trace_name)) as f:
+            expected = f.read()
+        # La trace contient aussi la fin du programme, absente de l'analyse d'un seul tableau
+        expected = expected[:expected.rfind("> Programme terminé")].rstrip()
+
+        output = io.StringIO()
+        analysis = Analysis.analyze_file(table_path, cache_dir=None, max_paths=Main.MAX_CRITICAL_PATHS,
+                                         time_budget=Main.CRITICAL_PATHS_TIME_BUDGET)
+        with contextlib.redirect_stdout(output):
+            print_analysis(analysis)
+        results[os.path.splitext(table_name)[0]] = output.getvalue().rstrip() == expected
+    return results
+
+
+# ====================   RÉSULTATS   ==================================
+
+def print_result(result):
+    phases = "  ".join(f"{phase} {seconds * 1000:.1f}" for phase, seconds in result["phases"].items())
+    printShift(f"{result['shape']:>6} {result['size']:>9} tâches {result['edges']:>9} arcs : "
+               f"{result['total']:.3f} s  ({phases} ms)")
+
+
+def get_version():
+    # Révision git du code mesuré, si disponible
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'analyse des graphes d'ordonnancement.")
+    parser.add_argument("--shapes", nargs="+", choices=sorted(GENERATORS), default=list(GENERATORS),
+                        help="formes des graphes générés")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="nombres de tâches")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="nombre de répétitions de chaque mesure")
+    parser.add_argument("--seed", type=int, default=0, help="graine des générateurs aléatoires")
+    parser.add_argument("-o", "--output", default=RESULTS_FILE, help="fichier JSON des résultats")
+    parser.add_argument("--no-traces", action="store_true", help="ne pas vérifier les traces d'exécution")
+    args = parser.parse_args(argv)
+
+    traces = {}
+    if not args.no_traces:
+        printTitle("* Vérification des traces d'exécution :\n")
+        traces = check_traces()
+        for name, identical in traces.items():
+            if identical:
+                printGreen(f"{name} : identique")
+            else:
+                printError(f"{name} : l'affichage diffère de la trace d'exécution")
+        print()
+
+    printTitle("* Mesures :\n")
+    results = run_benchmark(args.shapes, args.sizes, args.repeat, args.seed)
+
+    report = {
+        "version": get_version(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "traces": traces,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    printGreen(f"Résultats écrits dans {args.output}")
+    return 0 if all(traces.values()) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,135 @@
+# Exportation des résultats d'une analyse dans des formats lisibles par d'autres outils :
+# CSV, JSON Lines ou tableaux NumPy (.npy). Les lignes sont produites par blocs (générateurs),
+# pour exporter de très grands projets à mémoire constante.
+#
+# Usage :
+#   from C2_Analysis import analyze_file
+#   from C2_Export import export
+#   export(analyze_file("C2_Tables/C2_table_1.txt"), "table_1.csv")
+
+import csv
+import json
+import os
+
+import numpy as np
+
+# Colonnes exportées pour chaque tâche, dans l'ordre
+TASK_FIELDS = ("id", "rank", "duration", "early", "late", "total_margin", "free_margin", "critical")
+# Nombre de tâches par bloc exporté
+EXPORT_CHUNK_ROWS = 1 << 16
+# Formats d'exportation, associés à leur extension
+EXPORT_FORMATS = ("csv", "jsonl", "npy")
+
+
+def task_ids(analysis):
+    """
+    Indices des nœuds d'un graphe d'ordonnancement (alpha, les tâches par étiquette croissante, Omega).
+    Lève ValueError si l'analyse n'a pas pu calculer les calendriers.
+    """
+    if not analysis.is_scheduling_graph():
+        raise ValueError(f"{analysis.name} n'est pas un graphe d'ordonnancement : aucun résultat à exporter")
+    return np.arange(analysis.graph.get_number_of_nodes())
+
+
+def task_columns(analysis, ids, durations=None):
+    # Colonnes (voir TASK_FIELDS) des nœuds ids d'un graphe d'ordonnancement ; "id" est l'étiquette de la tâche
+    if durations is None:
+        durations = analysis.graph.get_durations()
+    return {
+        "id": analysis.graph.labels.to_labels(ids),
+        "rank": analysis.ranks[ids],
+        "duration": durations[ids],
+        "early": analysis.early_schedule[ids],
+        "late": analysis.late_schedule[ids],
+        "total_margin": analysis.total_margin[ids],
+        "free_margin": analysis.free_margin[ids],
+        "critical": analysis.total_margin[ids] == 0,
+    }
+
+
+def iter_task_chunks(analysis, chunk_rows=EXPORT_CHUNK_ROWS, ids=None):
+    # Génère les colonnes par tâche bloc par bloc, par identifiant croissant
+    if ids is None:
+        ids = task_ids(analysis)
+    durations = analysis.graph.get_durations()
+    for start in range(0, len(ids), chunk_rows):
+        yield task_columns(analysis, ids[start:start + chunk_rows], durations)
+
+
+def iter_task_rows(analysis, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Génère une ligne (tuple d'entiers Python, dans l'ordre de TASK_FIELDS) par tâche
+    for columns in iter_task_chunks(analysis, chunk_rows):
+        yield from zip(*(columns[field].tolist() for field in TASK_FIELDS))
+
+
+def export_csv(analysis, path):
+    # Écrit une ligne d'en-tête puis une ligne par tâche ; renvoie le nombre de tâches écrites
+    ids = task_ids(analysis)
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(TASK_FIELDS)
+        for columns in iter_task_chunks(analysis, ids=ids):
+            columns["critical"] = columns["critical"].astype(np.uint8)
+            rows = list(zip(*(columns[field].tolist() for field in TASK_FIELDS)))
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def export_jsonl(analysis, path):
+    # Écrit un objet JSON par tâche et par ligne ; renvoie le nombre de tâches écrites
+    template = '{"id": %s, ' + ", ".join(f'"{field}": %d' for field in TASK_FIELDS[1:-1]) + ', "critical": %s}\n'
+    ids = task_ids(analysis)
+    count = 0
+    with open(path, "w") as f:
+        for columns in iter_task_chunks(analysis, ids=ids):
+            columns["id"] = [json.dumps(label) for label in columns["id"].tolist()]
+            columns["critical"] = np.where(columns["critical"], "true", "false")
+            rows = list(zip(*(np.asarray(columns[field]).tolist() for field in TASK_FIELDS)))
+            f.write("".join(template % row for row in rows))
+            count += len(rows)
+    return count
+
+
+def export_npy(analysis, directory):
+    """
+    Écrit une colonne par fichier .npy (directory/<colonne>.npy), remplie bloc par bloc
+    dans un fichier projeté en mémoire ; renvoie le nombre de tâches écrites.
+    """
+    ids = task_ids(analysis)
+    labels = analysis.graph.labels
+    label_width = 0 if labels.is_integer() else max(len(str(label)) for label in labels.labels)
+    os.makedirs(directory, exist_ok=True)
+    outputs = {}
+    start = 0
+    for columns in iter_task_chunks(analysis, ids=ids):
+        if columns["id"].dtype == object:
+            # Étiquettes non entières : chaînes de longueur fixe (celle de la plus longue étiquette)
+            columns["id"] = columns["id"].astype(str).astype(f"U{label_width}")
+        for field in TASK_FIELDS:
+            if field not in outputs:
+                outputs[field] = np.lib.format.open_memmap(os.path.join(directory, f"{field}.npy"), mode="w+",
+                                                           dtype=columns[field].dtype, shape=(len(ids),))
+            outputs[field][start:start + len(columns[field])] = columns[field]
+        start += len(columns["id"])
+    for output in outputs.values():
+        output.flush()
+    return start
+
+
+def export(analysis, path, export_format=None):
+    """
+    Exporte les résultats par tâche d'une analyse ; le format (csv, jsonl ou npy) est déduit
+    de l'extension de path s'il n'est pas donné (npy : path est un dossier).
+    Renvoie le nombre de tâches écrites.
+    """
+    if export_format is None:
+        export_format = os.path.splitext(path)[1].lstrip(".").lower() or "npy"
+    if export_format == "csv":
+        return export_csv(analysis, path)
+    if export_format == "jsonl":
+        return export_jsonl(analysis, path)
+    if export_format == "npy":
+        return export_npy(analysis, path)
+    raise ValueError(f"Format d'exportation inconnu : {export_format} (formats : {', '.join(EXPORT_FORMATS)})")
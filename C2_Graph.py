@@ -1,105 +1,643 @@
-import copy
-import C2_Interface as Interface
+from array import array
+
+import C2_Profiling as Profiling
+import numpy as np
+
+# Étiquette du nœud initial (alpha), qui a toujours l'indice 0
+ALPHA_LABEL = 0
+# Étiquette d'Omega quand les étiquettes des tâches ne sont pas toutes entières ou que la plus grande
+# est le plus grand entier sur 64 bits (sinon Omega prend la plus grande étiquette + 1)
+OMEGA_LABEL = "Omega"
+
+
+# Tableaux de l'index d'un graphe enregistrés par index_arrays et relus par from_index
+INDEX_FIELDS = ("labels", "durations", "succ_offsets", "succ_targets", "pred_offsets", "pred_sources")
+# Nombre maximal d'arcs sortant d'un niveau du tri topologique pour qu'il soit traité arc par arc
+# plutôt qu'en passes vectorisées
+SCALAR_LEVEL_EDGES = 64
+
+# Erreur levée par Graph.from_arrays quand des étiquettes entières et des chaînes sont mêlées
+MIXED_LABELS_MESSAGE = "Les étiquettes des tâches doivent être toutes entières ou toutes des chaînes"
+
+
+def to_list(labels):
+    # Liste des étiquettes d'un tableau NumPy ou d'une séquence, sans conversion de type
+    return labels.tolist() if isinstance(labels, np.ndarray) else list(labels)
+
+
+def label_array(labels):
+    """
+    Tableau NumPy d'étiquettes (tâches ou arcs). Lève ValueError si des entiers et des chaînes sont
+    mêlés : NumPy les convertirait tous en chaînes, et la tâche 1 deviendrait la tâche "1".
+    """
+    values = np.asarray(labels)
+    if values.dtype.kind == "O" or (values.dtype.kind == "U" and not isinstance(labels, np.ndarray)):
+        texts = [isinstance(label, str) for label in np.asarray(labels, dtype=object).ravel().tolist()]
+        if any(texts) and not all(texts):
+            raise ValueError(MIXED_LABELS_MESSAGE)
+        if all(texts):
+            values = values.astype(str)
+    return values
+
+
+class LabelIndex:
+    """
+    Internement des étiquettes des tâches : chaque étiquette externe (entier quelconque, même très
+    grand ou clairsemé, ou chaîne) reçoit un indice dense 0..n-1, dans l'ordre d'ajout.
+    Les étiquettes entières sont stockées dans un tableau typé (8 octets par tâche) et retrouvées
+    par recherche dichotomique ; les autres dans une liste, avec un dictionnaire construit à la demande.
+    """
+    __slots__ = ("labels", "index_of", "sorted_labels", "sorter")
+    
+    def __init__(self, labels=()):
+        self.labels = array("q")  # Étiquette de chaque indice (liste si une étiquette n'est pas entière)
+        self.index_of = None  # Dictionnaire étiquette -> indice, construit au premier accès individuel
+        self.sorted_labels = None  # Étiquettes entières triées et indices correspondants, pour lookup
+        self.sorter = None
+        self.extend(labels)
+    
+    def __len__(self):
+        return len(self.labels)
+    
+    def __contains__(self, label):
+        try:
+            self.index(label)
+        except KeyError:
+            return False
+        return True
+    
+    def __getitem__(self, index):
+        # Étiquette d'un indice
+        return self.labels[index]
+    
+    def is_integer(self):
+        # Vrai si toutes les étiquettes sont entières (stockage en tableau typé)
+        return isinstance(self.labels, array)
+    
+    def extend(self, labels):
+        # Ajoute des étiquettes (distinctes et absentes) et renvoie l'indice de la première
+        start = len(self.labels)
+        values = np.asarray(labels)
+        if self.is_integer() and values.dtype.kind in "iu":
+            self.labels.frombytes(values.astype(np.int64).tobytes())
+            labels = values.tolist() if self.index_of is not None else None
+        else:
+            if self.is_integer():
+                self.labels = self.labels.tolist()
+            # Étiquettes d'origine, et non celles de values : NumPy convertit en chaînes les entiers
+            # d'une liste mêlant entiers et chaînes ([1, "a"] devient ["1", "a"])
+            labels = to_list(labels)
+            self.labels.extend(labels)
+        if self.index_of is not None:
+            self.index_of.update(zip(labels, range(start, len(self.labels))))
+        self.sorted_labels = self.sorter = None
+        return start
+    
+    def append(self, label):
+        # Ajoute une étiquette absente et renvoie son indice
+        return self.extend([label])
+    
+    def index(self, label):
+        # Indice d'une étiquette ; lève KeyError si elle est inconnue
+        if self.index_of is None:
+            self.index_of = dict(zip(self.labels, range(len(self.labels))))
+        return self.index_of[label]
+    
+    def lookup(self, labels):
+        # Indices (int32) d'un tableau d'étiquettes ; lève KeyError à la première étiquette inconnue
+        values = np.asarray(labels)
+        if not len(values):
+            return np.empty(0, dtype=np.int32)
+        if not (self.is_integer() and values.dtype.kind in "iu"):
+            return np.array([self.index(label) for label in to_list(labels)], dtype=np.int32)
+        labels = values
+        if self.sorted_labels is None:
+            all_labels = np.frombuffer(self.labels, dtype=np.int64)
+            sorter = np.argsort(all_labels, kind="stable")
+            self.sorted_labels = all_labels[sorter]
+            # Étiquettes ajoutées par ordre croissant (cas des tableaux de contraintes) : pas de permutation
+            self.sorter = None if np.array_equal(sorter, np.arange(len(sorter))) else sorter.astype(np.int32)
+        
+        first, last = int(self.sorted_labels[0]), int(self.sorted_labels[-1])
+        if last - first == len(self.sorted_labels) - 1:
+            # Étiquettes consécutives : la position d'une étiquette est son écart à la plus petite
+            positions = labels.astype(np.int64) - first
+            unknown = (positions < 0) | (positions >= len(self.sorted_labels))
+        else:
+            positions = np.minimum(np.searchsorted(self.sorted_labels, labels), len(self.sorted_labels) - 1)
+            unknown = self.sorted_labels[positions] != labels
+        if unknown.any():
+            raise KeyError(labels[unknown][0].item())
+        return (positions if self.sorter is None else self.sorter[positions]).astype(np.int32)
+    
+    def to_labels(self, indices):
+        # Étiquettes d'un tableau d'indices (tableau NumPy, de type objet si elles ne sont pas entières)
+        indices = np.asarray(indices, dtype=np.int64)
+        if self.is_integer():
+            return np.frombuffer(self.labels, dtype=np.int64)[indices]
+        return np.array(self.labels, dtype=object)[indices]
+    
+    def next_integer_label(self):
+        # Plus petite étiquette entière supérieure à toutes les autres (étiquette d'Omega),
+        # ou None si la plus grande étiquette est déjà le plus grand entier sur 64 bits
+        last = max(self.labels, default=ALPHA_LABEL)
+        return last + 1 if last < np.iinfo(np.int64).max else None
+
+
+class TopologicalOrder:
+    """
+    Ordre topologique maintenu pendant l'ajout d'arcs, un par un (algorithme de Pearce et Kelly).
+    Un arc u -> v déjà compatible avec l'ordre (u avant v) est accepté en temps constant. Sinon, seuls
+    les nœuds situés entre v et u dans l'ordre sont parcourus : les descendants de v et les ancêtres
+    de u de cette fenêtre sont réordonnés entre eux (ancêtres d'abord), sur les positions qu'ils occupaient.
+    Si u est un descendant de v, l'arc créerait un circuit : il est refusé et l'ordre n'est pas modifié.
+    """
+    __slots__ = ("position", "node_at", "successors", "predecessors")
+    
+    def __init__(self, order, successors, predecessors):
+        # order : un ordre topologique de tous les nœuds ; successors, predecessors : listes d'adjacence
+        self.node_at = list(order)  # Nœud à chaque position
+        self.position = [0] * len(self.node_at)  # Position de chaque nœud
+        for position, node in enumerate(self.node_at):
+            self.position[node] = position
+        self.successors = successors
+        self.predecessors = predecessors
+    
+    def add_node(self):
+        # Ajoute un nœud isolé, placé en fin d'ordre ; renvoie son indice
+        node = len(self.position)
+        self.position.append(len(self.node_at))
+        self.node_at.append(node)
+        self.successors.append([])
+        self.predecessors.append([])
+        return node
+    
+    def add_edge(self, u, v):
+        """
+        Ajoute l'arc u -> v et rétablit l'ordre si nécessaire. Renvoie None, ou, si l'arc créerait
+        un circuit, la liste des nœuds de ce circuit (u, v, ..., u) sans ajouter l'arc.
+        """
+        position = self.position
+        lower, upper = position[v], position[u]
+        if upper < lower:
+            self.successors[u].append(v)
+            self.predecessors[v].append(u)
+            return None
+        if u == v:
+            return [u, u]
+        
+        # Descendants de v placés avant u (parent de chaque nœud atteint, pour retrouver un circuit)
+        forward = {v: None}
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            for successor in self.successors[node]:
+                if successor == u:
+                    path = [u]
+                    while node is not None:
+                        path.append(node)
+                        node = forward[node]
+                    return [u] + path[:0:-1] + [u]
+                if position[successor] < upper and successor not in forward:
+                    forward[successor] = node
+                    stack.append(successor)
+        
+        # Ancêtres de u placés après v
+        backward = {u}
+        stack = [u]
+        while stack:
+            for predecessor in self.predecessors[stack.pop()]:
+                if position[predecessor] > lower and predecessor not in backward:
+                    backward.add(predecessor)
+                    stack.append(predecessor)
+        
+        # Les ancêtres de u passent avant les descendants de v, chaque groupe gardant son ordre relatif
+        nodes = sorted(backward, key=position.__getitem__) + sorted(forward, key=position.__getitem__)
+        slots = sorted(position[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            position[node] = slot
+            self.node_at[slot] = node
+        
+        self.successors[u].append(v)
+        self.predecessors[v].append(u)
+        return None
 
 
 class Graph:
+    """
+    Graphe d'ordonnancement. Les tâches sont désignées par leurs étiquettes externes uniquement
+    à la construction et à l'affichage : tous les algorithmes travaillent sur des indices denses
+    (0 pour alpha, puis les tâches, puis Omega), et les données par nœud sont des tableaux.
+    """
+    __slots__ = ("labels", "durations", "omega_node_id", "edge_sources", "edge_targets", "succ_offsets",
+                 "succ_targets", "pred_offsets", "pred_sources", "name", "warnings", "number_of_edges",
+                 "number_of_vertices", "early_schedule", "late_schedule", "ranks_and_ids", "topological_order",
+                 "topological_levels")
+    
     def __init__(self, name):
         # Initialise les propriétés de la classe
-        self.node_ids = {0}  # Ensemble de tous les identifiants de nœuds
-        self.node_ids_with_successor = {0}  # Ensemble des nœuds ayant des successeurs
-        self.predecessors_of = {}  # Dictionnaire des prédécesseurs de chaque nœud
-        self.duration_of = {0: 0}  # Dictionnaire des durées de chaque nœud
-        self.omega_node_id = None  # Identifiant du nœud Omega
-        self.adjacency_matrix = None  # Matrice d'adjacence
+        self.labels = LabelIndex([ALPHA_LABEL])  # Étiquette externe de chaque nœud (alpha : indice 0)
+        self.durations = array("q", [0])  # Durée de chaque nœud, par indice
+        self.omega_node_id = None  # Indice du nœud Omega
+        
+        # Arcs ajoutés depuis la dernière construction de l'index (ordre d'insertion),
+        # intégrés à l'index compressé lors de sa prochaine construction
+        self.edge_sources = []
+        self.edge_targets = []
+        
+        # Index compressé (CSR) des successeurs et des prédécesseurs, construit à la demande :
+        # les successeurs de u sont succ_targets[succ_offsets[u]:succ_offsets[u + 1]]
+        self.succ_offsets = None
+        self.succ_targets = None
+        self.pred_offsets = None
+        self.pred_sources = None
         
         self.name = name  # Nom du graphe
+        self.warnings = []  # Avertissements relevés pendant la construction (affichés par l'interface)
         self.number_of_edges = 0  # Nombre d'arêtes
         self.number_of_vertices = 0  # Nombre de sommets
         
         self.early_schedule = None  # Calendrier au plus tot
         self.late_schedule = None  # Calendrier au plus tard
         
-        self.ranks_and_ids = None  # list of tuple containing ranks and ids
+        self.ranks_and_ids = None  # Tableau des rangs par nœud et tableau des identifiants triés par rang
+        
+        # Ordre topologique maintenu à chaque ajout d'arc (None : non maintenu, voir maintain_topological_order)
+        self.topological_order = None
+        
+        # Index des successeurs et résultat du dernier tri topologique calculé sur cet index
+        # (repris par topological_sort tant que l'index n'est pas reconstruit)
+        self.topological_levels = None
+    
+    @classmethod
+    def from_arrays(cls, name, tasks, durations, sources=None, targets=None, edges=None):
+        """
+        Construit un graphe d'ordonnancement complet en une seule passe vectorisée, sans appel
+        à add_node ni add_edge : tasks (étiquettes quelconques) et durations donnent une entrée par
+        tâche, les arcs prédécesseur → tâche sont donnés par les tableaux d'étiquettes sources et
+        targets, ou par une liste edges de couples (source, target). Les tâches reçoivent les indices
+        1..n par étiquette croissante. Les tâches sans prédécesseur sont reliées au nœud 0,
+        puis Omega est ajouté et relié aux tâches sans successeur.
+        Lève ValueError si un arc désigne une tâche inconnue, si une tâche a l'étiquette de alpha
+        ou si des étiquettes entières et des chaînes sont mêlées.
+        """
+        graph = cls(name)
+        tasks = label_array(tasks)
+        durations = np.asarray(durations, dtype=np.int64)
+        if edges is not None:
+            edges = label_array(edges).reshape(-1, 2)
+            sources, targets = edges[:, 0], edges[:, 1]
+        sources = label_array([] if sources is None else sources)
+        targets = label_array([] if targets is None else targets)
+        # Type commun aux tâches et aux arcs (int64 pour des entiers) : convertir les arcs vers le type
+        # des tâches, plus étroit, changerait une étiquette inconnue en étiquette existante
+        columns = [values for values in (tasks, sources, targets) if len(values)]
+        if all(values.dtype.kind in "iu" for values in columns):
+            dtype = np.int64
+        elif len({values.dtype.kind == "U" for values in columns}) > 1:
+            raise ValueError(MIXED_LABELS_MESSAGE)
+        else:
+            dtype = np.result_type(*columns)
+        tasks, sources, targets = (values.astype(dtype) for values in (tasks, sources, targets))
+        
+        # Avertissement pour chaque tâche présente plusieurs fois : la dernière durée est gardée
+        # (première occurrence dans l'ordre inverse)
+        labels, last, counts = np.unique(tasks[::-1], return_index=True, return_counts=True)
+        for node_label in labels[counts > 1].tolist():
+            graph.warnings.append(f"Tache {node_label} a deja été ajouté")
+        if labels.dtype.kind in "iu" and np.any(labels == ALPHA_LABEL):
+            raise ValueError(f"L'étiquette {ALPHA_LABEL} est réservée au nœud initial")
+        
+        # Internement : alpha, puis les tâches par étiquette croissante
+        graph.labels.extend(labels)
+        graph.durations.frombytes(durations[::-1][last].tobytes())
+        graph.number_of_vertices = len(tasks)
+        try:
+            sources = graph.labels.lookup(sources).astype(np.int64)
+            targets = graph.labels.lookup(targets).astype(np.int64)
+        except KeyError as error:
+            raise ValueError(f"La tâche {error.args[0]} a des successeurs mais n'est pas définie")
+        
+        # Relie au nœud initial (0) les tâches sans prédécesseur
+        n = len(graph.labels)
+        has_predecessor = np.zeros(n, dtype=bool)
+        has_predecessor[targets] = True
+        roots = np.flatnonzero(~has_predecessor[1:]) + 1
+        sources = np.concatenate((sources, np.zeros(len(roots), dtype=np.int64)))
+        targets = np.concatenate((targets, roots))
+        
+        # Ajoute Omega et ses arcs (dans l'ordre de l'ensemble des nœuds sans successeurs, comme add_omega_edges)
+        graph.add_omega_node()
+        has_successor = np.zeros(n + 1, dtype=bool)
+        has_successor[sources] = True
+        omega_sources = graph.nodes_without_successor(has_successor)
+        
+        graph.edge_sources = np.concatenate((sources, omega_sources))
+        graph.edge_targets = np.concatenate((targets, np.full(len(omega_sources), graph.omega_node_id)))
+        graph.number_of_edges = len(graph.edge_sources)
+        graph.build_index()
+        return graph
+    
+    @classmethod
+    def from_index(cls, name, arrays, meta):
+        """
+        Reconstruit un graphe d'ordonnancement enregistré par index_arrays (par exemple relu du cache
+        binaire des tableaux de contraintes), sans refaire l'internement des étiquettes ni l'index CSR :
+        arrays associe à chaque champ de INDEX_FIELDS son tableau, meta donne les avertissements
+        et les nombres d'arcs et de sommets.
+        """
+        graph = cls(name)
+        graph.labels = LabelIndex(arrays["labels"])
+        graph.durations.frombytes(np.asarray(arrays["durations"][1:], dtype=np.int64).tobytes())
+        graph.omega_node_id = len(graph.labels) - 1
+        for field in ("succ_offsets", "succ_targets", "pred_offsets", "pred_sources"):
+            setattr(graph, field, arrays[field])
+        graph.warnings = list(meta["warnings"])
+        graph.number_of_edges = meta["number_of_edges"]
+        graph.number_of_vertices = meta["number_of_vertices"]
+        return graph
+    
+    def index_arrays(self):
+        # Tableaux de l'index (INDEX_FIELDS) et métadonnées d'un graphe à étiquettes entières, pour from_index
+        self.build_index()
+        arrays = {"labels": np.frombuffer(self.labels.labels, dtype=np.int64), "durations": self.get_durations(),
+                  "succ_offsets": self.succ_offsets, "succ_targets": self.succ_targets,
+                  "pred_offsets": self.pred_offsets, "pred_sources": self.pred_sources}
+        meta = {"warnings": self.warnings, "number_of_edges": self.number_of_edges,
+                "number_of_vertices": self.number_of_vertices}
+        return arrays, meta
+    
+    @property
+    def node_ids(self):
+        # Indices de tous les nœuds (alpha, les tâches puis Omega)
+        return range(len(self.durations))
+    
+    def label_of(self, node_id):
+        # Étiquette externe d'un nœud
+        return self.labels[node_id]
+    
+    def get_duration(self, node_id):
+        # Durée d'un nœud
+        return self.durations[node_id]
     
     def add_node(self, node_label, duration):
+        # Ajoute un nœud au graphe avec son étiquette et sa durée ; renvoie son indice
         self.number_of_vertices += 1  # Incrémente le nombre de sommets
-        
-        # Ajoute un nœud au graphe avec son identifiant et sa durée
-        if node_label in self.node_ids:
-            # Affiche un avertissement si le nœud est déjà présent
-            Interface.printWarning(f"Tache {node_label} a deja été ajouté")
-        self.node_ids.add(node_label)
-        if duration or duration == 0:
-            # Affiche un avertissement si la durée du nœud est déjà définie
-            if node_label in self.duration_of:
-                Interface.printWarning(f"Tache {node_label} avait pour durée {duration[node_label]}\
-                                    et va être écrasé par {duration}")
-            self.duration_of[node_label] = duration
+        if node_label in self.labels:
+            # Avertissement si le nœud est déjà présent
+            self.warnings.append(f"Tache {node_label} a deja été ajouté")
+            node_id = self.labels.index(node_label)
+            if duration or duration == 0:
+                # Avertissement si la durée du nœud est déjà définie
+                self.warnings.append(f"Tache {node_label} avait pour durée {self.durations[node_id]} "
+                                     f"et va être écrasé par {duration}")
+                self.durations[node_id] = duration
+            return node_id
+        self.durations.append(duration or 0)
+        self.succ_offsets = None  # L'index devra être agrandi
+        if self.topological_order is not None:
+            self.topological_order.add_node()
+        return self.labels.append(node_label)
     
     def get_predecessor_of(self, node_id):
-        # Renvoie les prédécesseurs d'un nœud
-        return self.predecessors_of.get(node_id, set())
-    
-    def add_edge(self, from_node, to_node):
-        # Ajoute une arête du nœud from_node vers le nœud to_node
-        if to_node not in self.predecessors_of:
-            self.predecessors_of[to_node] = set()
-        self.predecessors_of[to_node].add(from_node)  # Ajoute le nœud from_node aux prédécesseurs du nœud to_node
-        self.node_ids_with_successor.add(
-            from_node)  # Ajoute le nœud from_node à l'ensemble des nœuds ayant des successeurs
+        # Renvoie les prédécesseurs d'un nœud (vue sur l'index CSR, dans l'ordre d'insertion)
+        self.build_index()
+        if node_id >= len(self.pred_offsets) - 1:
+            return self.pred_sources[:0]
+        return self.pred_sources[self.pred_offsets[node_id]:self.pred_offsets[node_id + 1]]
+    
+    @property
+    def predecessors_of(self):
+        # Dictionnaire des prédécesseurs de chaque nœud, reconstruit depuis l'index CSR
+        # (uniquement pour l'affichage : les algorithmes travaillent directement sur l'index).
+        # Les prédécesseurs sont listés dans l'ordre des anciens ensembles Python ; ceux d'Omega
+        # ont été insérés directement dans cet ordre par add_omega_edges.
+        self.build_index()
+        predecessors_of = {}
+        for to_node in np.flatnonzero(np.diff(self.pred_offsets)).tolist():
+            predecessors = self.get_predecessor_of(to_node).tolist()
+            if to_node != self.omega_node_id:
+                predecessors = list(set(predecessors))
+            predecessors_of[to_node] = predecessors
+        return predecessors_of
+    
+    def add_edge(self, from_label, to_label):
+        # Ajoute une arête de la tâche from_label vers la tâche to_label (étiquettes de nœuds existants).
+        # Si l'ordre topologique est maintenu, lève ValueError (sans ajouter l'arête) si elle crée un circuit
+        from_node, to_node = self.labels.index(from_label), self.labels.index(to_label)
+        if self.topological_order is not None:
+            cycle = self.topological_order.add_edge(from_node, to_node)
+            if cycle is not None:
+                raise ValueError(f"L'arc {from_label} -> {to_label} crée un circuit : "
+                                 + " -> ".join(str(self.labels[node]) for node in cycle))
+        self.edge_sources.append(from_node)
+        self.edge_targets.append(to_node)
         self.number_of_edges += 1  # Incrémente le nombre d'arêtes
+        self.succ_offsets = None  # L'index devra être reconstruit
     
     def add_omega_node(self):
-        # Ajoute le nœud Omega au graphe
-        self.omega_node_id = len(self.node_ids)
-        self.add_node(self.omega_node_id, None)  # Ajoute le nœud Omega sans durée
-        self.duration_of[self.omega_node_id] = 0
+        # Ajoute le nœud Omega au graphe, avec une étiquette distincte de celles des tâches
+        label = self.labels.next_integer_label() if self.labels.is_integer() else None
+        if label is None:
+            label = OMEGA_LABEL
+        self.omega_node_id = self.add_node(label, 0)
         self.number_of_vertices += 1  # Incrémente le nombre de sommets
     
     def add_omega_edges(self):
         # Ajoute des arêtes du nœud Omega vers les nœuds sans successeurs
-        node_w_no_successors = (self.node_ids - self.node_ids_with_successor) - {self.omega_node_id}
-        self.number_of_edges += len(node_w_no_successors)  # Incrémente le nombre d'arêtes
-        self.predecessors_of[self.omega_node_id] = node_w_no_successors
+        # (parcourus dans l'ordre de l'ensemble des nœuds sans successeurs, pour conserver l'ordre d'affichage)
+        self.build_index()
+        for node in self.nodes_without_successor(np.diff(self.succ_offsets) > 0):
+            if self.topological_order is not None:
+                self.topological_order.add_edge(int(node), self.omega_node_id)
+            self.edge_sources.append(node)
+            self.edge_targets.append(self.omega_node_id)
+            self.number_of_edges += 1
+        self.succ_offsets = None
+        self.build_index()
+    
+    def nodes_without_successor(self, has_successor):
+        # Nœuds sans successeurs (hors Omega), dans l'ordre d'itération de l'ancien ensemble Python
+        # (nœuds - nœuds ayant des successeurs) - {Omega}, qui fixe l'ordre d'affichage des prédécesseurs d'Omega.
+        # Le nœud initial n'est jamais relié à Omega, même s'il n'a pas de successeur (graphe cyclique)
+        has_successor[0] = True
+        node_w_no_successors = set(np.flatnonzero(~has_successor).tolist()) - {self.omega_node_id}
+        return np.fromiter(node_w_no_successors, dtype=np.int64, count=len(node_w_no_successors))
     
-    def add_edges(self, predecessors, node_id):
+    def add_edges(self, predecessors, node_label):
         # Ajoute les arcs entre les prédecesseurs et le nœud courant
         if predecessors:
             for pred in predecessors:
-                self.add_edge(pred, node_id)
+                self.add_edge(pred, node_label)
         # Si pas de prédecesseurs, relie au nœud initial (0)
         else:
-            self.add_edge(0, node_id)
-    
-    def get_nodes_with_no_predecessors(self, ignore=None):
-        # Retourne les nœuds sans prédecesseurs en ignorant certains nœuds (par défaut, aucun)
-        if ignore is None:
-            ignore = set()
-        predOf = copy.deepcopy(self.predecessors_of)
-        nodes_with_no_pred = set()
-        # Parcours tous les nœuds et retire les prédecesseurs ignorés
-        for node in predOf.keys():
-            predOf[node] -= ignore
-            # Si aucun prédecesseurs restant, ajoute le nœud à la liste
-            if not predOf[node]:
-                nodes_with_no_pred.add(node)
-        # Si aucun nœud sans prédecesseurs, ajoute le nœud initial (0)
-        if not nodes_with_no_pred:
-            nodes_with_no_pred = {0}
-        return nodes_with_no_pred - ignore
+            self.add_edge(ALPHA_LABEL, node_label)
+    
+    def topological_sort(self):
+        """
+        Tri topologique de Kahn (compteurs de degrés entrants) en O(n + e).
+        Renvoie (order, level_offsets, cycle) :
+         - order : les nœuds éliminés, niveau par niveau (identifiants croissants dans un niveau)
+         - level_offsets : le niveau k est order[level_offsets[k]:level_offsets[k + 1]]
+         - cycle : None si le graphe est acyclique, sinon une liste de nœuds formant un circuit
+        Le résultat (en lecture seule) est gardé jusqu'à la prochaine reconstruction de l'index.
+        """
+        self.build_index()
+        if self.topological_levels is not None and self.topological_levels[0] is self.succ_offsets:
+            return self.topological_levels[1]
+        # Étape de profilage propre au tri, qui n'est calculé qu'une fois : ses compteurs sont rattachés
+        # au tri lui-même, quelle que soit l'étape qui l'a demandé en premier
+        with Profiling.phase("topological_sort"):
+            n = self.get_number_of_nodes()
+            
+            # Degré entrant de chaque nœud du graphe
+            in_degree = np.diff(self.pred_offsets)
+            
+            # Premier niveau : les points d'entrée
+            offsets, targets = self.succ_offsets, self.succ_targets
+            frontier = np.flatnonzero(in_degree == 0)
+            levels = []
+            while len(frontier):
+                levels.append(frontier)
+                # Niveau étroit (graphe profond) : les passes NumPy coûtent plus cher que de parcourir
+                # ses quelques arcs un par un
+                if len(frontier) <= SCALAR_LEVEL_EDGES:
+                    bounds = [(int(offsets[u]), int(offsets[u + 1])) for u in frontier.tolist()]
+                    if sum(stop - start for start, stop in bounds) <= SCALAR_LEVEL_EDGES:
+                        ready = []
+                        for start, stop in bounds:
+                            for v in targets[start:stop].tolist():
+                                in_degree[v] -= 1
+                                if not in_degree[v]:
+                                    ready.append(v)
+                        ready.sort()
+                        frontier = np.array(ready, dtype=np.int64)
+                        continue
+                # Décrémente le degré entrant de tous les successeurs du niveau en une seule passe
+                successors = gather(offsets, targets, frontier)
+                touched, counts = np.unique(successors, return_counts=True)
+                in_degree[touched] -= counts
+                frontier = touched[in_degree[touched] == 0]
+            
+            order = np.concatenate(levels) if levels else np.empty(0, dtype=np.int64)
+            level_offsets = np.zeros(len(levels) + 1, dtype=np.int64)
+            np.cumsum([len(level) for level in levels], out=level_offsets[1:])
+            # Chaque niveau est une étape d'élimination ; chaque nœud éliminé est passé une fois par la file
+            Profiling.count("elimination_rounds", len(levels))
+            Profiling.count("queue_pushes", len(order))
+            
+            cycle = None
+            if len(order) < n:
+                cycle = self.find_cycle(in_degree > 0)
+        order.setflags(write=False)
+        level_offsets.setflags(write=False)
+        self.topological_levels = self.succ_offsets, (order, level_offsets, cycle)
+        return order, level_offsets, cycle
+    
+    def maintain_topological_order(self):
+        """
+        Maintient désormais un ordre topologique (TopologicalOrder) à chaque ajout de nœud ou d'arc :
+        un arc qui créerait un circuit est refusé dès son ajout, sans reconstruire l'index ni refaire
+        le tri complet. Lève ValueError si le graphe contient déjà un circuit.
+        """
+        order, _, cycle = self.topological_sort()
+        if cycle is not None:
+            raise ValueError("Le graphe contient un circuit : " + " -> ".join(str(self.labels[node]) for node in cycle))
+        n = self.get_number_of_nodes()
+        succ_targets, pred_sources = self.succ_targets.tolist(), self.pred_sources.tolist()
+        succ_offsets, pred_offsets = self.succ_offsets.tolist(), self.pred_offsets.tolist()
+        self.topological_order = TopologicalOrder(
+            order.tolist(),
+            [succ_targets[succ_offsets[u]:succ_offsets[u + 1]] for u in range(n)],
+            [pred_sources[pred_offsets[u]:pred_offsets[u + 1]] for u in range(n)])
+        return self.topological_order
+    
+    def find_cycle(self, remaining):
+        # Remonte les prédécesseurs restants à partir d'un nœud non éliminé jusqu'à revenir
+        # sur un nœud déjà visité : la portion parcourue depuis ce nœud est un circuit
+        node = int(np.flatnonzero(remaining)[0])
+        position = {}
+        path = []
+        while node not in position:
+            position[node] = len(path)
+            path.append(node)
+            predecessors = self.get_predecessor_of(node)
+            node = int(predecessors[remaining[predecessors]][0])
+        return path[position[node]:][::-1]
+    
+    def build_index(self):
+        # Construit l'index CSR des successeurs et des prédécesseurs à partir des arcs ajoutés.
+        # Ne fait rien si l'index est déjà à jour.
+        if self.succ_offsets is not None:
+            return
+        sources = np.asarray(self.edge_sources, dtype=np.int64)
+        targets = np.asarray(self.edge_targets, dtype=np.int64)
+        n = len(self.durations)
+        
+        # Reprend les arcs déjà indexés avant les nouveaux (l'ordre des prédécesseurs est l'ordre d'insertion)
+        if self.pred_offsets is not None:
+            indexed_targets = np.repeat(np.arange(len(self.pred_offsets) - 1), np.diff(self.pred_offsets))
+            sources = np.concatenate((self.pred_sources.astype(np.int64), sources))
+            targets = np.concatenate((indexed_targets, targets))
+        self.edge_sources = []
+        self.edge_targets = []
+        
+        # Supprime les arcs en double en gardant la première occurrence
+        _, first = np.unique(sources * n + targets, return_index=True)
+        keep = np.sort(first)
+        sources, targets = sources[keep], targets[keep]
+        
+        # Successeurs triés par identifiant, prédécesseurs dans l'ordre d'insertion
+        order = np.lexsort((targets, sources))
+        self.succ_targets = targets[order].astype(np.int32)
+        self.succ_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=self.succ_offsets[1:])
+        
+        order = np.argsort(targets, kind="stable")
+        self.pred_sources = sources[order].astype(np.int32)
+        self.pred_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=self.pred_offsets[1:])
+    
+    def get_number_of_nodes(self):
+        # Nombre de nœuds (alpha et Omega compris) : les indices vont de 0 à n - 1
+        return len(self.durations)
     
     def get_successors_of(self, from_node):
-        return [to_node for to_node, dur in enumerate(self.adjacency_matrix[from_node]) if dur != -1]
+        # Renvoie les successeurs d'un nœud (vue sur l'index CSR, par identifiant croissant)
+        self.build_index()
+        return self.succ_targets[self.succ_offsets[from_node]:self.succ_offsets[from_node + 1]]
+    
+    def get_adjacency_matrix(self):
+        # Construit à la demande la matrice d'adjacence dense n×n (réservée à l'affichage des petits graphes) :
+        # la case [u][v] vaut la durée de u s'il existe un arc u → v, -1 sinon
+        self.build_index()
+        n = self.get_number_of_nodes()
+        adjacency_matrix = np.full((n, n), -1, dtype=int)
+        sources, targets = self.get_edges()
+        adjacency_matrix[sources, targets] = self.get_durations()[sources]
+        return adjacency_matrix
+    
+    def get_edges(self):
+        # Renvoie tous les arcs sous forme de deux tableaux (origines, extrémités), triés par origine
+        self.build_index()
+        sources = np.repeat(np.arange(self.get_number_of_nodes()), np.diff(self.succ_offsets))
+        return sources, self.succ_targets
+    
+    def get_durations(self):
+        # Renvoie une copie des durées sous forme de tableau NumPy indexé par nœud
+        return np.array(self.durations, dtype=np.int64)
     
     def get_ranks_and_ids(self):
-        ranks = []
-        ids = []
-        # Parcours de la liste de tuples 'ranks_and_ids'
-        for tup in self.ranks_and_ids:
-            # Ajout du premier élément du tuple (le rang) à la liste des rangs
-            ranks.append(tup[0])
-            # Ajout du deuxième élément du tuple (l'identifiant) à la liste des identifiants
-            ids.append(tup[1])
-        
-        # Retourne un tuple contenant les deux listes
-        return ranks, ids
+        # Retourne les rangs alignés sur les identifiants triés par rang croissant
+        ranks, ids = self.ranks_and_ids
+        return ranks[ids], ids
+
+
+def gather(offsets, targets, nodes):
+    # Concatène les listes d'adjacence (CSR) de plusieurs nœuds en une seule opération vectorisée
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    if not counts.sum():
+        return targets[:0]
+    shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return targets[shifts + np.arange(counts.sum())]
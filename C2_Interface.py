@@ -1,4 +1,29 @@
+import functools
+import math
+import sys
+
+import C2_Profiling as Profiling
+import numpy as np
+
 SHIFT = " " * 3
+# Au-delà de ces tailles, l'affichage console passe à une vue creuse ou tronquée
+# (write_report écrit toujours le rapport complet dans un fichier)
+MATRIX_MAX_NODES = 50
+TABLE_MAX_ROWS = 500
+# Vue résumée de l'élimination des points d'entrée et du tri topologique (plus de MATRIX_MAX_NODES
+# sommets) : nombre maximal de niveaux affichés et de nœuds affichés par niveau ou par ligne
+ELIMINATION_MAX_LEVELS = 50
+LEVEL_MAX_NODES = 20
+# Vue tronquée des chemins critiques : nombre maximal de chemins affichés, et de nœuds affichés
+# par chemin (les premiers et les derniers)
+PATHS_MAX_SHOWN = 20
+PATH_MAX_NODES = 40
+# Nombre de lignes formatées et écrites par bloc
+WRITE_CHUNK_ROWS = 1 << 14
+# Nombre maximal de chiffres d'un nombre de chemins critiques donné en entier (affichage et JSON) :
+# au-delà il est écrit en notation scientifique, la conversion en décimal d'un très grand entier
+# étant limitée par Python (sys.get_int_max_str_digits)
+PATH_COUNT_MAX_DIGITS = 100
 
 
 # ====================   INPUT   ==================================
@@ -38,71 +63,244 @@ def ask_for_an_other_table():
 
 # ====================   AFFICHAGE   ==================================
 
+def print_analysis(analysis):
+    # Affiche le rapport complet d'une analyse (C2_Analysis.Analysis), étape par étape
+    graph = analysis.graph
+    printTitle(f"* Création du graphe d'ordonnancement {analysis.name} :\n")
+    print_warnings(analysis.warnings)
+    if not analysis.is_valid():
+        print_table_errors(analysis.name, analysis.errors)
+        return
+    with Profiling.phase("print_graph"):
+        print_graph(graph)
+    with Profiling.phase("print_adjacency_matrix"):
+        print_adjacency_matrix(graph)
+    
+    # Vérification des propriétés d'un graphe d'ordonnancement (arrêt à la première non vérifiée)
+    with Profiling.phase("print_elimination"):
+        print_elimination(graph, analysis.order, analysis.level_offsets, analysis.cycle)
+    if analysis.cycle is None:
+        print_negative_durations(analysis.negative_durations, graph.labels)
+        if not analysis.negative_durations:
+            print_alpha_successors(analysis.source_successors, graph.labels)
+    
+    if not analysis.is_scheduling_graph():
+        printError(f"Le graphe de {analysis.name} n'est pas un graphe d'ordonnancement\n IL est impossible de "
+                   f"calculer les calendriers et les marges\n")
+        return
+    printGreen("C'est un graphe d'ordonnancement")
+    with Profiling.phase("print_ranks"):
+        printRanks((analysis.ranks, analysis.ids), graph.labels)
+    with Profiling.phase("print_schedules"):
+        print_schedules(analysis.early_schedule, analysis.late_schedule, graph.labels)
+    with Profiling.phase("print_marges"):
+        print_marges(analysis.total_margin, analysis.free_margin, graph.labels)
+    # Les chemins critiques sont énumérés (find_paths) au fur et à mesure de leur affichage
+    with Profiling.phase("print_critical_paths"):
+        longest_path = print_critical_paths(analysis.critical_paths, graph.labels)
+    if longest_path is not None:
+        with Profiling.phase("print_total_length"):
+            print_total_length(graph, longest_path, analysis.project_duration)
+    if analysis.near_critical_paths:
+        print_near_critical_paths(analysis.near_critical_paths, graph.labels)
+
 
 def print_graph(graph):
     # Affiche le nombre de sommets et d'arcs
     printShift(f"{len(graph.node_ids)} sommets")
     printShift(f"{graph.number_of_edges} arcs")
-    # Parcours tous les nœuds avec leurs prédecesseurs et affiche la durée de chaque arc
+    # Parcours tous les nœuds avec leurs prédecesseurs et affiche la durée de chaque arc,
+    # en un seul bloc (tronqué au-delà de TABLE_MAX_ROWS arcs)
+    lines = []
     for to_node, from_nodes in (graph.predecessors_of.items()):
         for from_node in from_nodes:
-            duration = graph.duration_of[from_node]
-            printShift(f"{from_node} -> {to_node} = {duration}")
+            lines.append(f"{SHIFT}{graph.label_of(from_node)} -> {graph.label_of(to_node)} = "
+                         f"{graph.get_duration(from_node)}")
+        if len(lines) > TABLE_MAX_ROWS:
+            lines = lines[:TABLE_MAX_ROWS] + [f"{SHIFT}... ({graph.number_of_edges - TABLE_MAX_ROWS} arcs non affichés)"]
+            break
+    lines.append("")
+    write_lines(lines)
+
+
+def print_table_errors(name, errors):
+    # Affiche toutes les lignes invalides d'un tableau de contraintes
+    printError(f"{name} n'est pas valide :")
+    for num_line, line in errors:
+        if num_line is None:
+            printError(line)
+        else:
+            printError(f"A la ligne {num_line} : \"{line}\"")
+
+
+def print_warnings(warnings):
+    for warning in warnings:
+        printWarning(warning)
+
+
+def print_elimination(graph, order, level_offsets, cycle):
+    # Affiche la détection de circuit par la méthode d'élimination des points d'entrée,
+    # à partir des niveaux du tri topologique (Graph.topological_sort)
+    
+    # Afficher le premier et le dernier nœud.
+    # Nous savons qu'ils existent et son unique, car nous les avons cree
+    printGreen(f"Il y a un seul point d'entré, {graph.label_of(0)}")
+    printGreen(f"Il y a un seul point de sortie, {graph.label_of(graph.omega_node_id)}\n")
+    
+    # Afficher l'en-tête pour la section de détection de circuit
+    printTitle(f"* Détection de circuit :")
+    printBold(f"Méthode d'élimination des points d'entrée\n")
+    
+    if len(graph.node_ids) > MATRIX_MAX_NODES:
+        print_elimination_summary(graph, order, level_offsets)
+    else:
+        print_elimination_steps(graph, order, level_offsets)
+    
+    if cycle is not None:
+        # Si aucun point d'entrée n'est trouvé alors qu'il reste des sommets, le graphe est cyclique
+        printShift("Noeud sans prédecesseurs : Aucun")
+        printError(f"Le graphe de {graph.name} contient au moins un cycle")
+        return
+    
     print()
+    # Si aucun cycle n'a été trouvé, afficher un message indiquant que le graphe est acyclique
+    printGreen("Il n'y a pas de cycle")
+
+
+def print_elimination_steps(graph, order, level_offsets):
+    # Affichage détaillé de chaque étape d'élimination (petits graphes)
+    
+    # Initialiser les ensembles de nœuds supprimés et les nœuds restants
+    suppressed_nodes = set()
+    nodes_remaining = set(graph.node_ids)
+    # Nœuds éliminés (hors nœud initial), triés par identifiant
+    eliminated = []
+    
+    # Chaque niveau du tri topologique est une étape d'élimination des points d'entrée
+    for level_index in range(len(level_offsets) - 1):
+        level = order[level_offsets[level_index]:level_offsets[level_index + 1]].tolist()
+        
+        # Construire l'ensemble des points d'entrée avec les mêmes insertions que la méthode
+        # d'élimination, afin de conserver l'ordre d'affichage des traces d'exécution
+        if suppressed_nodes:
+            eliminated = sorted(eliminated + level)
+            starting_nodes = set(eliminated) - suppressed_nodes
+        else:
+            starting_nodes = set(level)
+        printShift(f'Noeud sans prédecesseurs : ', end='')
+        printNodes(starting_nodes, graph.labels)
+        
+        # Afficher les nœuds sans prédécesseurs trouvés
+        printShift(f"Point d'entrée : ", end="")
+        printNodes(starting_nodes, graph.labels)
+        
+        # Supprimer les nœuds sans prédécesseurs des nœuds restants
+        printShift("Suppression des points d'entrée")
+        nodes_remaining -= starting_nodes
+        
+        # Si des nœuds restent, afficher les nœuds restants
+        if nodes_remaining:
+            printShift(f"Sommets restant : ", end="")
+            printNodes(nodes_remaining, graph.labels)
+        else:
+            printShift(f"Sommets restant : Aucun")
+        
+        # Ajouter les nœuds supprimés à l'ensemble des nœuds supprimés
+        suppressed_nodes |= starting_nodes
+
+
+def print_elimination_summary(graph, order, level_offsets):
+    # Vue résumée des grands graphes : au plus ELIMINATION_MAX_LEVELS niveaux et LEVEL_MAX_NODES points
+    # d'entrée par niveau ; les sommets restants sont comptés au fur et à mesure, sans être listés
+    number_of_levels = len(level_offsets) - 1
+    remaining = len(graph.node_ids)
+    lines = []
+    for level_index in range(min(number_of_levels, ELIMINATION_MAX_LEVELS)):
+        start, stop = int(level_offsets[level_index]), int(level_offsets[level_index + 1])
+        remaining -= stop - start
+        lines.append(f"{SHIFT}Point d'entrée ({stop - start}) : {format_nodes(order[start:stop], graph.labels)}")
+        lines.append(f"{SHIFT}Sommets restant : {remaining or 'Aucun'}")
+    if number_of_levels > ELIMINATION_MAX_LEVELS:
+        lines.append(f"{SHIFT}... ({number_of_levels - ELIMINATION_MAX_LEVELS} niveaux non affichés, "
+                     f"{len(graph.node_ids) - int(level_offsets[-1]) or 'aucun'} sommet(s) restant)")
+    write_lines(lines)
+
+
+def print_negative_durations(negative_durations, labels=None):
+    if negative_durations:
+        node, dur = negative_durations[0]
+        printError(f"La tache {label_of(node, labels)} est de duration negative {dur}")
+        return
+    
+    printGreen(
+        "Les valeurs pour tous les arcs incidents vers l'extérieur à un sommet sont identiques")
+    printGreen("Il n'y a pas d'arc négatifs")
+
+
+def print_alpha_successors(successors, labels=None):
+    successors = to_labels(successors, labels)
+    num_successors = len(successors)
+    if num_successors == 0:
+        # Si aucun successeur, il n'y a pas de source unique
+        printError("Le graphe ne possède pas une unique source")
+    elif num_successors == 1:
+        # Si un seul successeur, affiche l'arc 0->successeur est nul
+        printGreen(f"L'arc 0->{successors[0]} est nul")
+    else:
+        # Si plusieurs successeurs, affiche les arcs 0 → successeurs sont nuls
+        printGreen("Les arcs", end="")
+        for i, succ in enumerate(successors):
+            if i != num_successors - 1:
+                print(f" 0->{succ}", end="")
+            else:
+                print(f" et 0->{succ} sont nuls")
 
 
 def print_adjacency_matrix(graph):
     if graph:
+        nodes = list(graph.node_ids)
+        if len(nodes) > MATRIX_MAX_NODES:
+            # Matrice trop grande pour être lisible : vue creuse tronquée (liste des arcs par ligne)
+            printTitle(f"* Matrice des valeurs de {graph.name} (vue creuse, {len(nodes)} sommets, "
+                       f"{graph.number_of_edges} arcs) :\n")
+            write_lines(sparse_matrix_lines(graph, nodes[:TABLE_MAX_ROWS]))
+            if len(nodes) > TABLE_MAX_ROWS:
+                printShift(f"... ({len(nodes) - TABLE_MAX_ROWS} lignes non affichées)\n")
+            return
+        
+        # Construction à la demande de la matrice dense à partir de l'index CSR
+        adjacency_matrix = graph.get_adjacency_matrix()
+        
         # Titre de la matrice
         printTitle(f"* Matrice des valeurs de {graph.name} :", end="\n\n  ")
         
-        # Affichage de la première ligne
-        printShift(f" ", end="")
-        for node in graph.node_ids:
-            print("%2.d " % node, end="")
-        print(f"", end="\n")
+        # Première ligne : identifiants des colonnes
+        lines = [SHIFT + " " + "".join(label_cell(graph.label_of(node)) + " " for node in nodes)]
         
-        # Affichage de chaque ligne
-        for from_node in graph.node_ids:
-            # Affichage de l'identifiant de la ligne
-            printShift("%2.d|" % from_node, end="")
-            
-            # Initialisation de la première itération
-            first_iteration = True
-            last_iteration = False
-            if from_node == len(graph.node_ids) - 1:
-                last_iteration = True
-            
-            # Affichage de chaque colonne
-            for to_node in graph.node_ids:
-                # Récupération de la durée de l'arc entre les deux nœuds
-                dur = graph.adjacency_matrix[from_node][to_node]
-                
-                # Affichage d'un espace avant la valeur sauf pour la première itération
-                shift = " "
-                if first_iteration:
-                    shift = ""
-                prefix = ""
-                if last_iteration:
-                    prefix = f""
-                
-                # Si l'arc existe, affichage de sa durée, sinon affichage d'un point
-                if dur != -1:
-                    print(prefix + " %2.d" % dur, end="")
-                else:
-                    print(prefix + shift + " .", end="")
-                
-                # Fin de la première itération
-                first_iteration = False
-                
-                if to_node == len(graph.node_ids) - 1:
-                    print(f" |", end="")
-            
-            # Passage à la ligne suivante
-            print()
+        # Une ligne par nœud : durée de chaque arc, ou un point s'il n'existe pas
+        # (la première colonne n'est pas précédée d'un espace)
+        for from_node, row in zip(nodes, adjacency_matrix.tolist()):
+            cells = [" %2.d" % dur if dur != -1 else "  ." for dur in row]
+            if row and row[0] == -1:
+                cells[0] = " ."
+            lines.append(SHIFT + label_cell(graph.label_of(from_node)) + "|" + "".join(cells) + " |")
         
-        # Passage à la ligne suivante pour aérer l'affichage
-        print()
+        # Ligne vide pour aérer l'affichage
+        lines.append("")
+        write_lines(lines)
+
+
+def sparse_matrix_lines(graph, nodes):
+    # Lignes non nulles de la matrice des valeurs : "origine| destination=durée ..."
+    graph.build_index()
+    lines = []
+    for from_node in nodes:
+        successors = graph.get_successors_of(from_node).tolist()
+        if successors:
+            duration = graph.get_duration(from_node)
+            lines.append(SHIFT + label_cell(graph.label_of(from_node)) + "|" +
+                         "".join(f" {graph.label_of(to_node)}={duration}" for to_node in successors))
+    return lines
 
 
 def print_schedule_line(string, remaining_space):
@@ -112,130 +310,219 @@ def print_schedule_line(string, remaining_space):
     return (remaining_space // 2) * " " + string + ((remaining_space // 2) + shift) * " "
 
 
-def print_schedules(calendrier_tot, calendrier_tard):
-    # Titre de la section
-    printTitle("\n* Calendriers :\n")
+@functools.lru_cache(maxsize=1 << 16)
+def schedule_cell(value, size):
+    # Cellule centrée d'un tableau ; les valeurs se répètent beaucoup, d'où le cache
+    string = str(value)
+    return print_schedule_line(string, size - len(string))
+
+
+def table_lines(titles, column2, column3, start=0, stop=None, labels=None):
+    """
+    Génère les lignes des nœuds start à stop (exclu) d'un tableau à trois colonnes
+    (étiquette de la tâche, column2, column3), par blocs de WRITE_CHUNK_ROWS lignes.
+    """
+    stop = len(column2) if stop is None else stop
+    size1, size2, size3 = len(titles[0]), len(titles[1]), len(titles[2]) + 1
+    for chunk_start in range(start, stop, WRITE_CHUNK_ROWS):
+        chunk_stop = min(chunk_start + WRITE_CHUNK_ROWS, stop)
+        values2 = np.asarray(column2[chunk_start:chunk_stop]).tolist()
+        values3 = np.asarray(column3[chunk_start:chunk_stop]).tolist()
+        tasks = to_labels(range(chunk_start, chunk_stop), labels)
+        yield [f"  | {schedule_cell(task, size1)} | {schedule_cell(value2, size2)} | {schedule_cell(value3, size3)}|"
+               for task, value2, value3 in zip(tasks, values2, values3)]
+
+
+def print_table(title, titles, column2, column3, labels=None):
+    # Affiche un tableau à trois colonnes en une seule écriture, tronqué au-delà de TABLE_MAX_ROWS lignes
+    if len(column2) != len(column3):
+        raise ValueError(f"Les colonnes du tableau '{title}' ne sont pas de même taille")
+    printTitle(f"\n* {title} :\n")
     
-    if len(calendrier_tard) != len(calendrier_tot):
-        raise "Error: in print_schedules: Verifiez que les calendriers au plus tard et au plus tot sont de meme " \
-              "tailles"
-    
-    # Espacement avant chaque ligne
-    shift = "  "
-    
-    # Titres des colonnes
-    title1 = "Taches"
-    title2 = "Dates au plus tot"
-    title3 = "Dates au plus tard"
-    
-    # Tailles des colonnes
-    size1 = len(title1)
-    size2 = len(title2)
-    size3 = len(title3) + 1
-    
-    # Affichage des titres
-    print(shift, end="")
-    print(f"  {title1}   {title2}   {title3} ")
-    
-    # Variable pour indiquer si on est sur la dernière ligne
-    is_last_line = False
-    
-    # Parcours des tâches dans l'ordre de la liste des identifiants
-    for task in range(len(calendrier_tard)):
-        if task == len(calendrier_tard) - 1:
-            is_last_line = True
+    lines = [f"    {titles[0]}   {titles[1]}   {titles[2]} "]
+    rows = len(column2)
+    if rows > TABLE_MAX_ROWS:
+        # Vue tronquée : premières et dernières tâches
+        half = TABLE_MAX_ROWS // 2
+        for block in table_lines(titles, column2, column3, 0, half, labels):
+            lines += block
+        lines.append(f"  ... ({rows - 2 * half} tâches non affichées)")
+        for block in table_lines(titles, column2, column3, rows - half, rows, labels):
+            lines += block
+    else:
+        for block in table_lines(titles, column2, column3, labels=labels):
+            lines += block
+    lines.append("")
+    write_lines(lines)
+
+
+def print_schedules(calendrier_tot, calendrier_tard, labels=None):
+    print_table("Calendriers", ("Taches", "Dates au plus tot", "Dates au plus tard"), calendrier_tot,
+                calendrier_tard, labels)
+
+
+def print_marges(marge_totale, marge_libre, labels=None):
+    print_table("Marges", ("Taches", "Marges Totales", "Marges Libres"), marge_totale, marge_libre, labels)
+
+
+def write_lines(lines, out=None):
+    # Écrit un bloc de lignes en une seule écriture
+    if lines:
+        (out or sys.stdout).write("\n".join(lines) + "\n")
+
+
+def write_report(analysis, path):
+    """
+    Écrit le rapport complet d'une analyse dans un fichier, sans troncature : liste des arcs,
+    rangs, calendriers, marges et chemins critiques. Le texte est produit et écrit bloc par bloc,
+    sans jamais être entièrement en mémoire.
+    """
+    graph = analysis.graph
+    with open(path, "w") as f:
+        f.write(f"* Graphe d'ordonnancement {analysis.name}\n\n")
+        for warning in analysis.warnings:
+            f.write(f"Warning: {warning}\n")
+        if not analysis.is_valid():
+            write_lines([line if num_line is None else f"A la ligne {num_line} : \"{line}\""
+                         for num_line, line in analysis.errors], f)
+            return
+        f.write(f"{SHIFT}{len(graph.node_ids)} sommets\n{SHIFT}{graph.number_of_edges} arcs\n\n")
         
-        # Affichage de l'identifiant de la tâche
-        cell1 = print_schedule_line(str(task), (size1 - len(str(task))))
+        # Arcs, par nœud d'origine
+        f.write(f"* Matrice des valeurs (vue creuse) :\n\n")
+        nodes = graph.node_ids
+        for start in range(0, len(nodes), WRITE_CHUNK_ROWS):
+            write_lines(sparse_matrix_lines(graph, nodes[start:start + WRITE_CHUNK_ROWS]), f)
         
-        # Affichage de la date au plus tot de la tâche
-        early_date = str(calendrier_tot[task])
-        cell2 = print_schedule_line(early_date, size2 - len(early_date))
+        if analysis.cycle is not None:
+            f.write(f"\nLe graphe contient un circuit : {format_path(analysis.cycle, graph.labels)}\n")
+            return
+        if not analysis.is_scheduling_graph():
+            f.write("\nCe n'est pas un graphe d'ordonnancement\n")
+            return
         
-        # Affichage de la date au plus tard de la tâche
-        late_date = str(calendrier_tard[task])
-        cell3 = print_schedule_line(late_date, size3 - len(late_date))
+        # Rangs, dans l'ordre du tri topologique
+        f.write("\n* Tri topologique (tâche : rang) :\n\n")
+        for start in range(0, len(analysis.ids), WRITE_CHUNK_ROWS):
+            ids = analysis.ids[start:start + WRITE_CHUNK_ROWS]
+            write_lines([f"{SHIFT}{task} : {rank}" for task, rank in
+                         zip(to_labels(ids.tolist(), graph.labels), analysis.ranks[ids].tolist())], f)
         
-        # Affichage de la ligne
-        if is_last_line:
-            print(f"{shift}| {cell1} | {cell2} | {cell3}|")
-        else:
-            print(f"{shift}| {cell1} | {cell2} | {cell3}|")
-    print()
-
-
-def print_marges(marge_totale, marge_libre):
-    printTitle("\n* Marges :\n")
-    
-    if len(marge_totale) != len(marge_libre):
-        raise "Error: in print_schedules: Verifiez que les marges totales et les marges libres sont de meme " \
-              "tailles"
-    
-    # Espacement avant chaque ligne
-    shift = "  "
-    
-    # Titres des colonnes
-    title1 = "Taches"
-    title2 = "Marges Totales"
-    title3 = "Marges Libres"
-    
-    # Tailles des colonnes
-    size1 = len(title1)
-    size2 = len(title2)
-    size3 = len(title3) + 1
-    
-    # Affichage des titres
-    print(shift, end="")
-    print(f"  {title1}   {title2}   {title3} ")
-    
-    # Variable pour indiquer si on est sur la dernière ligne
-    is_last_line = False
-    
-    # Parcours des tâches dans l'ordre de la liste des identifiants
-    for task in range(len(marge_totale)):
-        if task == len(marge_totale) - 1:
-            is_last_line = True
+        # Calendriers et marges
+        for title, titles, column2, column3 in (
+                ("Calendriers", ("Taches", "Dates au plus tot", "Dates au plus tard"),
+                 analysis.early_schedule, analysis.late_schedule),
+                ("Marges", ("Taches", "Marges Totales", "Marges Libres"), analysis.total_margin,
+                 analysis.free_margin)):
+            f.write(f"\n* {title} :\n\n    {titles[0]}   {titles[1]}   {titles[2]} \n")
+            for block in table_lines(titles, column2, column3, labels=graph.labels):
+                write_lines(block, f)
         
-        # Affichage de l'identifiant de la tâche
-        cell1 = print_schedule_line(str(task), (size1 - len(str(task))))
-        
-        # Affichage de la date au plus tot de la tâche
-        early_date = str(marge_totale[task])
-        cell2 = print_schedule_line(early_date, size2 - len(early_date))
-        
-        # Affichage de la date au plus tard de la tâche
-        late_date = str(marge_libre[task])
-        cell3 = print_schedule_line(late_date, size3 - len(late_date))
-        
-        # Affichage de la ligne
-        if is_last_line:
-            print(f"{shift}| {cell1} | {cell2} | {cell3}|")
-        else:
-            print(f"{shift}| {cell1} | {cell2} | {cell3}|")
+        # Chemins critiques, au fur et à mesure de leur énumération
+        f.write("\n* Chemins critiques :\n\n")
+        block = []
+        for path in analysis.critical_paths:
+            block.append(format_path(path, graph.labels))
+            if len(block) == WRITE_CHUNK_ROWS:
+                write_lines(block, f)
+                block = []
+        write_lines(block, f)
+        f.write(f"\nDurée minimale du projet : {analysis.project_duration} jours\n")
+
+
+def print_critical_paths(paths, labels=None):
+    # Affiche les chemins au fur et à mesure de leur énumération et renvoie le premier (None s'il n'y en a pas).
+    # Au-delà de PATHS_MAX_SHOWN chemins, l'énumération est arrêtée et le nombre de chemins restants affiché ;
+    # chaque chemin est tronqué à PATH_MAX_NODES nœuds (write_report écrit les chemins complets)
+    count = 0
+    first_path = None
+    for path in paths:
+        if count == PATHS_MAX_SHOWN:
+            total = paths.total_count() if hasattr(paths, "total_count") else len(paths)
+            printShift(f"... ({format_path_count(total - count)} chemins critiques non affichés)")
+            return first_path
+        if count == 0:
+            printTitle("* Chemins critiques:")
+            first_path = path
+        printGreen(format_path(path, labels, PATH_MAX_NODES))
+        count += 1
+    if count == 0:
+        printTitle("Aucun chemin critique.")
+    elif getattr(paths, "truncated", False):
+        printWarning(f"Énumération interrompue après {count} chemins critiques "
+                     f"sur {format_path_count(paths.total_count())}")
+    return first_path
+
+
+def print_total_length(graph, longest_path, project_duration):
+    # Tous les chemins critiques ont la même longueur, la durée du projet : on affiche le premier
+    # chemin déjà affiché par print_critical_paths, sans relancer l'énumération
+    print("\nLe plus long chemin critique est : ")
+    printGreen(format_path(longest_path, graph.labels, PATH_MAX_NODES))
+    print(f"de longueur {project_duration} jours. ")
+    print(f"Il faudra au minimum {project_duration} jours pour réaliser le projet {graph.name}.\n")
+
+
+def print_near_critical_paths(paths, labels=None):
+    # Affiche les plus longs chemins avec leur longueur et leur marge par rapport au chemin critique
+    printTitle(f"* {len(paths)} plus longs chemins :")
+    for path, length, slack in paths:
+        printGreen(format_path(path, labels, PATH_MAX_NODES) + f" : longueur {length} jours, marge {slack} jours")
     print()
 
 
-def print_critical_paths(paths):
-    if paths:
-        printTitle("* Chemins critiques:")
-        for path in paths:
-            string = ""
-            for node in path:
-                if node == path[-1]:
-                    string += f"{node}"
-                else:
-                    string += f"{node}->"
-            printGreen(string)
-    else:
-        printTitle("Aucun chemin critique.")
+def format_nodes(nodes, labels=None, limit=LEVEL_MAX_NODES):
+    # Étiquettes des limit premiers nœuds d'un tableau, suivies du nombre de nœuds non affichés
+    shown = " ".join(str(label) for label in to_labels(nodes[:limit].tolist(), labels))
+    return shown if len(nodes) <= limit else f"{shown} ... ({len(nodes) - limit} autres)"
 
 
-def printNodes(nodes):
+def printNodes(nodes, labels=None):
     for node_id in nodes:
-        print(node_id, end=" ")
+        print(label_of(node_id, labels), end=" ")
     print()
 
 
+def label_of(node, labels=None):
+    # Étiquette externe d'un nœud (les algorithmes travaillent sur des indices denses)
+    return node if labels is None else labels[node]
+
+
+def to_labels(nodes, labels=None):
+    # Étiquettes externes d'une suite de nœuds
+    return list(nodes) if labels is None else [labels[node] for node in nodes]
+
+
+def label_cell(label):
+    # Étiquette sur deux caractères au moins, pour les colonnes de la matrice et des rangs
+    return "%2.d" % label if isinstance(label, int) else "%2s" % label
+
+
+def format_path(path, labels=None, limit=None):
+    # Chemin sous la forme a->b->c ; au-delà de limit nœuds, seuls les premiers et les derniers sont affichés
+    if limit is None or len(path) <= limit:
+        return "->".join(str(label) for label in to_labels(path, labels))
+    half = limit // 2
+    return (format_path(path[:half], labels) + f"->... ({len(path) - 2 * half} tâches non affichées) ...->"
+            + format_path(path[-half:], labels))
+
+
+def format_path_count(count):
+    # Nombre de chemins critiques : l'entier lui-même s'il a au plus PATH_COUNT_MAX_DIGITS chiffres,
+    # sinon une chaîne en notation scientifique tronquée à trois chiffres significatifs ("3.52e+4771")
+    count = int(count)
+    if count < 10 ** PATH_COUNT_MAX_DIGITS:
+        return count
+    # log10 d'un entier Python est exact à une unité près : l'exposant est corrigé par comparaison
+    exponent = int(math.log10(count))
+    if 10 ** exponent > count:
+        exponent -= 1
+    elif 10 ** (exponent + 1) <= count:
+        exponent += 1
+    mantissa = count // 10 ** (exponent - 2)
+    return f"{mantissa // 100}.{mantissa % 100:02d}e+{exponent}"
+
+
 def printWarning(string):
     print(f"Warning: {string}")
 
@@ -256,11 +543,17 @@ def printGreen(string, end="\n"):
     print(f"> {string}", end=end)
 
 
-def printRanks(ranksAndIds):
-    ranks, ids = zip(*ranksAndIds)
+def printRanks(ranksAndIds, labels=None):
+    ranks, ids = ranksAndIds
+    hidden = max(len(ids) - MATRIX_MAX_NODES, 0)
+    # Au-delà de MATRIX_MAX_NODES sommets, seules les premières tâches (par rang croissant) sont affichées
+    ids = ids[:MATRIX_MAX_NODES]
+    ranks = ranks[ids]
     print("\n* Tri topologique:")
     print("Rangs:  ", "  ".join("%2.d" % r for r in ranks))
-    print("Taches: ", "  ".join("%2.d" % i for i in ids))
+    print("Taches: ", "  ".join(label_cell(label) for label in to_labels(ids.tolist(), labels)))
+    if hidden:
+        printShift(f"... ({hidden} tâches non affichées, rang maximal {ranksAndIds[0].max()})")
 
 
 def clear_output():
@@ -5,16 +5,42 @@
 # L3-C
 # Groupe C2
 
-import math
+import heapq
+import time
 
-from C2_Graph import Graph
+import C2_Analysis as Analysis
+import C2_Profiling as Profiling
+from C2_Graph import INDEX_FIELDS, SCALAR_LEVEL_EDGES, Graph, gather
 from C2_Interface import *
+from C2_Parser import load_graph_index, save_graph_index
 import numpy as np
 
 NUMBER_OF_TABLE = 12
+# Nombre maximal de chemins critiques énumérés et durée maximale (en secondes) de leur énumération
+MAX_CRITICAL_PATHS = 1000
+CRITICAL_PATHS_TIME_BUDGET = 10.0
+# Nombre de plus longs chemins (critiques puis quasi-critiques) à afficher, 0 pour ne pas les calculer
+NUMBER_OF_NEAR_CRITICAL_PATHS = 0
+# Fichier JSON où enregistrer le profil des analyses (durée, temps CPU, mémoire et compteurs
+# de chaque étape, voir C2_Profiling), None pour désactiver l'instrumentation
+PROFILE_FILE = None
+# Nombre de processus qui analysent en parallèle les sous-projets indépendants des grands graphes
+# (voir C2_Parallel), None pour tout calculer dans le processus principal
+WORKERS = None
 
 
 def main():
+    if PROFILE_FILE:
+        # Profil de toutes les analyses de la session, enregistré à la fin du programme
+        with Profiling.Profiler() as profiler:
+            analyze_tables()
+        profiler.write_json(PROFILE_FILE)
+    else:
+        analyze_tables()
+    printGreen("Programme terminé")
+
+
+def analyze_tables():
     # Tant que l’utilisateur décide de tester un tableau de
     # contraintes faire
     constraints_remaining = True
@@ -24,250 +50,70 @@ def main():
         # file_name = ask_user_for_table(NUMBER_OF_TABLE, default="example_ord.txt")
         file_name = ask_user_for_table(NUMBER_OF_TABLE)
         
-        # Lire le tableau de contraintes sur fichier et le stocker en mémoire
-        graph = read_constraints_table(file_name)
+        # Lire le tableau de contraintes sur fichier et l'analyser entièrement : graphe,
+        # vérification des propriétés d'un graphe d'ordonnancement, rangs, calendriers,
+        # marges et chemin(s) critique(s)
+        with Profiling.phase(file_name):
+            try:
+                analysis = Analysis.analyze_file(f"C2_Tables/{file_name}", max_paths=MAX_CRITICAL_PATHS,
+                                                 time_budget=CRITICAL_PATHS_TIME_BUDGET,
+                                                 near_critical_paths=NUMBER_OF_NEAR_CRITICAL_PATHS,
+                                                 workers=WORKERS)
+            except FileNotFoundError:
+                # Afficher un message d'erreur si le fichier n'existe pas et redemander une table
+                printError(f"Ce fichier n'existe pas {file_name}")
+                continue
+            
+            # Afficher les résultats de l'analyse
+            print_analysis(analysis)
         
-        # Si le fichier n'existe pas ou il est invalide alors redemander une table
-        if graph is None:
+        # Si le fichier est invalide alors redemander une table
+        if not analysis.is_valid():
             continue
         
-        # Créer la matrix correspondant au graphe représentant ce tableau de
-        # contraintes et l'afficher
-        graph.adjacency_matrix = get_adjacency_matrix(graph)
-        print_adjacency_matrix(graph)
-        
-        # Verifier que les propriétés nécessaires pour que ce graphe
-        # soit un graphe d'ordonnancement sont vérifiées
-        if verification_ordonnancement(graph):
-            # Si oui alors
-            printGreen("C'est un graphe d'ordonnancement")
-            
-            # Calculer les rangs des sommets et les affiche
-            graph.ranks_and_ids = get_node_ranks(graph)
-            printRanks(graph.ranks_and_ids)
-            
-            # Calculer les calendriers au plus tot
-            # et au plus tard et les affiche
-            calendrier_tot, calendrier_tard = get_schedules(graph)
-            print_schedules(calendrier_tot, calendrier_tard)
-            
-            # Calculer les marges et les afficher
-            marge_totale, marge_libre = get_marges(
-                graph, calendrier_tot, calendrier_tard)
-            print_marges(marge_totale, marge_libre)
-            
-            # Calculer le(s) chemin(s) critique(s) et les afficher
-            critical_paths = get_chemins_critiques(marge_totale, graph)
-            print_critical_paths(critical_paths)
-            if critical_paths:
-                print_total_length(graph, critical_paths)
-        else:
-            printError(f"Le graphe de {file_name[:-4]} n'est pas un graphe d'ordonnancement\n IL est impossible de "
-                       f"calculer les calendriers et les marges\n")
-        
         if not ask_for_an_other_table():
             constraints_remaining = False
         clear_output()
-    printGreen("Programme terminé")
 
 
-def read_constraints_table(file):
-    """
-    1. Lecture d’un tableau de contraintes donné dans un fichier texte (.txt) et stockage en mémoire
-     Retourne un objet Graph créé à partir des contraintes ou
-     None si le fichier est introuvable ou les contraintes ne sont pas valides.
-    """
-    
-    # Récupérer le nom du fichier sans l'extension
-    name = file[:-4]
-    # Créer un objet Graph avec ce nom
-    graph = Graph(name)
-    
-    # Ouvrir le fichier en mode lecture
-    try:
-        with open(f"C2_Tables/{file}", 'r') as f:
-            lines = f.read().splitlines()
-            sorted_lines = sorted(lines, key=lambda x: int(x.split()[0]))
-            # Afficher le titre de la création du graphe
-            printTitle(f"* Création du graphe d'ordonnancement {name} :\n")
-            
-            # Lire chaque ligne du fichier
-            for num_line, line in enumerate(sorted_lines):
-                
-                # Extraire le numéro de tâche, la durée et les prédécesseurs de la ligne
-                task_label, duration, *predecessors = map(int, line.split())
-                
-                # Vérifier si l'entrée est valide
-                if duration == 0:
-                    printWarning(
-                        f"Attention la durée de la tache {task_label} est 0.\n Est vous sur que ce graphe est un graph "
-                        f"d'ordonnancement ?\n")
-                if not (task_label > 0 and (0 <= duration < 100) and all(x > 0 for x in predecessors)):
-                    # Afficher un message d'erreur et retourner None
-                    printError(f"{name} n'est pas valide :")
-                    printError(f"A la ligne {num_line + 1} : \"{line}\"")
-                    return None
-                
-                # Ajouter le nœud et sa durée au graphe
-                graph.add_node(task_label, duration)
-                
-                # Si la tâche a des prédécesseurs, ajouter des arêtes pred → task_num
-                graph.add_edges(predecessors, task_label)
-            
-            graph.add_omega_node()
-            graph.add_omega_edges()
-            
-            # Afficher le graphe créé
-            print_graph(graph)
-            return graph
-    
-    except FileNotFoundError:
-        # Afficher un message d'erreur si le fichier n'existe pas et retourner None
-        printError(f"Ce fichier n'existe pas {file}")
-        return None
+def get_table_warnings(table):
+    # Avertissements pour les tâches de durée nulle, par numéro de tâche croissant
+    zero_duration_tasks = np.sort(table.tasks[table.durations == 0])
+    return [f"Attention la durée de la tache {task_label} est 0.\n Est vous sur que ce graphe est un graph "
+            f"d'ordonnancement ?\n" for task_label in zero_duration_tasks.tolist()]
 
 
-def get_adjacency_matrix(graph):
+def get_graph_from_table(name, table):
     """
-    2. Construction d'un graphe correspondant à un tableau de contraintes
+    Construit le graphe d'ordonnancement d'un tableau de contraintes valide (ConstraintsTable)
+    en une seule passe : arcs prédécesseur → tâche, dans l'ordre croissant des tâches.
+    Si le tableau est en cache, l'index de son graphe y est relu, ou y est enregistré après sa construction.
     """
-    
-    # Vérifier que le graphe n'est pas None
-    if graph:
-        # Récupérer le nombre de sommets du graphe
-        n = graph.number_of_vertices
-        
-        # Créer une matrice d'adjacence de taille nxn remplie de -1
-        # (valeur qui signifie qu'il n'y a pas d'arête entre deux sommets)
-        adjacency_matrix = np.ones((n, n), dtype=int) * -1
-        
-        # Pour chaque sommet "to_node" du graphe
-        for to_node in graph.node_ids:
-            # Pour chaque prédécesseur "from_node" du sommet "to_node"
-            for from_node in graph.get_predecessor_of(to_node):
-                # Récupérer la durée de l'arête entre les sommets "from_node" et "to_node"
-                duration = graph.duration_of[from_node]
-                
-                # Mettre à jour la valeur de la matrice d'adjacence pour l'arête "from_node" → "to_node"
-                adjacency_matrix[from_node][to_node] = duration
-        
-        # Retourner la matrice d'adjacence ainsi construite
-        return adjacency_matrix
+    if table.cache_entry is not None:
+        index = load_graph_index(table.cache_entry, INDEX_FIELDS)
+        if index is not None:
+            return Graph.from_index(name, *index)
+    order = np.argsort(table.tasks, kind="stable")
+    pred_counts = np.diff(table.pred_offsets)
+    sources = gather(table.pred_offsets, table.pred_ids, order)
+    targets = np.repeat(table.tasks[order], pred_counts[order])
+    graph = Graph.from_arrays(name, table.tasks[order], table.durations[order], sources, targets)
+    # L'index n'est enregistré que pour des étiquettes entières (Omega compris)
+    if table.cache_entry is not None and graph.labels.is_integer():
+        try:
+            save_graph_index(table.cache_entry, *graph.index_arrays())
+        except OSError:
+            # Le cache est facultatif : une erreur d'écriture ne doit pas empêcher l'analyse
+            pass
+    return graph
 
 
 # ====================   3.Verification graphe ordonnancement   ==================================
 
-def verification_ordonnancement(graph):
-    """
-    3. Vérifier les propriétés nécessaires du graphe pour
-    qu’il puisse servir d’un graphe d’ordonnancement :
-    """
-    return graph and is_acyclic(graph) and has_no_negative_edges(graph) and check_alpha(graph)
-
-
-def is_acyclic(graph):
-    """
-    Vérifie si le graphe est acyclique
-    """
-    
-    # Trier les nœuds par ordre croissant
-    nodes = sorted(graph.node_ids)
-    
-    # Afficher le premier et le dernier nœud.
-    # Nous savons qu'ils existent et son unique, car nous les avons cree
-    printGreen(f"Il y a un seul point d'entré, {nodes[0]}")
-    printGreen(f"Il y a un seul point de sortie, {nodes[-1]}\n")
-    
-    # Afficher l'en-tête pour la section de détection de circuit
-    printTitle(f"* Détection de circuit :")
-    printBold(f"Méthode d'élimination des points d'entrée\n")
-    
-    # Initialiser les ensembles de nœuds supprimés et les nœuds restants
-    suppressed_nodes = set()
-    nodes_remaining = graph.node_ids.copy()
-    
-    # Répéter jusqu'à ce que tous les nœuds soient supprimés
-    while len(nodes_remaining) > 0:
-        
-        # Trouver les nœuds sans prédécesseurs
-        starting_nodes = graph.get_nodes_with_no_predecessors(suppressed_nodes)
-        if starting_nodes:
-            printShift(f'Noeud sans prédecesseurs : ', end='')
-            printNodes(starting_nodes)
-        else:
-            # Si aucun point d'entrée n'est trouvé, le graphe est cyclique
-            printShift("Noeud sans prédecesseurs : Aucun")
-            printError(f"Le graphe de {graph.name} contient au moins un cycle")
-            return False
-        
-        # Afficher les nœuds sans prédécesseurs trouvés
-        printShift(f"Point d'entrée : ", end="")
-        if starting_nodes != set():
-            printNodes(starting_nodes)
-        
-        # Supprimer les nœuds sans prédécesseurs des nœuds restants
-        printShift("Suppression des points d'entrée")
-        nodes_remaining -= starting_nodes
-        
-        # Si des nœuds restent, afficher les nœuds restants
-        if nodes_remaining:
-            printShift(f"Sommets restant : ", end="")
-            printNodes(nodes_remaining)
-        else:
-            printShift(f"Sommets restant : Aucun")
-        
-        # Ajouter les nœuds supprimés à l'ensemble des nœuds supprimés
-        suppressed_nodes = suppressed_nodes.union(starting_nodes)
-    
-    print()
-    # Si aucun cycle n'a été trouvé, afficher un message indiquant que le graphe est acyclique
-    printGreen("Il n'y a pas de cycle")
-    return True
-
-
-def has_no_negative_edges(graph):
-    """
-    3. Vérifie que le graphe n'a pas d'arc négatif
-    """
-    for node, dur in graph.duration_of.items():
-        if dur < 0:
-            printError(f"La tache {node} est de duration negative {dur}")
-            return False
-    
-    printGreen(
-        "Les valeurs pour tous les arcs incidents vers l'extérieur à un sommet sont identiques")
-    printGreen("Il n'y a pas d'arc négatifs")
-    return True
-
-
-def check_alpha(graph):
-    # Récupère les successeurs du nœud 0
-    successors = graph.get_successors_of(0)
-    
-    # Vérifie que la durée du nœud alpha est 0
-    if graph.duration_of[0] != 0:
-        raise f"Error: In check_alpha : alpha duration is {graph.duration_of[0]} but should be 0"
-    
-    # Vérifie qu'il y a exactement un successeur (la source du graphe)
-    num_successors = len(successors)
-    if num_successors == 0:
-        # Si aucun successeur, il n'y a pas de source unique
-        printError("Le graphe ne possède pas une unique source")
-        return False
-    elif num_successors == 1:
-        # Si un seul successeur, affiche l'arc 0->successeur est nul
-        if graph.duration_of[0] == 0:
-            printGreen(f"L'arc 0->{successors[0]} est nul")
-    else:
-        # Si plusieurs successeurs, affiche les arcs 0 → successeurs sont nuls
-        printGreen("Les arcs", end="")
-        for i, succ in enumerate(successors):
-            if i != num_successors - 1:
-                print(f" 0->{succ}", end="")
-            else:
-                print(f" et 0->{succ} sont nuls")
-    
-    return True
+def get_negative_durations(graph):
+    # Liste des tâches (indice, durée) de durée négative
+    durations = graph.get_durations()
+    return [(node, int(durations[node])) for node in np.flatnonzero(durations < 0).tolist()]
 
 
 # ====================   4.RANGS   ==================================
@@ -275,48 +121,21 @@ def check_alpha(graph):
 def get_node_ranks(graph):
     """
     4. Calculer les rangs de tous les sommets du graphe.
+    Le rang d'un sommet est la longueur (en nombre d'arcs) du plus long chemin depuis la source,
+    c'est-à-dire son niveau dans le tri topologique de Kahn : le calcul est en O(n + e).
+    Retourne (ranks, ids) : ranks[node] est le rang du nœud node (-1 s'il n'est pas atteint)
+    et ids contient les identifiants des nœuds triés par rang croissant.
     """
-    # Récupérer la taille de la matrice d'adjacence
-    n = graph.adjacency_matrix.shape[0]
+    # Récupérer l'ordre topologique et les bornes de chaque niveau (repris du tri fait par la vérification du graphe)
+    ids, level_offsets, _ = graph.topological_sort()
     
     # Initialiser un tableau de rangs avec des valeurs par défaut de -1 pour chaque nœud
-    ranks = np.full(n, -1)
-    
-    # Le premier nœud a un rang de 0 (la source)
-    ranks[0] = 0
-    
-    # Initialiser une file avec le premier nœud
-    queue = [0]
-    
-    # Parcourir la file jusqu'à ce qu'elle soit vide
-    while queue:
-        # Retirer le premier élément de la file
-        node = queue.pop(0)
-        
-        # Pour chaque voisin, vérifier s'il est accessible depuis le nœud actuel
-        for neighbor, duration in enumerate(graph.adjacency_matrix[node]):
-            if duration >= 0:
-                # Mettre à jour le rang du voisin s'il n'a pas encore été visité ou s'il y a un chemin plus court
-                ranks[neighbor] = max(ranks[neighbor], ranks[node] + 1)
-                
-                # Ajouter le voisin à la file pour être visité plus tard
-                queue.append(neighbor)
-                
-                # Obtenir une liste des identifiants de nœuds dans l'ordre de la matrice d'adjacence
-    nodes_id = list(graph.node_ids)
-    
-    # Vérifier que la longueur de la liste de rangs est égale à la longueur de la liste d'identifiants de nœuds
-    if len(ranks) != len(nodes_id):
-        raise "Error: in get_node_ranks: Vérifiez que la longueur de la liste de rangs est égale" \
-              " à la longueur de la liste d'identifiants de nœuds"
+    ranks = np.full(graph.get_number_of_nodes(), -1)
     
-    # Créer une liste de tuples contenant le rang et l'identifiant de chaque nœud
-    ranks_and_ids = []
-    for i in range(len(ranks)):
-        ranks_and_ids.append((ranks[i], nodes_id[i]))
+    # Chaque nœud du niveau k reçoit le rang k
+    ranks[ids] = np.repeat(np.arange(len(level_offsets) - 1), np.diff(level_offsets))
     
-    # Trier la liste par ordre croissant de rangs
-    return sorted(ranks_and_ids, key=lambda x: x[0])
+    return ranks, ids
 
 
 # ====================   5.CALENDRIERS ET MARGES  ==================================
@@ -327,66 +146,95 @@ def get_schedules(graph):
     """
     calendrier_tot = get_calendrier_au_plus_tot(graph)
     calendrier_tard = get_calendrier_au_plus_tard(graph, calendrier_tot)
+    graph.early_schedule, graph.late_schedule = calendrier_tot, calendrier_tard
     return calendrier_tot, calendrier_tard
 
 
-def get_calendrier_au_plus_tot(graph):
-    # Récupération des rangs et des identifiants de tous les nœuds dans le graphe
-    ranks, ids = graph.get_ranks_and_ids()
+def get_edges_by_level(graph, key):
+    """
+    Trie les arcs du graphe par rang de leur extrémité (key="target") ou de leur origine (key="source").
+    Retourne (sources, targets, bounds) : les arcs du niveau k sont sources[bounds[k]:bounds[k + 1]]
+    et targets[bounds[k]:bounds[k + 1]].
+    """
+    ranks, ids = graph.ranks_and_ids
+    sources, targets = graph.get_edges()
     
-    # On récupère le nombre de nœuds dans le graphe
-    n = graph.adjacency_matrix.shape[0]
+    # Rang de l'extrémité choisie de chaque arc
+    edge_ranks = ranks[targets] if key == "target" else ranks[sources]
+    order = np.argsort(edge_ranks, kind="stable")
+    bounds = np.searchsorted(edge_ranks[order], np.arange(ranks.max() + 2))
+    return sources[order], targets[order], bounds
+
+
+def get_level_runs(bounds, first_level=0):
+    """
+    Regroupe les niveaux d'arcs first_level, first_level + 1, ... (voir get_edges_by_level) en passes
+    [début, fin, scalaire] sur les arcs : un niveau de plus de SCALAR_LEVEL_EDGES arcs forme une passe
+    vectorisée, et des niveaux étroits consécutifs une seule passe arc par arc (graphe profond, où
+    un appel NumPy par niveau coûterait plus cher que le parcours de ses quelques arcs). Parcourir
+    les arcs d'une passe scalaire dans l'ordre (ou l'ordre inverse) respecte l'ordre des niveaux.
+    """
+    bounds = bounds.tolist()
+    runs = []
+    for level in range(first_level, len(bounds) - 1):
+        scalar = bounds[level + 1] - bounds[level] <= SCALAR_LEVEL_EDGES
+        if scalar and runs and runs[-1][2]:
+            runs[-1][1] = bounds[level + 1]
+        else:
+            runs.append([bounds[level], bounds[level + 1], scalar])
+    return runs
+
+
+def get_calendrier_au_plus_tot(graph):
+    # Durées de toutes les tâches et arcs triés par rang de leur extrémité
+    durations = graph.get_durations()
+    sources, targets, bounds = get_edges_by_level(graph, "target")
     
-    # On initialise le calendrier au plus tot à 0 pour tous les nœuds
-    calendrier_au_plus_tot = np.full(n, 0)
-    # La première tâche commence à la date 0
-    calendrier_au_plus_tot[0] = 0
+    # On initialise le calendrier au plus tot à 0 pour tous les nœuds (la première tâche commence à la date 0)
+    calendrier_au_plus_tot = np.zeros(graph.get_number_of_nodes(), dtype=int)
     
-    # Parcours des nœuds restants (en ignorant la première tâche)
-    for node_id in ids[1:]:
-        # Ensemble des dates de début possibles en fonction des prédécesseurs de cette tâche
-        dates_par_predecesseur = set()
-        
-        # Pour chaque prédécesseur de ce nœud, on ajoute la durée du prédécesseur
-        # à sa date de début possible
-        for pred in graph.get_predecessor_of(node_id):
-            dates_par_predecesseur.add(
-                graph.duration_of[pred] + calendrier_au_plus_tot[pred])
-        # La date de début de ce nœud est la plus grande date de début possible parmi tous les prédécesseurs
-        calendrier_au_plus_tot[node_id] = max(dates_par_predecesseur)
+    # Parcours des niveaux dans l'ordre des rangs (en ignorant le niveau de la première tâche) : tous les
+    # prédécesseurs d'un niveau sont déjà datés, on calcule donc toutes les dates du niveau en une seule passe.
+    # La date d'une tâche est le maximum, sur ses prédécesseurs, de la date du prédécesseur plus sa durée.
+    for start, stop, scalar in get_level_runs(bounds, 1):
+        level_sources = sources[start:stop]
+        level_targets = targets[start:stop]
+        if scalar:
+            for source, target in zip(level_sources.tolist(), level_targets.tolist()):
+                date = calendrier_au_plus_tot[source] + durations[source]
+                if date > calendrier_au_plus_tot[target]:
+                    calendrier_au_plus_tot[target] = date
+        else:
+            np.maximum.at(calendrier_au_plus_tot, level_targets,
+                          calendrier_au_plus_tot[level_sources] + durations[level_sources])
     
     return calendrier_au_plus_tot
 
 
 def get_calendrier_au_plus_tard(graph, date_au_plus_tot):
-    # On récupère les rangs et les IDs des nœuds du graphe
-    ranks, ids = graph.get_ranks_and_ids()
-    # On inverse l'ordre des IDs pour commencer par le dernier nœud du graphe
-    ids_reversed = ids[::-1]
+    # Durées de toutes les tâches et arcs triés par rang de leur origine
+    durations = graph.get_durations()
+    sources, targets, bounds = get_edges_by_level(graph, "source")
     
-    # On récupère le nombre de nœuds dans le graphe
-    n = graph.adjacency_matrix.shape[0]
+    # La date au plus tard du dernier nœud est sa date au plus tôt, qui majore toutes les autres :
+    # on initialise donc le calendrier au plus tard à cette date pour tous les nœuds
+    calendrier_au_plus_tard = np.full(graph.get_number_of_nodes(), date_au_plus_tot[graph.omega_node_id])
     
-    # On initialise le calendrier au plus tard à 0 pour tous les nœuds
-    calendrier_au_plus_tard = np.full(n, 0)
-    # On fixe la date au plus tard du premier nœud à 0
-    calendrier_au_plus_tard[n - 1] = date_au_plus_tot[n - 1]
-    # Pour chaque nœud du graphe, on calcule sa date au plus tard
-    for node_id in ids_reversed:
-        # On crée un ensemble de dates possibles pour le nœud courant
-        dates_par_successors = set()
-        
-        # Si on est sur le dernier nœud, on fixe sa date au plus tard à la date au plus tôt calculés précédemment
-        if node_id == n - 1:
-            calendrier_au_plus_tard[node_id] = date_au_plus_tot[node_id]
+    # Parcours des niveaux dans l'ordre inverse des rangs : tous les successeurs d'un niveau sont déjà datés.
+    # La date au plus tard d'une tâche est le minimum, sur ses successeurs, de la date au plus tard du
+    # successeur moins la durée de la tâche.
+    for start, stop, scalar in reversed(get_level_runs(bounds)):
+        level_sources = sources[start:stop]
+        level_targets = targets[start:stop]
+        if scalar:
+            for source, target in zip(level_sources[::-1].tolist(), level_targets[::-1].tolist()):
+                date = calendrier_au_plus_tard[target] - durations[source]
+                if date < calendrier_au_plus_tard[source]:
+                    calendrier_au_plus_tard[source] = date
         else:
-            # Pour chaque successeur du nœud courant,
-            # On ajoute sa date au plus tard moins la durée de la tâche à l'ensemble de dates possibles
-            for succ in graph.get_successors_of(node_id):
-                dates_par_successors.add(calendrier_au_plus_tard[succ])
-            # On fixe la date au plus tard du nœud courant à la date minimum dans l'ensemble de dates possibles
-            calendrier_au_plus_tard[node_id] = min(dates_par_successors) - graph.duration_of[node_id]
-
+            np.minimum.at(calendrier_au_plus_tard, level_sources,
+                          calendrier_au_plus_tard[level_targets] - durations[level_sources])
+    
     calendrier_au_plus_tard[0] = 0
     # On renvoie le calendrier au plus tard pour tous les nœuds
     return calendrier_au_plus_tard
@@ -397,123 +245,216 @@ def get_marges(graph, cal_tot, cal_tard):
 
 
 def get_marge_libre(graph, cal_tot, cal_tard):
-    # On récupère le nombre de nœuds dans le graphe
-    n = len(cal_tard)
-    # On initialise la marge libre à 0 pour tous les nœuds
-    marge_libre = np.full(n, 0)
-    # On fixe la marge libre du dernier nœud à 0
-    marge_libre[n - 1] = 0
+    # Arcs et durées du graphe
+    sources, targets = graph.get_edges()
+    durations = graph.get_durations()
     
-    # Pour chaque nœud du graphe,
-    for node_id in graph.node_ids:
-        # Si ce nœud n'est pas le dernier nœud du graphe,
-        if node_id != n - 1:
-            # On initialise la date au plus tôt minimum des successeurs à +inf
-            min_successor_early_date = math.inf
-            # Pour chaque successeur du nœud courant,
-            for succ in graph.get_successors_of(node_id):
-                # On récupère la date au plus tôt du successeur
-                successor_early_date = cal_tot[succ]
-                # Si cette date est plus petite que la date minimum des successeurs, on la met à jour
-                if successor_early_date < min_successor_early_date:
-                    min_successor_early_date = successor_early_date
-            # On calcule la marge libre du nœud courant en soustrayant la date au plus tôt et la durée de la tâche à
-            # la date au plus tard
-            marge_libre[node_id] = min_successor_early_date - (cal_tot[node_id] + graph.duration_of[node_id])
+    # Date au plus tôt minimum des successeurs de chaque nœud, en une seule passe sur les arcs
+    min_successor_early_date = np.full(len(cal_tard), np.iinfo(np.int64).max)
+    np.minimum.at(min_successor_early_date, sources, cal_tot[targets])
     
-    # On renvoie la marge libre pour tous les nœuds
-    marge_libre = [x if x >= 0 else 0 for x in marge_libre]
-    return marge_libre
+    # La marge libre est l'écart entre la date au plus tôt minimum des successeurs et la fin au plus tôt
+    # de la tâche ; elle est nulle pour les nœuds sans successeurs (le dernier nœud) et jamais négative
+    has_successors = np.diff(graph.succ_offsets) > 0
+    marge_libre = np.zeros(len(cal_tard), dtype=int)
+    marge_libre[has_successors] = (min_successor_early_date - (cal_tot + durations))[has_successors]
+    return np.maximum(marge_libre, 0)
 
 
 def get_marge_totale(cal_tot, cal_tard):
-    # On récupère le nombre de nœuds dans le graphe
-    n = len(cal_tard)
-    # On initialise la marge totale à 0 pour tous les nœuds
-    marge_totale = np.full(n, 0)
-    
-    # Pour chaque nœud du graphe,
-    for i in range(len(cal_tot)):
-        # On calcule la marge totale en soustrayant la date au plus tard et la date au plus tôt
-        marge_totale[i] = cal_tard[i] - cal_tot[i]
-    
-    # On renvoie la marge totale pour tous les nœuds
-    return marge_totale
+    # La marge totale est l'écart entre la date au plus tard et la date au plus tôt
+    return np.asarray(cal_tard) - np.asarray(cal_tot)
 
 
 # ====================   Chemins critiques   ==================================
 
-def get_chemins_critiques(marges_totales, graph):
+def get_chemins_critiques(marges_totales, graph, max_paths=None, time_budget=None):
     """
     6. Calculer le(s) chemin(s) critique(s) et les afficher
+    Retourne une énumération paresseuse (CriticalPaths) : les chemins sont produits un par un
+    lorsqu'on la parcourt, au plus max_paths chemins et pendant au plus time_budget secondes.
     """
-    # On crée un ensemble de nœuds non critiques (ceux qui ont une marge totale non nulle)
-    non_critical_nodes = {i for i in range(len(marges_totales)) if marges_totales[i] != 0}
-    # On cherche tous les chemins qui mènent au nœud final en ignorant les nœuds non critiques
-    paths = find_paths(graph, graph.omega_node_id, ignore=non_critical_nodes)
-    # On renvoie les chemins critiques
-    return paths
+    return CriticalPaths(graph, marges_totales, max_paths, time_budget)
 
 
-def find_paths(graph, end, ignore=None):
-    # Si la liste de nœuds à ignorer n'est pas spécifiée, on la crée
-    if ignore is None:
-        ignore = {}
-    # On crée une file contenant le nœud initial
-    queue = [[0]]
-    # On initialise la liste des chemins à vide
-    paths = []
-    # Tant que la file n'est pas vide,
-    while queue:
-        # On retire le premier chemin de la file
-        path = queue.pop(0)
-        # On récupère le dernier nœud du chemin
-        node = path[-1]
-        # Si ce nœud est le nœud final,
-        if node == end:
-            # On ajoute le chemin à la liste des chemins
-            paths.append(path)
-        # Pour chaque successeur du nœud courant qui n'est pas dans la liste des nœuds à ignorer,
-        for succ in set(graph.get_successors_of(node)) - ignore:
-            # On ajoute un nouveau chemin à la file en ajoutant le successeur à la fin du chemin courant
-            queue.append(path + [succ])
-    # On renvoie tous les chemins qui mènent au nœud final
-    return paths
+class CriticalPaths:
+    """
+    Chemins critiques du graphe, énumérés à la demande.
+    Le sous-graphe critique ne garde que les nœuds de marge totale nulle et les arcs tendus
+    (date au plus tôt de l'extrémité = date au plus tôt de l'origine + durée de l'origine) :
+    tout chemin de 0 à Omega dans ce sous-graphe est un chemin critique, et tout nœud critique
+    a un successeur critique, donc le parcours en profondeur n'explore jamais d'impasse.
+    Chaque parcours de l'objet relance l'énumération ; count et truncated décrivent le dernier parcours.
+    """
+    
+    def __init__(self, graph, marges_totales, max_paths=None, time_budget=None):
+        self.graph = graph
+        self.max_paths = max_paths
+        self.time_budget = time_budget
+        self.count = 0  # Nombre de chemins produits par le dernier parcours
+        self.truncated = False  # Vrai si le dernier parcours a été interrompu (limite de chemins ou de temps)
+        
+        # Arcs du sous-graphe critique, triés par origine puis par extrémité
+        sources, targets = graph.get_edges()
+        cal_tot = graph.early_schedule
+        critical = np.asarray(marges_totales) == 0
+        tight = critical[sources] & critical[targets] & \
+            (cal_tot[targets] == cal_tot[sources] + graph.get_durations()[sources])
+        self.sources = sources[tight]
+        self.targets = targets[tight]
+        self.offsets = np.zeros(graph.get_number_of_nodes() + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.sources, minlength=graph.get_number_of_nodes()), out=self.offsets[1:])
+        self.path_counts = None
+        self.number_of_paths = None  # Nombre total de chemins critiques, s'il est déjà connu (cache des résultats)
+    
+    def __iter__(self):
+        self.count = 0
+        self.truncated = False
+        for path in find_paths(self.offsets, self.targets, 0, self.graph.omega_node_id, self.time_budget):
+            if path is None or self.count == self.max_paths:
+                # Temps écoulé, ou il reste des chemins au-delà de la limite
+                self.truncated = True
+                return
+            self.count += 1
+            yield path
+    
+    def count_paths(self):
+        """
+        Compte les chemins critiques sans les énumérer, par programmation dynamique sur l'ordre
+        topologique, en O(n + e) opérations sur des entiers Python (précision arbitraire).
+        Retourne (from_alpha, to_omega) : nombre de chemins critiques de 0 à chaque nœud
+        et de chaque nœud à Omega.
+        """
+        if self.path_counts is None:
+            ranks, ids = self.graph.ranks_and_ids
+            n = self.graph.get_number_of_nodes()
+            from_alpha = np.zeros(n, dtype=object)
+            to_omega = np.zeros(n, dtype=object)
+            from_alpha[0] = 1
+            to_omega[self.graph.omega_node_id] = 1
+            
+            # Les arcs d'un même rang d'origine sont traités ensemble : tous les chemins menant
+            # à leurs origines sont déjà comptés
+            source_ranks = ranks[self.sources]
+            order = np.argsort(source_ranks, kind="stable")
+            bounds = np.searchsorted(source_ranks[order], np.arange(ranks.max() + 2))
+            sources, targets = self.sources[order], self.targets[order]
+            for start, stop, scalar in get_level_runs(bounds):
+                if scalar:
+                    for source, target in zip(sources[start:stop].tolist(), targets[start:stop].tolist()):
+                        from_alpha[target] += from_alpha[source]
+                else:
+                    np.add.at(from_alpha, targets[start:stop], from_alpha[sources[start:stop]])
+            
+            # Symétriquement, par rang d'extrémité décroissant pour les chemins menant à Omega
+            target_ranks = ranks[self.targets]
+            order = np.argsort(target_ranks, kind="stable")
+            bounds = np.searchsorted(target_ranks[order], np.arange(ranks.max() + 2))
+            sources, targets = self.sources[order], self.targets[order]
+            for start, stop, scalar in reversed(get_level_runs(bounds)):
+                if scalar:
+                    for source, target in zip(sources[start:stop][::-1].tolist(),
+                                              targets[start:stop][::-1].tolist()):
+                        to_omega[source] += to_omega[target]
+                else:
+                    np.add.at(to_omega, sources[start:stop], to_omega[targets[start:stop]])
+            
+            self.path_counts = from_alpha, to_omega
+        return self.path_counts
+    
+    def total_count(self):
+        # Nombre total de chemins critiques (de 0 à Omega)
+        if self.number_of_paths is None:
+            from_alpha, to_omega = self.count_paths()
+            self.number_of_paths = to_omega[0]
+        return self.number_of_paths
+    
+    def through_counts(self):
+        # Nombre de chemins critiques passant par chaque nœud (0 pour les nœuds non critiques)
+        from_alpha, to_omega = self.count_paths()
+        return from_alpha * to_omega
 
 
-def print_total_length(graph, paths):
-    if paths:
-        # Initialise une liste vide pour stocker la longueur totale de chaque chemin
-        path_lengths = []
-        
-        # Parcourt chaque chemin dans la liste des chemins fournie
-        for path in paths:
-            # Initialise une variable pour stocker la longueur totale du chemin actuel
-            total_length = 0
-            # Parcourt chaque identifiant de tâche dans le chemin actuel
-            for task_id in path:
-                # Ajoute la durée de la tâche à la longueur totale du chemin
-                total_length += graph.duration_of[task_id]
-            # Ajoute la longueur totale du chemin actuel à la liste des longueurs de chemins
-            path_lengths.append(total_length)
-        
-        # Trouve l'index du chemin le plus long dans la liste des longueurs de chemins
-        longest_path_index = path_lengths.index(max(path_lengths))
-        # Récupère le chemin le plus long en utilisant l'index trouvé
-        longest_path = paths[longest_path_index]
-        # Récupère la longueur du chemin le plus long
-        longest_path_length = max(path_lengths)
-        
-        print("\nLe plus long chemin critique est : ")
-        string = ""
-        for node in longest_path:
-            if node == longest_path[-1]:
-                string += f"{node}"
+def find_paths(offsets, targets, start, end, time_budget=None):
+    """
+    Parcours en profondeur des chemins de start à end dans un graphe donné par son index CSR
+    (offsets, targets). Les chemins sont produits un par un, sans copier la pile à chaque étape ;
+    si time_budget (secondes) est dépassé, le générateur produit None puis s'arrête.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    # Chemin courant et, pour chacun de ses nœuds, la position du prochain successeur à explorer
+    path = [start]
+    next_edge = [offsets[start]]
+    steps = 0
+    paths = 0
+    try:
+        while path:
+            node = path[-1]
+            if node == end:
+                paths += 1
+                yield list(path)
+            
+            # Vérifier régulièrement le temps écoulé
+            steps += 1
+            if deadline is not None and steps % 1024 == 0 and time.perf_counter() > deadline:
+                yield None
+                return
+            
+            # Descendre vers le prochain successeur non exploré, ou remonter si tous l'ont été
+            edge = next_edge[-1]
+            if node != end and edge < offsets[node + 1]:
+                next_edge[-1] = edge + 1
+                succ = int(targets[edge])
+                path.append(succ)
+                next_edge.append(offsets[succ])
             else:
-                string += f"{node}->"
-        printGreen(string)
-        print(f"de longueur {longest_path_length} jours. ")
-        print(f"Il faudra au minimum {longest_path_length} jours pour réaliser le projet {graph.name}.\n")
+                path.pop()
+                next_edge.pop()
+    finally:
+        # Compteurs de l'instrumentation, mis à jour une seule fois (même si le parcours est interrompu)
+        Profiling.count("paths_explored", paths)
+        Profiling.count("dfs_steps", steps)
+
+
+def get_chemins_quasi_critiques(graph, k):
+    """
+    Calculer les k plus longs chemins de 0 à Omega (les chemins critiques puis les quasi-critiques),
+    par longueur décroissante, sans énumérer tous les chemins.
+    Recherche par meilleur d'abord avec une file de priorité : un chemin partiel arrivant au nœud u
+    après une durée L peut au mieux atteindre la longueur L + (date au plus tôt d'Omega - date au plus
+    tard de u), et cette borne est exacte. Les chemins complets sortent donc de la file dans l'ordre des
+    longueurs décroissantes, chacun après au plus un parcours de chemin : O(k·(n + e)·log) au pire.
+    Retourne une liste de tuples (chemin, longueur, marge par rapport à la longueur critique).
+    """
+    durations = graph.get_durations()
+    cal_tard = graph.late_schedule
+    omega = graph.omega_node_id
+    critical_length = int(graph.early_schedule[omega])
+    
+    # Éléments de la file : (-borne, -numéro d'insertion, durée parcourue, nœud, chemin partiel chaîné)
+    # Le chemin partiel est une liste chaînée (nœud, précédent) pour ne jamais copier les préfixes.
+    # À borne égale, le dernier préfixe inséré sort le premier (parcours en profondeur) : un préfixe
+    # sorti de la file est prolongé jusqu'à Omega avant les autres préfixes ex aequo
+    heap = [(-critical_length, 0, 0, 0, (0, None))]
+    pushes = 1
+    paths = []
+    while heap and len(paths) < k:
+        bound, _, length, node, link = heapq.heappop(heap)
+        if node == omega:
+            # Chemin complet : sa longueur est exactement la borne
+            path = []
+            while link:
+                node, link = link
+                path.append(node)
+            paths.append((path[::-1], length, critical_length - length))
+            continue
+        # Successeurs insérés par identifiant décroissant : à borne égale, le plus petit sort le premier
+        for succ in graph.get_successors_of(node)[::-1].tolist():
+            succ_length = length + int(durations[node])
+            heapq.heappush(heap, (-(succ_length + critical_length - int(cal_tard[succ])), -pushes,
+                                  succ_length, succ, (succ, link)))
+            pushes += 1
+    return paths
 
 
 if __name__ == "__main__":
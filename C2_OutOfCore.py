@@ -0,0 +1,376 @@
+# Ordonnancement hors mémoire centrale, pour les tableaux de contraintes dont les arcs ne tiennent pas
+# en mémoire. Le tableau est lu par blocs ; ses arcs sont écrits sur disque, répartis en partitions
+# par tranche d'origines, puis triés partition par partition dans un index CSR des successeurs projeté
+# en mémoire (fichiers .npy). Le tri topologique et les calendriers au plus tôt et au plus tard sont
+# ensuite calculés niveau par niveau en ne lisant que les listes de successeurs du niveau courant.
+# Seuls des tableaux par nœud (durées, degrés entrants, rangs, dates) restent en mémoire ; les tampons
+# d'arcs sont dimensionnés par le budget mémoire.
+#
+# Usage :
+#   python C2_OutOfCore.py programme.txt -o resultats --memory 512
+#   (résultats par tâche dans resultats/<colonne>.npy, au format de C2_Export.export_npy)
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import C2_Main as Main
+import C2_Profiling as Profiling
+from C2_Export import TASK_FIELDS
+from C2_Graph import ALPHA_LABEL, OMEGA_LABEL, LabelIndex, gather
+from C2_Interface import printError, printGreen, printShift, printTitle
+from C2_Parser import INT64_MAX, ConstraintsTable, iter_table_chunks
+
+# Budget mémoire par défaut (octets) des tampons d'arcs et des blocs lus
+OUT_OF_CORE_MEMORY_BUDGET = 256 << 20
+# Octets de mémoire de travail par arc dans un tampon (indices, clés de tri, permutation)
+BYTES_PER_EDGE = 48
+# Nombre maximal de fichiers de partition ouverts en même temps
+MAX_OPEN_PARTITIONS = 256
+# Octets de mémoire de travail par octet lu dans le tableau de contraintes (voir C2_Parser.parse_chunk)
+BYTES_PER_TABLE_BYTE = 64
+
+
+class OutOfCoreSchedule:
+    """
+    Résultat d'un ordonnancement hors mémoire : taille du graphe, durée du projet, circuit éventuel,
+    erreurs et avertissements du tableau, et dossier des colonnes par nœud (voir columns).
+    """
+
+    def __init__(self, name, directory):
+        self.name = name
+        self.directory = directory  # Dossier des colonnes (une par champ de TASK_FIELDS)
+        self.errors = []  # Lignes invalides : (numéro de ligne, texte), ou (None, message)
+        self.warnings = []
+        self.number_of_tasks = 0
+        self.number_of_edges = 0  # Arcs entre tâches, sans doublons (hors arcs d'alpha et vers Omega)
+        self.number_of_levels = 0
+        self.cycle = None  # Étiquettes d'un circuit, ou None
+        self.project_duration = None
+
+    def is_scheduling_graph(self):
+        return not self.errors and self.cycle is None and self.project_duration is not None
+
+    def columns(self):
+        # Colonnes par nœud (alpha, les tâches par étiquette croissante, Omega), projetées en mémoire
+        return {field: np.load(os.path.join(self.directory, f"{field}.npy"), mmap_mode="r") for field in TASK_FIELDS}
+
+
+def schedule_file(path, output_dir, memory_budget=OUT_OF_CORE_MEMORY_BUDGET, work_dir=None, name=None):
+    """
+    Ordonnance un tableau de contraintes sans charger ses arcs en mémoire. Les colonnes par nœud
+    (TASK_FIELDS) sont écrites dans output_dir ; les fichiers intermédiaires dans un dossier temporaire
+    de work_dir, supprimé à la fin. memory_budget (octets) borne les tampons d'arcs et les blocs lus,
+    en plus des tableaux par nœud (une vingtaine d'octets par tâche).
+    Lève FileNotFoundError si le fichier n'existe pas.
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    result = OutOfCoreSchedule(name, output_dir)
+    edge_block = max(1, memory_budget // BYTES_PER_EDGE)
+    if work_dir is not None:
+        os.makedirs(work_dir, exist_ok=True)
+    temporary = tempfile.mkdtemp(prefix="C2_hors_memoire_", dir=work_dir)
+    try:
+        with Profiling.phase("read_constraints_table"):
+            tasks_file, raw_edges_file = read_table(path, temporary, memory_budget, result)
+        if result.errors:
+            return result
+        with Profiling.phase("intern_labels"):
+            labels, durations = intern_tasks(tasks_file, result)
+            result.number_of_tasks = len(labels) - 1
+        with Profiling.phase("index_edges"):
+            try:
+                offsets, targets = build_successors(raw_edges_file, labels, temporary, edge_block)
+            except KeyError as error:
+                result.errors = [(None, f"La tâche {error.args[0]} a des successeurs mais n'est pas définie")]
+                return result
+            result.number_of_edges = len(targets)
+        with Profiling.phase("schedule"):
+            schedule(labels, durations, offsets, targets, edge_block, output_dir, result)
+        del offsets, targets
+        return result
+    finally:
+        shutil.rmtree(temporary, ignore_errors=True)
+
+
+# ====================   LECTURE ET INDEX   ==================================
+
+def read_table(path, directory, memory_budget, result):
+    """
+    Lit le tableau par blocs : les tâches (étiquette, durée) et les arcs (étiquette du prédécesseur,
+    étiquette de la tâche) sont ajoutés à deux fichiers binaires. Les lignes invalides vont dans result.errors.
+    """
+    tasks_file = os.path.join(directory, "tasks.bin")
+    raw_edges_file = os.path.join(directory, "raw_edges.bin")
+    chunk_size = max(1 << 16, memory_budget // BYTES_PER_TABLE_BYTE)
+    zero_duration_tasks = []
+    with open(tasks_file, "wb") as tasks_out, open(raw_edges_file, "wb") as edges_out:
+        for (tasks, durations, pred_counts, pred_ids), errors in iter_table_chunks(path, chunk_size):
+            result.errors += errors
+            zero_duration_tasks.append(tasks[durations == 0])
+            np.stack((tasks, durations), axis=1).astype(np.int64).tofile(tasks_out)
+            np.stack((pred_ids, np.repeat(tasks, pred_counts)), axis=1).astype(np.int64).tofile(edges_out)
+    # Avertissements des tâches de durée nulle, comme pour un tableau lu en mémoire
+    zero_duration_tasks = np.concatenate(zero_duration_tasks or [np.empty(0, dtype=np.int64)])
+    zero_durations = np.zeros_like(zero_duration_tasks)
+    result.warnings = Main.get_table_warnings(ConstraintsTable(zero_duration_tasks, zero_durations, None, None, None))
+    return tasks_file, raw_edges_file
+
+
+def intern_tasks(tasks_file, result):
+    """
+    Indices des tâches : alpha (0), puis les tâches par étiquette croissante. Une tâche présente plusieurs
+    fois garde sa dernière durée (avec un avertissement). Renvoie l'internement (LabelIndex) des étiquettes
+    et les durées par nœud (int32 ; la dernière est celle d'Omega, d'indice len(labels)).
+    """
+    tasks = np.fromfile(tasks_file, dtype=np.int64).reshape(-1, 2)
+    unique, last, counts = np.unique(tasks[::-1, 0], return_index=True, return_counts=True)
+    for label in unique[counts > 1].tolist():
+        result.warnings.append(f"Tache {label} a deja été ajouté")
+    labels = LabelIndex([ALPHA_LABEL])
+    labels.extend(unique)
+    durations = np.zeros(len(unique) + 2, dtype=np.int32)
+    durations[1:-1] = tasks[::-1, 1][last]
+    return labels, durations
+
+
+def iter_edge_blocks(edges_file, edge_block, dtype):
+    # Blocs d'au plus edge_block arcs (origines, extrémités) d'un fichier de couples, projeté en mémoire
+    if not os.path.getsize(edges_file):
+        return
+    edges = np.memmap(edges_file, dtype=dtype, mode="r").reshape(-1, 2)
+    for start in range(0, len(edges), edge_block):
+        block = np.array(edges[start:start + edge_block])
+        yield block[:, 0], block[:, 1]
+    del edges
+
+
+def build_successors(raw_edges_file, labels, directory, edge_block):
+    """
+    Index CSR des successeurs sur disque : les arcs sont convertis en indices (int32) et comptés par
+    origine, puis répartis en partitions d'origines consécutives d'au plus edge_block arcs, et chaque
+    partition est triée (par origine puis extrémité), dédoublonnée et ajoutée au fichier des extrémités.
+    Renvoie (offsets, targets) projetés en mémoire. Lève KeyError pour un prédécesseur inconnu.
+    """
+    n = len(labels)
+    out_degree = np.zeros(n, dtype=np.int64)
+    edges_file = os.path.join(directory, "edges.bin")
+    with open(edges_file, "wb") as out:
+        for sources, targets in iter_edge_blocks(raw_edges_file, edge_block, np.int64):
+            sources, targets = labels.lookup(sources), labels.lookup(targets)
+            out_degree += np.bincount(sources, minlength=n)
+            np.stack((sources, targets), axis=1).astype(np.int32).tofile(out)
+    os.remove(raw_edges_file)
+
+    # Partitions : tranches d'origines dont les arcs tiennent dans un tampon
+    cumulative = np.cumsum(out_degree)
+    bounds = np.unique(np.searchsorted(cumulative, np.arange(edge_block, cumulative[-1], edge_block), side="left"))
+    bounds = np.unique(np.concatenate(([0], bounds, [n])))
+    partition_files = [os.path.join(directory, f"partition_{index}.bin") for index in range(len(bounds) - 1)]
+    # Au plus MAX_OPEN_PARTITIONS fichiers ouverts à la fois : une lecture des arcs par groupe de partitions
+    for first in range(0, len(partition_files), MAX_OPEN_PARTITIONS):
+        outputs = [open(partition_file, "wb") for partition_file in partition_files[first:first + MAX_OPEN_PARTITIONS]]
+        try:
+            for sources, targets in iter_edge_blocks(edges_file, edge_block, np.int32):
+                partition = np.searchsorted(bounds, sources, side="right") - 1 - first
+                order = np.argsort(partition, kind="stable")
+                starts = np.searchsorted(partition[order], np.arange(len(outputs) + 1))
+                block = np.stack((sources, targets), axis=1)[order]
+                for index, output in enumerate(outputs):
+                    block[starts[index]:starts[index + 1]].tofile(output)
+        finally:
+            for output in outputs:
+                output.close()
+    os.remove(edges_file)
+
+    # Tri de chaque partition et écriture séquentielle des extrémités ; degrés sortants sans doublons
+    out_degree[:] = 0
+    targets_file = os.path.join(directory, "succ_targets.bin")
+    with open(targets_file, "wb") as out:
+        for partition_file in partition_files:
+            if os.path.getsize(partition_file):
+                edges = np.fromfile(partition_file, dtype=np.int32).reshape(-1, 2)
+                keys = np.unique(edges[:, 0].astype(np.int64) * n + edges[:, 1])
+                out_degree += np.bincount(keys // n, minlength=n)
+                (keys % n).astype(np.int32).tofile(out)
+                del edges, keys
+            os.remove(partition_file)
+
+    offsets = np.lib.format.open_memmap(os.path.join(directory, "succ_offsets.npy"), mode="w+", dtype=np.int64,
+                                        shape=(n + 1,))
+    offsets[0] = 0
+    np.cumsum(out_degree, out=offsets[1:])
+    targets = np.memmap(targets_file, dtype=np.int32, mode="r") if offsets[-1] else np.empty(0, dtype=np.int32)
+    Profiling.count("partitions", len(partition_files))
+    Profiling.count("edges", int(offsets[-1]))
+    return offsets, targets
+
+
+# ====================   CALENDRIERS   ==================================
+
+def iter_successor_blocks(nodes, offsets, targets, edge_block):
+    # Blocs de nœuds dont les listes de successeurs réunies comptent au plus edge_block arcs (au moins un nœud)
+    counts = offsets[nodes + 1] - offsets[nodes]
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < len(nodes):
+        stop = max(start + 1, int(np.searchsorted(cumulative, cumulative[start] - counts[start] + edge_block,
+                                                  side="right")))
+        block = nodes[start:stop]
+        yield block, counts[start:stop], gather(offsets, targets, block)
+        start = stop
+
+
+def schedule(labels, durations, offsets, targets, edge_block, output_dir, result):
+    """
+    Tri topologique (Kahn), rangs et dates au plus tôt en une passe niveau par niveau, puis dates
+    au plus tard et marges libres en une passe sur les niveaux dans l'ordre inverse. Les arcs d'alpha
+    vers les tâches sans prédécesseur et des tâches sans successeur vers Omega restent implicites.
+    Les colonnes par nœud sont écrites dans output_dir ; un circuit éventuel est placé dans result.cycle.
+    """
+    n = len(labels)  # Alpha et les tâches ; Omega a l'indice n
+    # Les dates tiennent sur 32 bits si la somme des durées le permet
+    date_type = np.int32 if int(durations.sum(dtype=np.int64)) < np.iinfo(np.int32).max else np.int64
+    in_degree = np.zeros(n, dtype=np.int32)
+    for start in range(0, len(targets), edge_block):
+        in_degree += np.bincount(targets[start:start + edge_block], minlength=n).astype(np.int32)
+    has_successor = np.diff(offsets) > 0
+
+    ranks = np.full(n + 1, -1, dtype=np.int32)
+    early = np.zeros(n + 1, dtype=date_type)
+    order = np.empty(n, dtype=np.int32)  # Nœuds éliminés, niveau par niveau
+    level_offsets = [0, 1]
+    order[0], ranks[0] = 0, 0
+    frontier = np.flatnonzero(in_degree[1:] == 0).astype(np.int32) + 1
+    while len(frontier):
+        ranks[frontier] = len(level_offsets) - 1
+        order[level_offsets[-1]:level_offsets[-1] + len(frontier)] = frontier
+        level_offsets.append(level_offsets[-1] + len(frontier))
+        next_levels = []
+        for block, counts, successors in iter_successor_blocks(frontier, offsets, targets, edge_block):
+            np.maximum.at(early, successors, np.repeat(early[block] + durations[block], counts))
+            touched, touched_counts = np.unique(successors, return_counts=True)
+            in_degree[touched] -= touched_counts.astype(np.int32)
+            next_levels.append(touched[in_degree[touched] == 0])
+        frontier = np.sort(np.concatenate(next_levels)) if next_levels else frontier[:0]
+    result.number_of_levels = len(level_offsets)
+    Profiling.count("elimination_rounds", len(level_offsets) - 1)
+
+    if level_offsets[-1] < n:
+        result.cycle = labels.to_labels(find_cycle(in_degree > 0, offsets, targets)).tolist()
+        return
+    if n == 1:
+        # Aucune tâche : le nœud initial n'a pas de successeur
+        result.errors = [(None, "Le graphe n'a aucune tâche")]
+        return
+
+    # Omega : successeur implicite de toutes les tâches sans successeur
+    omega = n
+    sinks = np.flatnonzero(~has_successor[1:]) + 1
+    project_duration = int((early[sinks] + durations[sinks]).max())
+    early[omega], ranks[omega] = project_duration, ranks[sinks].max() + 1
+    result.project_duration = project_duration
+
+    late = np.full(n + 1, project_duration, dtype=date_type)
+    free = np.zeros(n + 1, dtype=date_type)
+    late[sinks] = project_duration - durations[sinks]
+    free[sinks] = project_duration - early[sinks] - durations[sinks]
+    for level in range(len(level_offsets) - 2, 0, -1):
+        nodes = order[level_offsets[level]:level_offsets[level + 1]]
+        nodes = nodes[has_successor[nodes]]
+        for block, counts, successors in iter_successor_blocks(nodes, offsets, targets, edge_block):
+            starts = np.cumsum(counts) - counts
+            late[block] = np.minimum.reduceat(late[successors], starts) - durations[block]
+            free[block] = np.minimum.reduceat(early[successors], starts) - early[block] - durations[block]
+    late[0] = 0
+    np.maximum(free, 0, out=free)
+    write_columns(labels, durations, ranks, early, late, free, output_dir)
+
+
+def find_cycle(remaining, offsets, targets):
+    """
+    Circuit parmi les nœuds non éliminés par le tri topologique (les successeurs d'un tel nœud ne sont
+    jamais éliminés) : parcours en profondeur itératif de leurs successeurs, jusqu'à retrouver un nœud
+    du chemin en cours. Renvoie les indices des nœuds du circuit, dans le sens des arcs.
+    """
+    state = np.zeros(len(remaining), dtype=np.int8)  # 0 : non visité, 1 : sur le chemin, 2 : terminé
+    for start in np.flatnonzero(remaining).tolist():
+        if state[start]:
+            continue
+        path, stack = [start], [iter(targets[offsets[start]:offsets[start + 1]].tolist())]
+        state[start] = 1
+        while stack:
+            for successor in stack[-1]:
+                if state[successor] == 1:
+                    return path[path.index(successor):]
+                if state[successor] == 0:
+                    state[successor] = 1
+                    path.append(successor)
+                    stack.append(iter(targets[offsets[successor]:offsets[successor + 1]].tolist()))
+                    break
+            else:
+                state[path.pop()] = 2
+                stack.pop()
+    return []
+
+
+def write_columns(labels, durations, ranks, early, late, free, output_dir):
+    # Écrit les colonnes par nœud (TASK_FIELDS) au format de C2_Export.export_npy, Omega compris
+    os.makedirs(output_dir, exist_ok=True)
+    n = len(labels) + 1
+    ids = np.empty(n, dtype=np.int64)
+    ids[:-1] = labels.to_labels(np.arange(n - 1))
+    last = max(int(ids[:-1].max()), ALPHA_LABEL)
+    if last < INT64_MAX:
+        ids[-1] = last + 1
+    else:
+        # Aucune étiquette entière libre pour Omega : étiquettes écrites en texte, comme les étiquettes
+        # non entières de C2_Export.export_npy
+        ids = np.append(ids[:-1].astype(str), OMEGA_LABEL)
+    columns = {
+        "id": ids,
+        "rank": ranks,
+        "duration": durations,
+        "early": early,
+        "late": late,
+        "total_margin": late - early,
+        "free_margin": free,
+    }
+    columns["critical"] = columns["total_margin"] == 0
+    for field in TASK_FIELDS:
+        np.save(os.path.join(output_dir, f"{field}.npy"), columns[field])
+
+
+# ====================   LIGNE DE COMMANDE   ==================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ordonnancement hors mémoire d'un très grand tableau de contraintes.")
+    parser.add_argument("table", help="tableau de contraintes")
+    parser.add_argument("-o", "--output", default=None, help="dossier des colonnes .npy (nom du tableau par défaut)")
+    parser.add_argument("--memory", type=int, default=OUT_OF_CORE_MEMORY_BUDGET >> 20,
+                        help="budget mémoire des tampons d'arcs, en Mo")
+    parser.add_argument("--work-dir", default=None, help="dossier des fichiers intermédiaires")
+    args = parser.parse_args(argv)
+
+    name = os.path.splitext(os.path.basename(args.table))[0]
+    output_dir = args.output or name
+    result = schedule_file(args.table, output_dir, args.memory << 20, args.work_dir, name)
+    printTitle(f"* Ordonnancement hors mémoire de {name} :\n")
+    for num_line, line in result.errors:
+        printError(line if num_line is None else f"Ligne {num_line} invalide : {line}")
+    if result.cycle is not None:
+        printError("Le graphe contient un circuit : " + " -> ".join(map(str, result.cycle + result.cycle[:1])))
+    if not result.is_scheduling_graph():
+        return 1
+    printShift(f"{result.number_of_tasks} tâches, {result.number_of_edges} arcs, {result.number_of_levels} niveaux")
+    printShift(f"Durée du projet : {result.project_duration}")
+    printGreen(f"Résultats écrits dans {output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
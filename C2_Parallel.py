@@ -0,0 +1,219 @@
+# Analyse d'un grand graphe d'ordonnancement sur plusieurs cœurs. Une fois alpha (0) et Omega retirés,
+# le graphe se décompose en composantes faiblement connexes (sous-projets indépendants) : leurs rangs,
+# calendriers et marges sont calculés par lots dans des processus de travail, qui lisent le graphe
+# et écrivent leurs résultats dans des tableaux NumPy en mémoire partagée (le graphe n'est jamais copié
+# ni sérialisé). Les lots sont ensuite réunis par la date de fin du projet. Les résultats sont
+# identiques à ceux du calcul en série (C2_Main).
+#
+# Usage :
+#   analysis = analyze_file("projet.txt", workers=8)
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import C2_Main as Main
+import C2_Profiling as Profiling
+from C2_Graph import Graph, gather
+
+# Nombre minimal de nœuds pour que le calcul en parallèle soit plus rapide que le calcul en série
+PARALLEL_MIN_NODES = 100000
+# Nombre de lots par processus : des lots plus petits équilibrent mieux la charge entre processus
+LOTS_PER_WORKER = 4
+
+
+class SharedArrays:
+    """
+    Tableaux NumPy en mémoire partagée, créés par le processus principal et retrouvés par leur nom
+    dans les processus de travail (voir attach). Les blocs sont libérés à la sortie du bloc with.
+    """
+
+    def __init__(self):
+        self.blocks = []
+        self.specs = {}  # Nom du tableau -> (nom du bloc, forme, type)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def add(self, name, values=None, shape=None, dtype=None):
+        # Crée un tableau partagé, copie de values ou de forme et de type donnés ; renvoie sa vue NumPy
+        if values is not None:
+            values = np.ascontiguousarray(values)
+            shape, dtype = values.shape, values.dtype
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self.blocks.append(block)
+        self.specs[name] = (block.name, shape, dtype.str)
+        shared = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        if values is not None:
+            shared[...] = values
+        return shared
+
+
+def attach(specs):
+    # Vues NumPy des tableaux partagés décrits par specs (SharedArrays.specs), et blocs à fermer après usage
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+# ====================   COMPOSANTES   ==================================
+
+def get_components(graph):
+    """
+    Composantes faiblement connexes du graphe privé de alpha (0) et d'Omega, par fusion de racines
+    (chaque racine est rattachée à la plus petite racine voisine) et compression des chemins,
+    en O(log n) passes vectorisées. Renvoie le numéro de composante de chaque tâche (0..k-1, par plus
+    petit identifiant croissant ; -1 pour alpha et Omega) et le nombre k de composantes.
+    """
+    n = graph.get_number_of_nodes()
+    sources, targets = graph.get_edges()
+    inner = (sources != 0) & (targets != graph.omega_node_id)
+    sources, targets = sources[inner], targets[inner].astype(np.int64)
+
+    parent = np.arange(n)
+    while True:
+        # Compression : chaque nœud pointe directement vers sa racine
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        source_roots, target_roots = parent[sources], parent[targets]
+        linked = source_roots != target_roots
+        if not linked.any():
+            break
+        source_roots, target_roots = source_roots[linked], target_roots[linked]
+        np.minimum.at(parent, np.maximum(source_roots, target_roots), np.minimum(source_roots, target_roots))
+
+    tasks = np.ones(n, dtype=bool)
+    tasks[[0, graph.omega_node_id]] = False
+    roots, components = np.unique(parent[tasks], return_inverse=True)
+    labels = np.full(n, -1, dtype=np.int64)
+    labels[tasks] = components
+    return labels, len(roots)
+
+
+def get_lots(count, sizes, number_of_lots):
+    """
+    Répartit les composantes (numérotées 0..count-1) en au plus number_of_lots lots de composantes
+    consécutives, de tailles (sizes : taille de chaque composante) à peu près égales.
+    Renvoie les bornes des lots dans la liste des composantes.
+    """
+    cumulative = np.cumsum(sizes)
+    targets = cumulative[-1] * np.arange(1, number_of_lots) / number_of_lots
+    bounds = np.searchsorted(cumulative, targets, side="right")
+    return np.unique(np.concatenate(([0], bounds, [count])))
+
+
+# ====================   CALCUL PAR LOTS   ==================================
+
+def schedule_lot(specs, start, stop, omega):
+    """
+    Processus de travail : rangs, dates au plus tôt, plus longs chemins vers Omega et marges libres
+    des tâches des composantes start..stop-1, calculés sur le sous-graphe formé de ces tâches, d'alpha
+    et d'Omega. Renvoie le rang et la date au plus tôt d'Omega dans ce sous-graphe.
+    """
+    arrays, blocks = attach(specs)
+    try:
+        bounds = arrays["component_offsets"]
+        tasks = np.sort(arrays["component_nodes"][bounds[start]:bounds[stop]])
+        nodes = np.concatenate(([0], tasks, [omega]))
+
+        # Sous-graphe : arcs des nœuds du lot, sauf ceux d'alpha vers les autres composantes
+        offsets, all_targets = arrays["succ_offsets"], arrays["succ_targets"]
+        sources = np.repeat(np.arange(len(nodes)), offsets[nodes + 1] - offsets[nodes])
+        targets = gather(offsets, all_targets, nodes).astype(np.int64)
+        local_targets = np.searchsorted(nodes, targets)
+        inside = nodes[np.minimum(local_targets, len(nodes) - 1)] == targets
+        lot = Graph("lot")
+        lot.durations = array("q", arrays["durations"][nodes].tobytes())
+        lot.omega_node_id = len(nodes) - 1
+        lot.edge_sources, lot.edge_targets = sources[inside], local_targets[inside]
+        lot.build_index()
+
+        ranks, ids = Main.get_node_ranks(lot)
+        lot.ranks_and_ids = ranks, ids
+        early_schedule = Main.get_calendrier_au_plus_tot(lot)
+        late_schedule = Main.get_calendrier_au_plus_tard(lot, early_schedule)
+        free_margin = Main.get_marge_libre(lot, early_schedule, late_schedule)
+        project_end = early_schedule[lot.omega_node_id]
+
+        arrays["ranks"][tasks] = ranks[1:-1]
+        arrays["early_schedule"][tasks] = early_schedule[1:-1]
+        arrays["tails"][tasks] = project_end - late_schedule[1:-1]
+        arrays["free_margin"][tasks] = free_margin[1:-1]
+        return int(ranks[lot.omega_node_id]), int(project_end)
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def get_schedules_and_margins(graph, workers):
+    """
+    Rangs, calendriers et marges d'un graphe d'ordonnancement (acyclique), calculés par composante
+    dans workers processus. Renvoie (ranks, ids, early_schedule, late_schedule, total_margin, free_margin),
+    identiques à get_node_ranks, get_schedules et get_marges.
+    """
+    n = graph.get_number_of_nodes()
+    omega = graph.omega_node_id
+    durations = graph.get_durations()
+    with Profiling.phase("get_components"):
+        components, count = get_components(graph)
+        Profiling.count("components", count)
+
+    with SharedArrays() as shared:
+        # Tâches regroupées par composante
+        task_components = components[components >= 0]
+        order = np.argsort(components, kind="stable")[n - len(task_components):]
+        component_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(task_components, minlength=count), out=component_offsets[1:])
+        shared.add("component_nodes", order)
+        shared.add("component_offsets", component_offsets)
+        for name in ("succ_offsets", "succ_targets"):
+            shared.add(name, getattr(graph, name))
+        shared.add("durations", durations)
+        ranks = shared.add("ranks", shape=(n,), dtype=np.int64)
+        early_schedule = shared.add("early_schedule", shape=(n,), dtype=np.int64)
+        tails = shared.add("tails", shape=(n,), dtype=np.int64)
+        free_margin = shared.add("free_margin", shape=(n,), dtype=np.int64)
+
+        # Lots de composantes consécutives, de tailles (tâches et arcs) équilibrées
+        sizes = np.diff(component_offsets) + np.bincount(task_components,
+                                                         np.diff(graph.succ_offsets)[components >= 0], count)
+        lots = get_lots(count, sizes, workers * LOTS_PER_WORKER)
+        with Profiling.phase("schedule_lots"), ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(schedule_lot, [shared.specs] * (len(lots) - 1), lots[:-1], lots[1:],
+                                        [omega] * (len(lots) - 1)))
+        Profiling.count("lots", len(lots) - 1)
+        ranks, early_schedule, tails, free_margin = (np.array(values) for values in
+                                                     (ranks, early_schedule, tails, free_margin))
+
+    # Réunion des lots par la date de fin du projet
+    project_end = max((end for _, end in results), default=0)
+    ranks[0], ranks[omega] = 0, max((rank for rank, _ in results), default=1)
+    early_schedule[0], early_schedule[omega] = 0, project_end
+    late_schedule = project_end - tails
+    late_schedule[0], late_schedule[omega] = 0, project_end
+    total_margin = Main.get_marge_totale(early_schedule, late_schedule)
+    # La marge libre des tâches dont Omega est le seul successeur dépend de la date de fin du projet
+    last_tasks = graph.get_predecessor_of(omega)
+    last_tasks = last_tasks[np.diff(graph.succ_offsets)[last_tasks] == 1]
+    free_margin[last_tasks] = np.maximum(project_end - early_schedule[last_tasks] - durations[last_tasks], 0)
+    free_margin[0] = max(int(early_schedule[graph.get_successors_of(0)].min(initial=0)), 0)
+    free_margin[omega] = 0
+
+    # Identifiants par rang croissant puis par identifiant croissant (ordre du tri topologique)
+    ids = np.argsort(ranks, kind="stable")
+    return ranks, ids, early_schedule, late_schedule, total_margin, free_margin
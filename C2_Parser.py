@@ -0,0 +1,318 @@
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+# Taille des blocs lus dans le fichier projeté en mémoire (coupés sur une fin de ligne) :
+# assez petits pour que les tableaux intermédiaires restent en cache
+CHUNK_SIZE = 1 << 20
+# Nombre maximal de chiffres d'un entier sur 64 bits : les entiers de MAX_DIGITS chiffres sont calculés
+# sans débordement sur 64 bits non signés, puis comparés à INT64_MAX
+MAX_DIGITS = 19
+# Plus grand entier représentable sur 64 bits signés
+INT64_MAX = np.iinfo(np.int64).max
+# Dossier du cache des tableaux de contraintes au format binaire
+TABLE_CACHE_DIR = "C2_Cache"
+# Sous-dossier d'une entrée du cache contenant l'index du graphe construit à partir du tableau
+GRAPH_CACHE_SUBDIR = "graphe"
+
+# Tableau de contraintes sous forme de tableaux plats, dans l'ordre du fichier :
+# les prédécesseurs de tasks[i] sont pred_ids[pred_offsets[i]:pred_offsets[i + 1]].
+# errors est la liste des lignes invalides (numéro de ligne, texte de la ligne).
+# cache_entry est le dossier de l'entrée du cache binaire du tableau (None s'il n'est pas en cache).
+ConstraintsTable = namedtuple("ConstraintsTable", ["tasks", "durations", "pred_offsets", "pred_ids", "errors",
+                                                   "cache_entry"], defaults=(None,))
+
+
+def parse_constraints_table(path, chunk_size=CHUNK_SIZE):
+    """
+    Lit un tableau de contraintes (une tâche par ligne : numéro, durée, prédécesseurs) sans le charger
+    en entier : le fichier est projeté en mémoire et découpé en blocs de lignes complètes, dont les
+    entiers sont convertis en bloc avec NumPy. Aucun tri n'est fait : les lignes peuvent être dans
+    un ordre quelconque. Toutes les lignes invalides sont signalées, avec leur numéro.
+    Lève FileNotFoundError si le fichier n'existe pas.
+    """
+    return join_chunks(iter_table_chunks(path, chunk_size))
+
+
+def parse_constraints_text(data, chunk_size=CHUNK_SIZE):
+    # Lit un tableau de contraintes déjà en mémoire (bytes), comme parse_constraints_table
+    return join_chunks(iter_buffer_chunks(data, chunk_size))
+
+
+def join_chunks(chunks):
+    # Réunit les blocs d'un tableau de contraintes (voir iter_table_chunks) en un ConstraintsTable
+    tasks, durations, pred_counts, pred_ids, errors = [], [], [], [], []
+    for parsed, chunk_errors in chunks:
+        tasks.append(parsed[0])
+        durations.append(parsed[1])
+        pred_counts.append(parsed[2])
+        pred_ids.append(parsed[3])
+        errors += chunk_errors
+    if not tasks:
+        return ConstraintsTable(*empty_arrays(), [])
+
+    pred_counts = np.concatenate(pred_counts)
+    pred_offsets = np.zeros(len(pred_counts) + 1, dtype=np.int64)
+    np.cumsum(pred_counts, out=pred_offsets[1:])
+    return ConstraintsTable(np.concatenate(tasks), np.concatenate(durations), pred_offsets,
+                            np.concatenate(pred_ids), errors)
+
+
+def iter_table_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Parcourt un tableau de contraintes bloc par bloc (voir parse_constraints_table) : génère, pour chaque
+    bloc de lignes complètes, les tableaux de parse_chunk (tasks, durations, pred_counts, pred_ids)
+    et la liste de ses lignes invalides (numéro de ligne, texte de la ligne).
+    Lève FileNotFoundError si le fichier n'existe pas.
+    """
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_buffer_chunks(mm, chunk_size)
+
+
+def iter_buffer_chunks(buffer, chunk_size=CHUNK_SIZE):
+    # Parcourt bloc par bloc un tableau de contraintes contenu dans un tampon (bytes ou fichier projeté)
+    size = len(buffer)
+    start = 0
+    first_line = 1
+    while start < size:
+        # Couper le bloc après la dernière fin de ligne (ou la première, si la ligne dépasse le bloc)
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = buffer.rfind(b"\n", start, end)
+            if newline < 0:
+                newline = buffer.find(b"\n", end)
+            end = size if newline < 0 else newline + 1
+
+        chunk = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+        parsed = parse_chunk(chunk, first_line)
+        errors = [(line_number, buffer[start + line_start:start + line_end].decode(errors="replace").rstrip("\r"))
+                  for line_number, line_start, line_end in parsed[4]]
+        first_line += int(np.count_nonzero(chunk == 10))
+        # Libérer la vue sur le tampon avant de passer au bloc suivant (et de fermer la projection)
+        del chunk
+        yield parsed[:4], errors
+        del parsed
+        start = end
+
+
+def empty_arrays():
+    # Tableaux d'un tableau de contraintes vide
+    return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64),
+            np.empty(0, dtype=np.int64))
+
+
+def parse_chunk(chunk, first_line):
+    """
+    Convertit un bloc de lignes complètes (octets) en tableaux d'entiers.
+    Retourne (tasks, durations, pred_counts, pred_ids, invalid) où invalid liste les lignes invalides
+    sous forme (numéro de ligne, début, fin) avec les positions relatives au bloc.
+    """
+    is_newline = chunk == 10
+    is_digit = (chunk >= 48) & (chunk <= 57)
+    is_space = is_newline | (chunk == 32) | (chunk == 9) | (chunk == 13)
+
+    # Numéro de ligne (relatif au bloc) de chaque octet, et bornes de chaque ligne
+    line_of = np.cumsum(is_newline) - is_newline
+    line_ends = np.flatnonzero(is_newline)
+    if len(chunk) and not is_newline[-1]:
+        line_ends = np.append(line_ends, len(chunk))
+    number_of_lines = len(line_ends)
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1)).astype(np.int64)
+
+    # Lignes contenant un caractère qui n'est ni un chiffre ni un espace (signe, lettre, ...)
+    bad_line = np.zeros(number_of_lines, dtype=bool)
+    bad_line[line_of[~(is_digit | is_space)]] = True
+
+    # Repérer les entiers : suites maximales de chiffres
+    previous_digit = np.concatenate(([False], is_digit[:-1]))
+    next_digit = np.concatenate((is_digit[1:], [False]))
+    token_starts = np.flatnonzero(is_digit & ~previous_digit)
+    token_ends = np.flatnonzero(is_digit & ~next_digit)
+
+    # Les entiers trop longs pour 64 bits rendent leur ligne invalide
+    token_lengths = token_ends - token_starts + 1
+    bad_line[line_of[token_starts[token_lengths > MAX_DIGITS]]] = True
+
+    # Valeur de chaque entier : somme des chiffres pondérés par la puissance de 10 de leur position,
+    # calculée sur 64 bits non signés (un entier de MAX_DIGITS chiffres ne peut pas y déborder)
+    values = np.empty(0, dtype=np.int64)
+    if len(token_starts):
+        digit_positions = np.flatnonzero(is_digit)
+        token_of_digit = np.cumsum(is_digit & ~previous_digit)[digit_positions] - 1
+        exponents = np.minimum(token_ends[token_of_digit] - digit_positions, MAX_DIGITS - 1)
+        weighted = (chunk[digit_positions] - 48).astype(np.uint64) * (np.uint64(10) ** exponents.astype(np.uint64))
+        unsigned_values = np.add.reduceat(weighted, np.searchsorted(digit_positions, token_starts))
+        # Les entiers au-delà de INT64_MAX rendent leur ligne invalide
+        bad_line[line_of[token_starts[unsigned_values > INT64_MAX]]] = True
+        values = unsigned_values.astype(np.int64)
+
+    # Nombre d'entiers par ligne et position du premier entier de chaque ligne
+    line_of_token = line_of[token_starts]
+    tokens_per_line = np.bincount(line_of_token, minlength=number_of_lines)
+    first_token = np.zeros(number_of_lines + 1, dtype=np.int64)
+    np.cumsum(tokens_per_line, out=first_token[1:])
+
+    # Une ligne doit contenir au moins le numéro de tâche et la durée (les lignes vides sont ignorées)
+    blank_line = (tokens_per_line == 0) & ~bad_line
+    bad_line |= tokens_per_line == 1
+
+    # Numéro de tâche strictement positif, durée entre 0 et 99, prédécesseurs strictement positifs
+    has_values = tokens_per_line >= 2
+    head = first_token[:-1][has_values]
+    line_tasks = np.zeros(number_of_lines, dtype=np.int64)
+    line_durations = np.zeros(number_of_lines, dtype=np.int64)
+    line_tasks[has_values] = values[head]
+    line_durations[has_values] = values[head + 1]
+    bad_line |= has_values & ((line_tasks <= 0) | (line_durations >= 100))
+    is_predecessor = np.ones(len(values), dtype=bool)
+    is_predecessor[head] = False
+    is_predecessor[head + 1] = False
+    bad_line[line_of_token[is_predecessor & (values <= 0)]] = True
+
+    # Garder les lignes valides et leurs prédécesseurs
+    valid_line = ~bad_line & ~blank_line
+    keep_token = is_predecessor & valid_line[line_of_token]
+    invalid = [(first_line + line, int(line_starts[line]), int(line_ends[line]))
+               for line in np.flatnonzero(bad_line).tolist()]
+    return (line_tasks[valid_line], line_durations[valid_line],
+            np.maximum(tokens_per_line - 2, 0)[valid_line], values[keep_token], invalid)
+
+
+# ====================   CACHE BINAIRE   ==================================
+
+def load_constraints_table(path, cache_dir=TABLE_CACHE_DIR):
+    """
+    Lit un tableau de contraintes en réutilisant, si possible, sa version binaire en cache.
+    L'entrée du cache est valide si le fichier source a la même taille et la même date de modification,
+    ou à défaut le même contenu (empreinte SHA-256). Les tableaux sont alors projetés en mémoire
+    (lecture seule, sans copie) au lieu d'être recalculés ; sinon le fichier est analysé puis mis en cache.
+    Les tableaux invalides ne sont pas mis en cache. cache_dir=None désactive le cache.
+    Le tableau renvoyé donne son entrée (cache_entry), où l'index de son graphe peut aussi être conservé
+    (voir save_graph_index).
+    """
+    if cache_dir is None:
+        return parse_constraints_table(path)
+    stat = os.stat(path)
+    entry = os.path.join(cache_dir, cache_entry_name(path))
+    meta = read_cache_meta(entry)
+    
+    digest = None
+    if meta is not None:
+        try:
+            if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+                return load_table(entry)
+            digest = file_digest(path)
+            if meta["size"] == stat.st_size and meta["sha256"] == digest:
+                # Contenu identique (fichier recopié ou touché) : on met seulement à jour la date
+                write_cache_meta(entry, stat, digest)
+                return load_table(entry)
+        except (OSError, ValueError, KeyError):
+            # Entrée incomplète ou corrompue : elle est reconstruite
+            pass
+    
+    table = parse_constraints_table(path)
+    if not table.errors:
+        try:
+            # Invalider l'entrée avant de réécrire ses tableaux
+            if meta is not None:
+                os.remove(os.path.join(entry, "meta.json"))
+            save_table(table, entry)
+            write_cache_meta(entry, stat, digest or file_digest(path))
+            table = table._replace(cache_entry=entry)
+        except OSError:
+            # Le cache est facultatif : une erreur d'écriture ne doit pas empêcher la lecture
+            pass
+    return table
+
+
+def save_table(table, directory):
+    """
+    Enregistre un tableau de contraintes valide au format binaire : un fichier .npy par tableau,
+    pour pouvoir le projeter en mémoire tel quel. Tous les tableaux sont stockés sur 64 bits, quelles
+    que soient leurs valeurs : les numéros de tâches et de prédécesseurs gardent ainsi un type commun.
+    L'index du graphe enregistré pour l'ancienne version du tableau est supprimé.
+    """
+    os.makedirs(directory, exist_ok=True)
+    shutil.rmtree(os.path.join(directory, GRAPH_CACHE_SUBDIR), ignore_errors=True)
+    for field in ("tasks", "durations", "pred_offsets", "pred_ids"):
+        np.save(os.path.join(directory, f"{field}.npy"), getattr(table, field).astype(np.int64))
+
+
+def load_table(directory):
+    # Projette en mémoire (lecture seule) les tableaux d'un tableau de contraintes enregistré par save_table
+    arrays = [np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+              for field in ("tasks", "durations", "pred_offsets", "pred_ids")]
+    return ConstraintsTable(*arrays, [], directory)
+
+
+def save_graph_index(entry, arrays, meta):
+    """
+    Enregistre dans l'entrée du cache d'un tableau l'index du graphe construit à partir de ce tableau
+    (voir Graph.index_arrays) : un fichier .npy par tableau et les métadonnées en JSON. Les fichiers
+    sont écrits dans un dossier temporaire puis renommés : un index visible est complet.
+    """
+    temporary = tempfile.mkdtemp(prefix=f".{GRAPH_CACHE_SUBDIR}-", dir=entry)
+    try:
+        for field, values in arrays.items():
+            np.save(os.path.join(temporary, f"{field}.npy"), values)
+        with open(os.path.join(temporary, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(temporary, os.path.join(entry, GRAPH_CACHE_SUBDIR))
+    except OSError:
+        # Index déjà écrit par un autre processus, ou disque plein
+        shutil.rmtree(temporary, ignore_errors=True)
+        raise
+
+
+def load_graph_index(entry, fields):
+    # Projette en mémoire (lecture seule) les tableaux fields de l'index d'un graphe enregistré
+    # par save_graph_index, avec ses métadonnées ; None si l'index est absent ou illisible
+    directory = os.path.join(entry, GRAPH_CACHE_SUBDIR)
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r") for field in fields}
+    except (OSError, ValueError):
+        return None
+    return arrays, meta
+
+
+def cache_entry_name(path):
+    # Nom de l'entrée du cache : nom du fichier suivi d'une empreinte de son chemin absolu
+    absolute_path = os.path.abspath(path)
+    return f"{os.path.basename(path)}-{hashlib.sha1(absolute_path.encode()).hexdigest()[:16]}"
+
+
+def file_digest(path):
+    # Empreinte SHA-256 du contenu d'un fichier, lu par blocs
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_cache_meta(entry):
+    # Métadonnées d'une entrée du cache, ou None si elle est absente ou illisible
+    try:
+        with open(os.path.join(entry, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_meta(entry, stat, digest):
+    # Écrit les métadonnées en dernier et de façon atomique : une entrée sans métadonnées est ignorée
+    meta_path = os.path.join(entry, "meta.json")
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}, f)
+    os.replace(meta_path + ".tmp", meta_path)
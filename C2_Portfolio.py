@@ -0,0 +1,152 @@
+# Portefeuille de projets : analyse de nombreux petits graphes d'ordonnancement en une seule série
+# de passes NumPy. Les graphes sont regroupés en un seul graphe à blocs disjoints (index CSR commun,
+# décalages par projet) ; rangs, calendriers et marges sont calculés une fois pour tous les projets,
+# puis découpés en une analyse (C2_Analysis.Analysis) par projet.
+#
+# Usage :
+#   from C2_Portfolio import analyze_files
+#   analyses = analyze_files(glob.glob("projets/*.txt"))
+
+import os
+from array import array
+
+import numpy as np
+
+import C2_Main as Main
+import C2_Profiling as Profiling
+from C2_Analysis import Analysis
+from C2_Graph import Graph
+from C2_Parser import TABLE_CACHE_DIR, load_constraints_table
+
+
+class Portfolio:
+    """
+    Graphes regroupés en un seul graphe à blocs disjoints : les nœuds du projet p ont les indices
+    node_offsets[p]..node_offsets[p + 1] - 1 du graphe commun, et ses arcs sont translatés d'autant.
+    Un niveau du tri topologique du graphe commun réunit les nœuds de même rang de tous les projets,
+    si bien que chaque passe par niveau traite tous les projets à la fois.
+    """
+
+    def __init__(self, graphs, name="portefeuille"):
+        self.graphs = list(graphs)
+        for graph in self.graphs:
+            graph.build_index()
+        node_counts = np.array([graph.get_number_of_nodes() for graph in self.graphs], dtype=np.int64)
+        edge_counts = np.array([len(graph.succ_targets) for graph in self.graphs], dtype=np.int64)
+        self.node_offsets = np.zeros(len(self.graphs) + 1, dtype=np.int64)
+        np.cumsum(node_counts, out=self.node_offsets[1:])
+        edge_offsets = np.zeros(len(self.graphs) + 1, dtype=np.int64)
+        np.cumsum(edge_counts, out=edge_offsets[1:])
+
+        # Graphe commun : durées et index CSR concaténés, indices translatés par projet
+        union = Graph(name)
+        union.labels = None  # Les étiquettes restent celles de chaque projet
+        union.durations = array("q", b"".join(graph.durations.tobytes() for graph in self.graphs))
+        node_shifts = np.repeat(self.node_offsets[:-1], edge_counts)
+        edge_shifts = np.repeat(edge_offsets[:-1], node_counts)
+        for offsets, neighbours in (("succ_offsets", "succ_targets"), ("pred_offsets", "pred_sources")):
+            csr_offsets = np.empty(len(union.durations) + 1, dtype=np.int64)
+            csr_offsets[:-1] = np.concatenate([getattr(graph, offsets)[:-1] for graph in self.graphs] or [[]])
+            csr_offsets[:-1] += edge_shifts
+            csr_offsets[-1] = edge_offsets[-1]
+            setattr(union, offsets, csr_offsets)
+            setattr(union, neighbours,
+                    np.concatenate([getattr(graph, neighbours) for graph in self.graphs] or [[]]) + node_shifts)
+        union.number_of_edges = int(edge_offsets[-1])
+        self.graph = union
+
+    def analyze(self, max_paths=None, time_budget=None, analyses=None):
+        """
+        Analyse tous les projets ensemble et renvoie une analyse par projet, identique à celle
+        de C2_Analysis.analyze_graph (chemins critiques énumérés à la demande, sans chemins quasi critiques).
+        analyses, s'il est donné, contient l'analyse déjà commencée de chaque projet (avertissements, ...).
+        """
+        union = self.graph
+        if analyses is None:
+            analyses = [Analysis(graph.name) for graph in self.graphs]
+        if not self.graphs:
+            return analyses
+
+        # Tri topologique commun : un nœud non éliminé appartient à un projet qui contient un circuit.
+        # Ses calendriers sont calculés comme les autres mais ne sont pas conservés
+        with Profiling.phase("get_node_ranks"):
+            ranks, order = Main.get_node_ranks(union)
+            union.ranks_and_ids = ranks, order
+        with Profiling.phase("get_schedules"):
+            early_schedule = Main.get_calendrier_au_plus_tot(union)
+            # Le calendrier au plus tard est calculé avec une date de fin commune (celle du premier projet),
+            # puis translaté de l'écart entre la date de fin de chaque projet et cette date commune
+            union.omega_node_id = self.graphs[0].omega_node_id
+            late_schedule = Main.get_calendrier_au_plus_tard(union, early_schedule)
+            omegas = self.node_offsets[:-1] + [graph.omega_node_id for graph in self.graphs]
+            project_ends = early_schedule[omegas]
+            late_schedule += np.repeat(project_ends - project_ends[0], np.diff(self.node_offsets))
+            late_schedule[self.node_offsets[:-1]] = 0
+        with Profiling.phase("get_marges"):
+            total_margin, free_margin = Main.get_marges(union, early_schedule, late_schedule)
+
+        # Ordre d'élimination de chaque projet : l'ordre commun regroupé par projet (ordre relatif conservé)
+        project_of = np.searchsorted(self.node_offsets, order, side="right") - 1
+        grouping = np.argsort(project_of, kind="stable")
+        order = order[grouping]
+        order_bounds = np.searchsorted(project_of[grouping], np.arange(len(self.graphs) + 1))
+        eliminated = np.zeros(len(union.durations), dtype=bool)
+        eliminated[order] = True
+
+        with Profiling.phase("split"):
+            for project, (graph, analysis) in enumerate(zip(self.graphs, analyses)):
+                start, stop = self.node_offsets[project], self.node_offsets[project + 1]
+                project_order = order[order_bounds[project]:order_bounds[project + 1]] - start
+                project_ranks = ranks[start:stop]
+                level_ranks = project_ranks[project_order]
+                analysis.graph = graph
+                analysis.warnings += graph.warnings
+                analysis.order = project_order
+                analysis.level_offsets = np.searchsorted(level_ranks, np.arange(level_ranks[-1] + 2))
+                analysis.cycle = None
+                if len(project_order) < len(project_ranks):
+                    analysis.cycle = graph.find_cycle(~eliminated[start:stop])
+                analysis.negative_durations = Main.get_negative_durations(graph)
+                analysis.source_successors = graph.get_successors_of(0).tolist()
+                if not analysis.is_scheduling_graph():
+                    continue
+
+                graph.ranks_and_ids = project_ranks, project_order
+                analysis.ranks, analysis.ids = graph.ranks_and_ids
+                graph.early_schedule = analysis.early_schedule = early_schedule[start:stop]
+                graph.late_schedule = analysis.late_schedule = late_schedule[start:stop]
+                analysis.total_margin = total_margin[start:stop]
+                analysis.free_margin = free_margin[start:stop]
+                analysis.project_duration = int(analysis.early_schedule[graph.omega_node_id])
+                analysis.critical_paths = Main.get_chemins_critiques(analysis.total_margin, graph, max_paths,
+                                                                     time_budget)
+        return analyses
+
+
+def analyze_files(paths, cache_dir=TABLE_CACHE_DIR, max_paths=None, time_budget=None):
+    """
+    Lit des tableaux de contraintes et les analyse ensemble (voir Portfolio.analyze) ; renvoie une analyse
+    par tableau, dans l'ordre de paths. Les tableaux invalides gardent leurs erreurs, sans graphe.
+    Lève FileNotFoundError si un fichier n'existe pas.
+    """
+    analyses = []
+    graphs, started = [], []
+    with Profiling.phase("get_graph_from_table"):
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            table = load_constraints_table(path, cache_dir)
+            analysis = Analysis(name)
+            analysis.warnings = Main.get_table_warnings(table)
+            analysis.errors = list(table.errors)
+            analyses.append(analysis)
+            if analysis.errors:
+                continue
+            try:
+                graphs.append(Main.get_graph_from_table(name, table))
+            except ValueError as error:
+                analysis.errors = [(None, str(error))]
+                continue
+            started.append(analysis)
+        Profiling.count("tables", len(analyses))
+    Portfolio(graphs).analyze(max_paths, time_budget, started)
+    return analyses
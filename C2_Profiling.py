@@ -0,0 +1,105 @@
+# Instrumentation facultative de l'analyse : durée réelle, temps CPU, pic de mémoire (tracemalloc)
+# et compteurs (nœuds, arcs, niveaux d'élimination, ...) de chaque étape.
+# Désactivée par défaut : phase() et count() ne coûtent alors qu'un test.
+#
+# Usage :
+#   with Profiler() as profiler:
+#       print_analysis(analyze_file("C2_Tables/C2_table_1.txt"))
+#   profiler.write_json("profil.json")
+
+import contextlib
+import json
+import time
+import tracemalloc
+
+# Profileur actif (None : instrumentation désactivée)
+active_profiler = None
+# Contexte vide renvoyé par phase() quand l'instrumentation est désactivée
+NO_PHASE = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    Enregistre une mesure par étape (phase) exécutée pendant qu'il est actif (bloc with).
+    Les étapes peuvent être imbriquées ; callback, s'il est donné, est appelé avec la mesure
+    (dictionnaire) de chaque étape dès qu'elle se termine.
+    """
+
+    def __init__(self, callback=None, trace_memory=True):
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.phases = []  # Mesures des étapes terminées, dans l'ordre de fin
+        self.counters = {}  # Compteurs cumulés sur toutes les étapes
+        self.stack = []  # Étapes en cours : [nom, début réel, début CPU, mémoire au début, pic, compteurs]
+        self.previous = None
+        self.started_tracing = False
+
+    def __enter__(self):
+        global active_profiler
+        self.previous, active_profiler = active_profiler, self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        return self
+
+    def __exit__(self, *exc_info):
+        global active_profiler
+        active_profiler = self.previous
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        memory = 0
+        if self.trace_memory:
+            memory, peak = tracemalloc.get_traced_memory()
+            # Le pic de l'étape englobante est conservé avant de remettre le pic à zéro
+            if self.stack:
+                self.stack[-1][4] = max(self.stack[-1][4], peak)
+            tracemalloc.reset_peak()
+        entry = [name, time.perf_counter(), time.process_time(), memory, memory, {}]
+        self.stack.append(entry)
+        try:
+            yield entry[5]
+        finally:
+            wall, cpu = time.perf_counter() - entry[1], time.process_time() - entry[2]
+            self.stack.pop()
+            record = {"phase": name, "depth": len(self.stack), "wall_time": wall, "cpu_time": cpu}
+            if self.trace_memory:
+                entry[4] = max(entry[4], tracemalloc.get_traced_memory()[1])
+                record["peak_memory"] = entry[4] - entry[3]
+                if self.stack:
+                    self.stack[-1][4] = max(self.stack[-1][4], entry[4])
+            record["counters"] = entry[5]
+            self.phases.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def count(self, name, value=1):
+        # Ajoute value au compteur name de l'étape en cours et au total
+        if self.stack:
+            counters = self.stack[-1][5]
+            counters[name] = counters.get(name, 0) + value
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        # Rapport sérialisable en JSON : mesures de chaque étape et compteurs cumulés
+        return {"phases": self.phases, "counters": self.counters}
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def phase(name):
+    # Mesure le bloc with qui suit comme une étape du profileur actif (sans effet s'il n'y en a pas)
+    if active_profiler is None:
+        return NO_PHASE
+    return active_profiler.phase(name)
+
+
+def count(name, value=1):
+    # Incrémente un compteur du profileur actif (sans effet s'il n'y en a pas)
+    if active_profiler is not None:
+        active_profiler.count(name, value)
@@ -0,0 +1,198 @@
+# Cache des résultats d'analyse, adressé par contenu : la clé est une empreinte canonique du graphe
+# (étiquettes, durées et arcs), si bien qu'un même tableau soumis à nouveau, sous un autre nom ou avec
+# ses lignes et ses prédécesseurs dans un autre ordre, retrouve ses rangs, calendriers, marges et le
+# nombre de ses chemins critiques sans les recalculer. Les entrées sont gardées en mémoire dans la
+# limite d'une taille maximale (les moins récemment utilisées sont évincées) et, si un dossier est
+# donné, enregistrées sur disque pour les processus suivants.
+#
+# Usage :
+#   cache = ResultCache(directory="C2_Cache/resultats")
+#   analysis = analyze_file("C2_Tables/C2_table_1.txt", result_cache=cache)
+#   print(cache.stats())
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+import C2_Profiling as Profiling
+
+# Taille maximale (en octets) des résultats gardés en mémoire par défaut
+RESULT_CACHE_MAX_BYTES = 256 << 20
+# Version du format des entrées : la changer invalide toutes les empreintes déjà calculées
+RESULT_CACHE_VERSION = 2
+# Tableaux par nœud d'une entrée du cache (attributs de même nom de C2_Analysis.Analysis)
+RESULT_FIELDS = ("order", "level_offsets", "ranks", "ids", "early_schedule", "late_schedule", "total_margin",
+                 "free_margin")
+
+
+class CachedResult:
+    """
+    Résultats d'analyse d'un graphe d'ordonnancement : tableaux par nœud (RESULT_FIELDS, en lecture
+    seule car partagés entre les analyses qui les réutilisent), durée du projet et nombre total
+    de chemins critiques.
+    """
+
+    def __init__(self, arrays, project_duration, critical_path_count):
+        self.arrays = arrays
+        for values in arrays.values():
+            values.setflags(write=False)
+        self.project_duration = project_duration
+        self.critical_path_count = critical_path_count
+        self.nbytes = sum(values.nbytes for values in arrays.values())
+
+    @classmethod
+    def from_analysis(cls, analysis):
+        arrays = {field: np.array(getattr(analysis, field)) for field in RESULT_FIELDS}
+        return cls(arrays, analysis.project_duration, int(analysis.critical_paths.total_count()))
+
+    def restore(self, analysis):
+        # Recopie les résultats dans une analyse dont le graphe a la même empreinte
+        for field, values in self.arrays.items():
+            setattr(analysis, field, values)
+        analysis.cycle = None
+        analysis.project_duration = self.project_duration
+
+
+def graph_digest(graph):
+    """
+    Empreinte SHA-256 canonique d'un graphe : étiquettes et durées par nœud, puis index CSR
+    des successeurs (dédoublonnés et triés par identifiant). Les nœuds étant numérotés par étiquette
+    croissante, l'empreinte ne dépend ni de l'ordre des lignes du tableau ni de celui des prédécesseurs.
+    """
+    graph.build_index()
+    digest = hashlib.sha256(f"C2-{RESULT_CACHE_VERSION}-{graph.get_number_of_nodes()}".encode())
+    labels = graph.labels
+    if labels.is_integer():
+        digest.update(np.frombuffer(labels.labels, dtype=np.int64).tobytes())
+    else:
+        digest.update(json.dumps(list(labels.labels)).encode())
+    digest.update(graph.get_durations().tobytes())
+    digest.update(graph.succ_offsets.astype(np.int64).tobytes())
+    digest.update(graph.succ_targets.astype(np.int32).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache LRU des résultats d'analyse, indexé par empreinte de graphe (graph_digest).
+    max_bytes borne la taille des tableaux gardés en mémoire ; directory, s'il est donné, conserve
+    aussi chaque entrée sur disque (un fichier .npy par tableau), sans limite de taille.
+    hits, misses et evictions comptent les recherches réussies, les recherches manquées
+    et les entrées évincées de la mémoire ; disk_hits compte les entrées relues sur disque.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()  # Empreinte -> CachedResult, de la moins à la plus récemment utilisée
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.disk_hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, digest):
+        # Résultats d'un graphe (CachedResult), ou None s'ils ne sont ni en mémoire ni sur disque
+        result = self.entries.get(digest)
+        if result is not None:
+            self.entries.move_to_end(digest)
+        elif self.directory is not None:
+            result = self.load(digest)
+            if result is not None:
+                self.disk_hits += 1
+                self.remember(digest, result)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, digest, result):
+        # Ajoute les résultats d'un graphe (CachedResult), en mémoire et éventuellement sur disque
+        if self.directory is not None and not os.path.isdir(self.entry_path(digest)):
+            try:
+                self.save(digest, result)
+            except (OSError, ValueError):
+                # Le stockage sur disque est facultatif : une erreur d'écriture n'empêche pas l'analyse
+                pass
+        self.remember(digest, result)
+
+    def remember(self, digest, result):
+        # Garde une entrée en mémoire, en évinçant les moins récemment utilisées au-delà de max_bytes
+        previous = self.entries.pop(digest, None)
+        if previous is not None:
+            self.nbytes -= previous.nbytes
+        if result.nbytes > self.max_bytes:
+            return
+        self.entries[digest] = result
+        self.nbytes += result.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        # Vide la mémoire (les entrées sur disque sont conservées) et remet les compteurs à zéro
+        self.entries.clear()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.disk_hits = 0
+
+    def stats(self):
+        # Compteurs du cache, sérialisables en JSON
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "disk_hits": self.disk_hits,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    # ====================   STOCKAGE SUR DISQUE   ==================================
+
+    def entry_path(self, digest):
+        return os.path.join(self.directory, digest)
+
+    def save(self, digest, result):
+        # Écrit l'entrée dans un dossier temporaire puis le renomme : une entrée visible est complète
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = tempfile.mkdtemp(prefix=f".{digest}-", dir=self.directory)
+        try:
+            for field, values in result.arrays.items():
+                np.save(os.path.join(temporary, f"{field}.npy"), values)
+            with open(os.path.join(temporary, "meta.json"), "w") as f:
+                # Le nombre de chemins critiques peut dépasser 64 bits : il est écrit en hexadécimal, dont la
+                # conversion n'est pas limitée en nombre de chiffres (contrairement au décimal)
+                json.dump({"project_duration": result.project_duration,
+                           "critical_path_count": f"{result.critical_path_count:x}"}, f)
+            os.rename(temporary, self.entry_path(digest))
+        except (OSError, ValueError):
+            # Entrée déjà écrite par un autre processus, disque plein, ou valeur non sérialisable
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+
+    def load(self, digest):
+        # Relit une entrée enregistrée par save, ou None si elle est absente ou illisible
+        entry = self.entry_path(digest)
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+            arrays = {field: np.load(os.path.join(entry, f"{field}.npy")) for field in RESULT_FIELDS}
+            return CachedResult(arrays, meta["project_duration"], int(meta["critical_path_count"], 16))
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def lookup(cache, graph):
+    # Empreinte d'un graphe et ses résultats en cache (CachedResult), ou None s'ils n'y sont pas
+    with Profiling.phase("result_cache"):
+        digest = graph_digest(graph)
+        result = cache.get(digest)
+        Profiling.count("hits", int(result is not None))
+    return digest, result
+
+
+def store(cache, digest, analysis):
+    # Enregistre les résultats d'une analyse terminée d'un graphe d'ordonnancement
+    cache.put(digest, CachedResult.from_analysis(analysis))
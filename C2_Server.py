@@ -0,0 +1,358 @@
+# Serveur d'analyse local (asyncio) : les tableaux de contraintes sont envoyés sur une socket Unix
+# ou TCP (localhost) et analysés par un ensemble de processus lancés une seule fois, sans relancer
+# l'interpréteur, ni réimporter NumPy, à chaque tableau. Protocole : une requête JSON par ligne,
+# une réponse JSON par ligne, dans l'ordre des requêtes ; un client peut envoyer plusieurs requêtes
+# sans attendre les réponses (pipelining).
+#
+# Requête : {"id": 1, "name": "projet", "table": "1 3\n2 2 1\n"}
+#       ou  {"id": 2, "tasks": [1, 2], "durations": [3, 2], "predecessors": [[], [1]]}
+#       option : "max_paths" (nombre de chemins critiques à énumérer dans la réponse, au plus
+#       SERVER_MAX_PATHS, en au plus PATHS_TIME_BUDGET secondes)
+# Réponse : le résultat du mode batch (C2_Batch.get_result) augmenté de "id" et "seconds",
+#       ou {"id": ..., "status": "error", "message": ...}
+#
+# Usage :
+#   python C2_Server.py --socket /tmp/C2.sock -j 4
+#   python C2_Server.py --port 8765
+#   responses = asyncio.run(send_requests(requests, path="/tmp/C2.sock"))
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from C2_Analysis import analyze_table
+from C2_Batch import get_result
+from C2_Interface import printGreen
+from C2_Parser import ConstraintsTable, parse_constraints_text
+from C2_ResultCache import ResultCache
+
+# Adresse d'écoute TCP par défaut (connexions locales uniquement)
+SERVER_HOST = "127.0.0.1"
+# Taille maximale d'une requête (une ligne JSON), en octets
+MAX_REQUEST_BYTES = 256 << 20
+# Taille du tampon de lecture de chaque connexion : au-delà, la lecture de la socket est suspendue
+# (les requêtes plus longues sont lues par morceaux)
+READ_BUFFER_BYTES = 1 << 20
+# Nombre maximal de requêtes reçues et sans réponse par connexion : au-delà, le serveur cesse
+# de lire la connexion jusqu'à l'envoi des réponses (le client est alors bloqué par TCP)
+MAX_PIPELINED_REQUESTS = 64
+# Nombre d'analyses en cours par processus de travail : au-delà, les requêtes attendent leur tour
+ANALYSES_PER_WORKER = 2
+# Délai (en secondes) laissé aux connexions ouvertes pour recevoir leurs réponses à l'arrêt du serveur
+CLOSE_TIMEOUT = 10
+# Taille maximale (en octets) d'une requête analysée directement par la boucle d'événements :
+# pour un petit tableau, l'envoi à un processus coûte plus cher que l'analyse
+INLINE_MAX_BYTES = 4096
+# Nombre maximal de chemins critiques énumérés par requête (max_paths est ramené à cette valeur)
+SERVER_MAX_PATHS = 1000
+# Durée maximale (en secondes) de l'énumération des chemins critiques d'une requête
+PATHS_TIME_BUDGET = 1.0
+
+# Cache des résultats de chaque processus (créé à la première analyse)
+result_cache = None
+
+
+# ====================   ANALYSE D'UNE REQUÊTE   ==================================
+
+def answer(line):
+    """
+    Analyse une requête (ligne JSON, en octets) et renvoie sa réponse (ligne JSON, en octets).
+    Exécuté dans un processus de travail ou, pour les petites requêtes, par le serveur lui-même.
+    """
+    global result_cache
+    if result_cache is None:
+        result_cache = ResultCache()
+    start = time.perf_counter()
+    request_id = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("La requête doit être un objet JSON")
+        request_id = request.get("id")
+        name = str(request.get("name", "tableau"))
+        if "table" in request:
+            table = parse_constraints_text(str(request["table"]).encode())
+        else:
+            table = table_from_arrays(request.get("tasks"), request.get("durations"),
+                                      request.get("predecessors"))
+        max_paths = request.get("max_paths", 0)
+        if not isinstance(max_paths, int) or isinstance(max_paths, bool) or max_paths < 0:
+            raise ValueError("max_paths doit être un entier positif ou nul")
+        max_paths = min(max_paths, SERVER_MAX_PATHS)
+        analysis = analyze_table(name, table, max_paths=max_paths, time_budget=PATHS_TIME_BUDGET,
+                                 result_cache=result_cache)
+        response = get_result(analysis, None)
+        del response["path"]
+        if max_paths and analysis.is_scheduling_graph():
+            labels = analysis.graph.labels
+            response["critical_paths"] = [labels.to_labels(path[1:-1]).tolist()
+                                          for path in analysis.critical_paths]
+            response["critical_paths_truncated"] = analysis.critical_paths.truncated
+    except (ValueError, TypeError, KeyError, OverflowError) as error:
+        # OverflowError : entier trop grand pour NumPy dans un tableau donné par colonnes
+        response = {"status": "error", "message": str(error)}
+    response["id"] = request_id
+    response["seconds"] = time.perf_counter() - start
+    try:
+        return json.dumps(response).encode() + b"\n"
+    except ValueError as error:
+        # Réponse non sérialisable : la requête reçoit une erreur plutôt que de rester sans réponse
+        return json.dumps({"status": "error", "message": str(error), "id": request_id,
+                           "seconds": response["seconds"]}).encode() + b"\n"
+
+
+def table_from_arrays(tasks, durations, predecessors):
+    """
+    Tableau de contraintes (ConstraintsTable) donné par colonnes : numéros des tâches, durées et liste
+    des prédécesseurs de chaque tâche. Les lignes sont vérifiées comme celles d'un fichier texte
+    (numéro de ligne = position de la tâche, à partir de 1). Lève ValueError si les colonnes
+    n'ont pas la même longueur ou ne contiennent pas que des entiers.
+    """
+    if predecessors is None:
+        predecessors = [[]] * len(tasks or [])
+    if not (isinstance(tasks, list) and isinstance(durations, list) and isinstance(predecessors, list)):
+        raise ValueError("tasks, durations et predecessors doivent être des listes")
+    if not len(tasks) == len(durations) == len(predecessors):
+        raise ValueError("tasks, durations et predecessors doivent avoir la même longueur")
+    pred_counts = np.fromiter(map(len, predecessors), dtype=np.int64, count=len(predecessors))
+    pred_offsets = np.zeros(len(tasks) + 1, dtype=np.int64)
+    np.cumsum(pred_counts, out=pred_offsets[1:])
+    columns = []
+    for values in (tasks, durations, list(itertools.chain.from_iterable(predecessors))):
+        values = np.asarray(values)
+        if len(values) and (values.dtype.kind not in "iu" or values.ndim != 1):
+            raise ValueError("Les numéros de tâche, durées et prédécesseurs doivent être des entiers")
+        columns.append(values.astype(np.int64))
+    tasks, durations, pred_ids = columns
+
+    # Mêmes règles que le tableau texte : numéro strictement positif, durée entre 0 et 99,
+    # prédécesseurs strictement positifs
+    bad_line = (tasks <= 0) | (durations < 0) | (durations >= 100)
+    bad_line[np.repeat(np.arange(len(tasks)), pred_counts)[pred_ids <= 0]] = True
+    errors = [(line + 1, " ".join(map(str, [tasks[line], durations[line]] + list(predecessors[line]))))
+              for line in np.flatnonzero(bad_line).tolist()]
+    if errors:
+        return ConstraintsTable(tasks[:0], durations[:0], pred_offsets[:1], pred_ids[:0], errors)
+    return ConstraintsTable(tasks, durations, pred_offsets, pred_ids, [])
+
+
+# ====================   SERVEUR   ==================================
+
+class Server:
+    """
+    Serveur asyncio : chaque connexion est lue ligne par ligne, chaque requête est confiée à un processus
+    de travail, ou analysée par la boucle d'événements si elle est petite (au plus max_concurrent analyses
+    à la fois, tous clients confondus), et les réponses sont renvoyées dans l'ordre des requêtes.
+    Une connexion a au plus max_pipelined requêtes sans réponse.
+    """
+
+    def __init__(self, workers=None, max_concurrent=None, max_pipelined=MAX_PIPELINED_REQUESTS):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.limit = asyncio.Semaphore(max_concurrent or self.workers * ANALYSES_PER_WORKER)
+        self.max_pipelined = max_pipelined
+        self.server = None
+        self.connections = {}  # Tâche de chaque connexion ouverte -> flux de lecture et d'écriture
+
+    async def start(self, path=None, host=SERVER_HOST, port=None):
+        # Démarre les processus de travail, puis écoute sur la socket Unix path, ou sur host:port en TCP
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+        if path is not None:
+            if os.path.exists(path):
+                os.remove(path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, path, limit=READ_BUFFER_BYTES)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port, limit=READ_BUFFER_BYTES)
+        return self.server
+
+    async def close(self):
+        # Cesse d'écouter, répond aux requêtes déjà reçues et ferme les connexions (au plus tard après
+        # CLOSE_TIMEOUT secondes, pour les clients qui ne lisent plus leurs réponses), puis arrête
+        # les processus de travail
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for reader, _ in self.connections.values():
+            reader.feed_eof()
+        if self.connections:
+            _, stuck = await asyncio.wait(list(self.connections), timeout=CLOSE_TIMEOUT)
+            for connection in stuck:
+                self.connections[connection][1].transport.abort()
+            await asyncio.gather(*stuck, return_exceptions=True)
+        self.executor.shutdown()
+
+    async def handle_connection(self, reader, writer):
+        # Les réponses attendues sont mises en file dans l'ordre des requêtes ; la file est bornée,
+        # si bien que la lecture s'arrête tant que le client a trop de requêtes sans réponse
+        pending = asyncio.Queue(self.max_pipelined)
+        sender = asyncio.ensure_future(self.send_responses(pending, writer))
+        connection = asyncio.current_task()
+        self.connections[connection] = reader, writer
+        try:
+            while True:
+                try:
+                    line = await read_line(reader, MAX_REQUEST_BYTES)
+                except ValueError:
+                    # Requête plus longue que MAX_REQUEST_BYTES : la connexion est fermée après la réponse
+                    await pending.put(self.error_response(f"Requête de plus de {MAX_REQUEST_BYTES} octets"))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(asyncio.ensure_future(self.dispatch(line)))
+        except ConnectionError:
+            pass
+        finally:
+            await pending.put(None)
+            await sender
+            del self.connections[connection]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def send_responses(self, pending, writer):
+        # Envoie les réponses dans l'ordre, en attendant que le client les lise (drain)
+        while True:
+            response = await pending.get()
+            if response is None:
+                return
+            try:
+                writer.write(await response)
+                await writer.drain()
+            except ConnectionError:
+                # Client parti : les analyses restantes sont abandonnées
+                while response is not None:
+                    response.cancel()
+                    response = await pending.get()
+                return
+
+    async def dispatch(self, line):
+        # Analyse une requête dans un processus de travail, ou directement si elle est petite
+        # et n'énumère pas de chemins critiques ; dans les deux cas, elle compte parmi les max_concurrent
+        # analyses en cours
+        try:
+            async with self.limit:
+                if is_inline(line):
+                    return answer(line)
+                return await asyncio.get_running_loop().run_in_executor(self.executor, answer, line)
+        except Exception as error:
+            # Processus de travail arrêté, mémoire insuffisante, ...
+            return error_line(repr(error))
+
+    @staticmethod
+    def error_response(message):
+        # Réponse d'erreur déjà prête, à mettre en file avec les autres
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(error_line(message))
+        return future
+
+
+def is_inline(line):
+    # Vrai pour une requête assez courte pour être analysée par la boucle d'événements : petite,
+    # sans énumération de chemins critiques (dont la durée ne dépend pas de la taille du tableau)
+    if len(line) > INLINE_MAX_BYTES:
+        return False
+    try:
+        request = json.loads(line)
+    except ValueError:
+        # Requête invalide : la réponse d'erreur est immédiate
+        return True
+    return not (isinstance(request, dict) and request.get("max_paths"))
+
+
+async def read_line(reader, max_bytes=None):
+    """
+    Ligne suivante d'un flux (fin de ligne comprise), lue par morceaux de la taille du tampon du flux ;
+    b"" en fin de flux. Lève ValueError si la ligne dépasse max_bytes octets.
+    """
+    parts, size = [], 0
+    while True:
+        try:
+            part = await reader.readuntil(b"\n")
+            complete = True
+        except asyncio.IncompleteReadError as error:
+            # Fin du flux : dernière ligne sans fin de ligne
+            part, complete = error.partial, True
+        except asyncio.LimitOverrunError as error:
+            part, complete = await reader.read(error.consumed), False
+        size += len(part)
+        if max_bytes is not None and size > max_bytes:
+            raise ValueError(f"Ligne de plus de {max_bytes} octets")
+        parts.append(part)
+        if complete:
+            return b"".join(parts)
+
+
+def error_line(message):
+    # Réponse d'erreur (ligne JSON) à une requête dont l'identifiant n'a pas pu être lu
+    return json.dumps({"id": None, "status": "error", "message": message}).encode() + b"\n"
+
+
+async def serve(path=None, host=SERVER_HOST, port=None, workers=None, max_concurrent=None,
+                max_pipelined=MAX_PIPELINED_REQUESTS):
+    # Lance le serveur et répond aux requêtes jusqu'à son arrêt
+    server = Server(workers, max_concurrent, max_pipelined)
+    try:
+        listener = await server.start(path, host, port)
+        address = path or "{}:{}".format(*listener.sockets[0].getsockname()[:2])
+        printGreen(f"Serveur d'analyse à l'écoute sur {address}")
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+async def send_requests(requests, path=None, host=SERVER_HOST, port=None):
+    """
+    Client : envoie des requêtes (dictionnaires) sur une même connexion sans attendre les réponses,
+    puis renvoie les réponses, dans l'ordre des requêtes.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path, limit=READ_BUFFER_BYTES)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=READ_BUFFER_BYTES)
+
+    async def write_requests():
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+
+    sending = asyncio.ensure_future(write_requests())
+    try:
+        responses = [json.loads(await read_line(reader)) for _ in range(len(requests))]
+        await sending
+        return responses
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur local d'analyse de tableaux de contraintes.")
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", help="chemin de la socket Unix")
+    address.add_argument("--port", type=int, help="port TCP (sur --host)")
+    parser.add_argument("--host", default=SERVER_HOST, help="adresse d'écoute TCP")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="nombre de processus (un par cœur)")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="nombre maximal d'analyses simultanées (tous clients confondus)")
+    parser.add_argument("--max-pipelined", type=int, default=MAX_PIPELINED_REQUESTS,
+                        help="nombre maximal de requêtes sans réponse par connexion")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket, args.host, args.port, args.workers, args.max_concurrent,
+                          args.max_pipelined))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,199 @@
+# Session d'analyse « et si » : modifications d'un graphe d'ordonnancement déjà analysé
+# (durée d'une tâche, ajout ou retrait d'une contrainte de précédence) avec mise à jour
+# incrémentale des calendriers, des marges et des tâches critiques.
+#
+# Usage :
+#   session = Session(analyze_file("C2_Tables/C2_table_2.txt"))
+#   session.set_duration(5, 12)
+#   session.add_edge(3, 9)
+#   print(session.project_duration(), session.critical_tasks())
+
+class Session:
+    """
+    Graphe d'ordonnancement modifiable. Les tâches sont désignées par leurs étiquettes.
+    Pour chaque nœud x, on maintient :
+     - early[x] : date au plus tôt (plus long chemin de alpha à x, durée de x exclue) ;
+     - tail[x] : plus long chemin de x à Omega, durée de x comprise.
+    La durée du projet est T = tail[alpha], la date au plus tard de x est T - tail[x] et sa marge totale
+    T - (early[x] + tail[x]). Une modification ne recalcule early que dans le cône aval du changement
+    et tail que dans son cône amont, en temps proportionnel à la taille de ces cônes.
+    """
+
+    def __init__(self, analysis):
+        if not analysis.is_scheduling_graph():
+            raise ValueError(f"{analysis.name} n'est pas un graphe d'ordonnancement")
+        graph = analysis.graph
+        self.name = analysis.name
+        self.labels = graph.labels
+        self.omega = graph.omega_node_id
+        self.durations = graph.get_durations().tolist()
+
+        # Listes d'adjacence modifiables, construites depuis l'index CSR
+        n = graph.get_number_of_nodes()
+        succ_targets, pred_sources = graph.succ_targets.tolist(), graph.pred_sources.tolist()
+        succ_offsets, pred_offsets = graph.succ_offsets.tolist(), graph.pred_offsets.tolist()
+        self.successors = [succ_targets[succ_offsets[u]:succ_offsets[u + 1]] for u in range(n)]
+        self.predecessors = [pred_sources[pred_offsets[u]:pred_offsets[u + 1]] for u in range(n)]
+
+        # Dates initiales, reprises de l'analyse complète
+        self.early = analysis.early_schedule.tolist()
+        project_duration = analysis.project_duration
+        self.tail = [project_duration - late for late in analysis.late_schedule.tolist()]
+
+        # Nœuds regroupés par longueur du plus long chemin qui les traverse : les nœuds critiques
+        # sont ceux dont cette longueur est la durée du projet
+        self.nodes_by_length = {}
+        for node in range(n):
+            self.nodes_by_length.setdefault(self.early[node] + self.tail[node], set()).add(node)
+
+    # ====================   MODIFICATIONS   ==================================
+
+    def set_duration(self, task, duration):
+        # Change la durée d'une tâche : les dates au plus tôt de ses successeurs et les chemins
+        # vers Omega de la tâche et de ses prédécesseurs sont recalculés
+        node = self.task_index(task)
+        if duration < 0:
+            raise ValueError(f"La durée de la tache {task} doit être positive ou nulle")
+        self.durations[node] = duration
+        self.update(self.successors[node], [node])
+
+    def add_edge(self, source, target):
+        """
+        Ajoute la contrainte « source précède target ». Lève ValueError si elle existe déjà
+        ou si elle crée un circuit (target précède déjà source) ; le graphe n'est alors pas modifié.
+        """
+        u, v = self.task_index(source), self.task_index(target)
+        if v in self.successors[u]:
+            raise ValueError(f"L'arc {source} -> {target} existe déjà")
+        downstream = self.cone([v], self.successors)
+        if u in downstream:
+            raise ValueError(f"L'arc {source} -> {target} crée un circuit")
+
+        self.link(u, v)
+        # target n'est plus une tâche initiale et source n'est plus une tâche finale
+        if self.predecessors[v] == [0, u]:
+            self.unlink(0, v)
+        if self.successors[u] == [self.omega, v]:
+            self.unlink(u, self.omega)
+        self.update([v], [u], downstream)
+
+    def remove_edge(self, source, target):
+        # Retire la contrainte « source précède target » ; lève ValueError si elle n'existe pas
+        u, v = self.task_index(source), self.task_index(target)
+        if v not in self.successors[u]:
+            raise ValueError(f"L'arc {source} -> {target} n'existe pas")
+        self.unlink(u, v)
+        # Une tâche sans prédécesseur est reliée au nœud initial, une tâche sans successeur à Omega
+        if not self.predecessors[v]:
+            self.link(0, v)
+        if not self.successors[u]:
+            self.link(u, self.omega)
+        self.update([v], [u])
+
+    def link(self, u, v):
+        self.successors[u].append(v)
+        self.predecessors[v].append(u)
+
+    def unlink(self, u, v):
+        self.successors[u].remove(v)
+        self.predecessors[v].remove(u)
+
+    def task_index(self, task):
+        # Indice d'une tâche ; le nœud initial et Omega ne peuvent pas être modifiés
+        try:
+            node = self.labels.index(task)
+        except KeyError:
+            raise ValueError(f"La tache {task} n'existe pas")
+        if node in (0, self.omega):
+            raise ValueError(f"Le nœud {task} ne peut pas être modifié")
+        return node
+
+    # ====================   MISE À JOUR INCRÉMENTALE   ==================================
+
+    def update(self, forward_roots, backward_roots, downstream=None):
+        """
+        Recalcule early sur les nœuds forward_roots et leurs descendants, tail sur backward_roots
+        et leurs ancêtres, puis le classement des nœuds par longueur de chemin.
+        """
+        if downstream is None:
+            downstream = self.cone(forward_roots, self.successors)
+        upstream = self.cone(backward_roots, self.predecessors)
+        touched = downstream | upstream
+        for node in touched:
+            self.remove_length(node)
+
+        # Dates au plus tôt, dans l'ordre topologique du cône aval
+        for node in self.region_order(downstream, self.predecessors, self.successors):
+            self.early[node] = max((self.early[pred] + self.durations[pred] for pred in self.predecessors[node]),
+                                   default=0)
+        # Plus longs chemins vers Omega, dans l'ordre topologique inverse du cône amont
+        for node in self.region_order(upstream, self.successors, self.predecessors):
+            self.tail[node] = self.durations[node] + max((self.tail[succ] for succ in self.successors[node]),
+                                                         default=0)
+
+        for node in touched:
+            self.nodes_by_length.setdefault(self.early[node] + self.tail[node], set()).add(node)
+
+    def remove_length(self, node):
+        length = self.early[node] + self.tail[node]
+        nodes = self.nodes_by_length[length]
+        nodes.discard(node)
+        if not nodes:
+            del self.nodes_by_length[length]
+
+    @staticmethod
+    def cone(roots, neighbours):
+        # Ensemble des nœuds atteignables depuis roots (compris) en suivant neighbours
+        region = set(roots)
+        stack = list(region)
+        while stack:
+            for neighbour in neighbours[stack.pop()]:
+                if neighbour not in region:
+                    region.add(neighbour)
+                    stack.append(neighbour)
+        return region
+
+    @staticmethod
+    def region_order(region, inward, outward):
+        # Tri topologique (Kahn) d'une région, en ne comptant que les arcs internes à la région
+        in_degree = {node: sum(1 for neighbour in inward[node] if neighbour in region) for node in region}
+        queue = [node for node, degree in in_degree.items() if degree == 0]
+        for node in queue:
+            for neighbour in outward[node]:
+                if neighbour in region:
+                    in_degree[neighbour] -= 1
+                    if in_degree[neighbour] == 0:
+                        queue.append(neighbour)
+        return queue
+
+    # ====================   RÉSULTATS   ==================================
+
+    def project_duration(self):
+        return self.tail[0]
+
+    def early_date(self, task):
+        return self.early[self.labels.index(task)]
+
+    def late_date(self, task):
+        return self.project_duration() - self.tail[self.labels.index(task)]
+
+    def total_margin(self, task):
+        node = self.labels.index(task)
+        return self.project_duration() - self.early[node] - self.tail[node]
+
+    def free_margin(self, task):
+        # Écart entre la date au plus tôt minimale des successeurs et la fin au plus tôt de la tâche
+        node = self.labels.index(task)
+        if not self.successors[node]:
+            return 0
+        return max(min(self.early[succ] for succ in self.successors[node]) - self.early[node] -
+                   self.durations[node], 0)
+
+    def critical_tasks(self):
+        # Étiquettes des tâches critiques (marge totale nulle), nœud initial et Omega compris
+        return [self.labels[node] for node in sorted(self.nodes_by_length.get(self.project_duration(), ()))]
+
+    def schedules(self):
+        # Calendriers complets (au plus tôt, au plus tard), indexés par nœud
+        project_duration = self.project_duration()
+        return list(self.early), [project_duration - tail for tail in self.tail]
@@ -0,0 +1,261 @@
+# Simulation Monte-Carlo (PERT) d'un graphe d'ordonnancement : les durées des tâches sont tirées
+# au hasard (estimations à trois points : optimiste, probable, pessimiste, ou loi quelconque)
+# pour des milliers de scénarios, et les calendriers de tous les scénarios sont calculés ensemble,
+# niveau par niveau, sur une matrice nœuds × scénarios traitée par blocs.
+#
+# Usage :
+#   python C2_Simulation.py C2_Tables/C2_table_2.txt -n 10000
+#   python C2_Simulation.py table.txt --estimates estimations.txt --distribution triangular
+#
+# Fichier d'estimations : une ligne "tâche optimiste probable pessimiste" par tâche incertaine ;
+# les autres tâches gardent leur durée du tableau de contraintes.
+
+import argparse
+
+import numpy as np
+
+import C2_Main as Main
+import C2_Profiling as Profiling
+from C2_Analysis import analyze_file
+from C2_Interface import printError, printShift, printTitle
+
+# Nombre de scénarios simulés par défaut
+DEFAULT_SCENARIOS = 10000
+# Taille maximale (octets) d'une matrice nœuds × scénarios : fixe le nombre de scénarios par bloc
+SIMULATION_CHUNK_BYTES = 1 << 25
+# Quantiles de la durée du projet affichés
+DEFAULT_QUANTILES = (0.05, 0.5, 0.8, 0.9, 0.95)
+# Écart relatif (par défaut) entre la durée du tableau et les durées optimiste et pessimiste
+DEFAULT_SPREAD = 0.25
+# Lois de tirage des estimations à trois points
+DISTRIBUTIONS = ("pert", "triangular", "uniform")
+# Nombre de tâches les plus souvent critiques affichées
+PRINTED_CRITICAL_TASKS = 20
+
+
+class SimulationResult:
+    """
+    Résultats d'une simulation : durée du projet dans chaque scénario, quantiles de cette durée
+    et indice de criticité de chaque nœud (proportion des scénarios où sa marge totale est nulle).
+    """
+
+    def __init__(self, name, labels, completion_times, criticality):
+        self.name = name
+        self.labels = labels  # Étiquette de chaque nœud
+        self.completion_times = completion_times  # Durée du projet, par scénario
+        self.criticality = criticality  # Indice de criticité, par nœud
+
+    @property
+    def scenarios(self):
+        return len(self.completion_times)
+
+    def quantiles(self, quantiles=DEFAULT_QUANTILES):
+        # Quantiles de la durée du projet : dictionnaire quantile -> durée
+        return dict(zip(quantiles, np.quantile(self.completion_times, quantiles).tolist()))
+
+    def criticality_of(self, task):
+        return float(self.criticality[self.labels.index(task)])
+
+    def most_critical(self, count=PRINTED_CRITICAL_TASKS):
+        # Tâches (hors nœud initial et Omega) les plus souvent critiques : liste de (étiquette, indice)
+        tasks = np.arange(1, len(self.criticality) - 1)
+        tasks = tasks[np.argsort(-self.criticality[tasks], kind="stable")[:count]]
+        return list(zip(self.labels.to_labels(tasks).tolist(), self.criticality[tasks].tolist()))
+
+
+# ====================   DURÉES ALÉATOIRES   ==================================
+
+def three_point_sampler(optimistic, likely, pessimistic, distribution="pert"):
+    """
+    Tirage des durées à partir d'estimations à trois points (tableaux indexés par nœud).
+    Renvoie une fonction sampler(rng, count) donnant une matrice nœuds × count de durées :
+     - pert : loi bêta de mode likely sur [optimistic, pessimistic] (PERT classique, λ = 4) ;
+     - triangular : loi triangulaire de mode likely ;
+     - uniform : loi uniforme sur [optimistic, pessimistic].
+    Les nœuds dont les trois estimations sont égales gardent cette durée.
+    """
+    optimistic, likely, pessimistic = (np.asarray(values, dtype=np.float64)
+                                       for values in (optimistic, likely, pessimistic))
+    if np.any(optimistic > likely) or np.any(likely > pessimistic):
+        raise ValueError("Les estimations doivent vérifier optimiste <= probable <= pessimiste")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Loi inconnue : {distribution} (lois : {', '.join(DISTRIBUTIONS)})")
+    width = pessimistic - optimistic
+    uncertain = np.flatnonzero(width > 0)
+    low, mode, width = optimistic[uncertain, None], likely[uncertain, None], width[uncertain, None]
+
+    def sampler(rng, count):
+        durations = np.repeat(likely[:, None], count, axis=1)
+        shape = (len(uncertain), count)
+        if distribution == "pert":
+            a = 1 + 4 * (mode - low) / width
+            b = 1 + 4 * (low + width - mode) / width
+            durations[uncertain] = low + width * rng.beta(a, b, shape)
+        elif distribution == "triangular":
+            durations[uncertain] = rng.triangular(low, mode, low + width, shape)
+        else:
+            durations[uncertain] = low + width * rng.random(shape)
+        return durations
+
+    return sampler
+
+
+def spread_estimates(graph, spread=DEFAULT_SPREAD):
+    # Estimations à trois points déduites des durées du tableau : [d (1 - spread), d, d (1 + spread)]
+    durations = graph.get_durations().astype(np.float64)
+    return durations * (1 - spread), durations, durations * (1 + spread)
+
+
+def read_estimates(path, graph, spread=DEFAULT_SPREAD):
+    """
+    Lit un fichier d'estimations (une ligne "tâche optimiste probable pessimiste" par tâche)
+    et renvoie les trois tableaux indexés par nœud ; les tâches absentes du fichier reçoivent
+    les estimations de spread_estimates. Lève ValueError sur une ligne invalide ou une tâche inconnue.
+    """
+    estimates = [values.copy() for values in spread_estimates(graph, spread)]
+    with open(path) as f:
+        for num_line, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            try:
+                task = int(fields[0]) if fields[0].lstrip("-").isdigit() else fields[0]
+                values = [float(value) for value in fields[1:]]
+                node = graph.labels.index(task)
+            except (ValueError, KeyError):
+                raise ValueError(f"Ligne {num_line} invalide : {line.strip()}")
+            if len(values) != 3 or node in (0, graph.omega_node_id):
+                raise ValueError(f"Ligne {num_line} invalide : {line.strip()}")
+            for estimate, value in zip(estimates, values):
+                estimate[node] = value
+    return estimates
+
+
+# ====================   SIMULATION   ==================================
+
+def get_levels(graph, key):
+    """
+    Arcs regroupés par niveau (voir Main.get_edges_by_level), puis par nœud de regroupement (l'extrémité
+    si key="target", l'origine si key="source") : renvoie pour chaque niveau (nœuds, voisins, débuts),
+    où les voisins de nodes[i] sont neighbours[starts[i]:starts[i + 1]], pour np.maximum.reduceat.
+    """
+    sources, targets, bounds = Main.get_edges_by_level(graph, key)
+    levels = []
+    for level in range(len(bounds) - 1):
+        level_sources = sources[bounds[level]:bounds[level + 1]]
+        level_targets = targets[bounds[level]:bounds[level + 1]]
+        if not len(level_sources):
+            continue
+        grouped, neighbours = (level_targets, level_sources) if key == "target" else (level_sources, level_targets)
+        order = np.argsort(grouped, kind="stable")
+        nodes, starts = np.unique(grouped[order], return_index=True)
+        levels.append((nodes, neighbours[order], starts))
+    return levels
+
+
+def simulate_chunk(durations, forward_levels, backward_levels, omega):
+    """
+    Calendriers d'un bloc de scénarios (durations : matrice nœuds × scénarios).
+    Renvoie la durée du projet par scénario et le nombre de scénarios où chaque nœud est critique.
+    """
+    # Dates de fin au plus tôt : durée du nœud plus la plus grande date de fin de ses prédécesseurs
+    # (une seule lecture par arc : la date au plus tôt est la date de fin moins la durée)
+    finish = durations.copy()
+    for nodes, preds, starts in forward_levels:
+        finish[nodes] += np.maximum.reduceat(finish[preds], starts, axis=0)
+    # Plus long chemin de chaque nœud à Omega, durée du nœud comprise
+    tail = durations.copy()
+    for nodes, succs, starts in reversed(backward_levels):
+        tail[nodes] += np.maximum.reduceat(tail[succs], starts, axis=0)
+
+    completion_times = finish[omega]
+    # Marge totale (durée du projet - date au plus tôt - chemin vers Omega) nulle, aux erreurs d'arrondi près
+    margins = completion_times - finish
+    margins += durations
+    margins -= tail
+    tolerance = 1e-9 * np.maximum(completion_times, 1)
+    return completion_times, np.count_nonzero(margins <= tolerance, axis=1)
+
+
+def simulate(analysis, sampler=None, scenarios=DEFAULT_SCENARIOS, seed=None, chunk_bytes=SIMULATION_CHUNK_BYTES):
+    """
+    Simule scenarios tirages des durées d'un graphe d'ordonnancement analysé. sampler(rng, count)
+    renvoie une matrice nœuds × count de durées (par défaut three_point_sampler(*spread_estimates(graph))).
+    Les scénarios sont traités par blocs dont la matrice de durées tient dans chunk_bytes.
+    """
+    if not analysis.is_scheduling_graph():
+        raise ValueError(f"{analysis.name} n'est pas un graphe d'ordonnancement : simulation impossible")
+    graph = analysis.graph
+    if sampler is None:
+        sampler = three_point_sampler(*spread_estimates(graph))
+    rng = np.random.default_rng(seed)
+    n = graph.get_number_of_nodes()
+    chunk_scenarios = max(1, chunk_bytes // (8 * n))
+
+    with Profiling.phase("simulation_levels"):
+        forward_levels = get_levels(graph, "target")
+        backward_levels = get_levels(graph, "source")
+    completion_times = np.empty(scenarios)
+    critical_counts = np.zeros(n, dtype=np.int64)
+    with Profiling.phase("simulation"):
+        for start in range(0, scenarios, chunk_scenarios):
+            count = min(chunk_scenarios, scenarios - start)
+            durations = sampler(rng, count)
+            if np.any(durations < 0):
+                raise ValueError("Les durées tirées doivent être positives ou nulles")
+            times, counts = simulate_chunk(durations, forward_levels, backward_levels, graph.omega_node_id)
+            completion_times[start:start + count] = times
+            critical_counts += counts
+        Profiling.count("scenarios", scenarios)
+        Profiling.count("levels", len(forward_levels) + len(backward_levels))
+
+    return SimulationResult(analysis.name, graph.labels, completion_times, critical_counts / max(scenarios, 1))
+
+
+# ====================   AFFICHAGE   ==================================
+
+def print_simulation(result, deterministic_duration=None):
+    printTitle(f"* Simulation de {result.name} ({result.scenarios} scénarios) :\n")
+    if deterministic_duration is not None:
+        printShift(f"Durée du projet (durées du tableau) : {deterministic_duration}")
+    printShift(f"Durée moyenne : {result.completion_times.mean():.2f} "
+               f"(écart type {result.completion_times.std():.2f})")
+    for quantile, duration in result.quantiles().items():
+        printShift(f"Quantile {quantile:.0%} : {duration:.2f}")
+    print()
+    printTitle("* Indices de criticité :\n")
+    for label, criticality in result.most_critical():
+        printShift(f"Tâche {label} : {criticality:.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation Monte-Carlo (PERT) d'un graphe d'ordonnancement.")
+    parser.add_argument("table", help="tableau de contraintes")
+    parser.add_argument("-n", "--scenarios", type=int, default=DEFAULT_SCENARIOS, help="nombre de scénarios")
+    parser.add_argument("--estimates", help="fichier d'estimations à trois points")
+    parser.add_argument("--spread", type=float, default=DEFAULT_SPREAD,
+                        help="écart relatif des tâches sans estimation")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="pert", help="loi des durées")
+    parser.add_argument("--seed", type=int, default=None, help="graine du générateur aléatoire")
+    args = parser.parse_args(argv)
+
+    analysis = analyze_file(args.table, max_paths=0)
+    if not analysis.is_scheduling_graph():
+        printError(f"{analysis.name} n'est pas un graphe d'ordonnancement : simulation impossible")
+        return 1
+    try:
+        if args.estimates:
+            estimates = read_estimates(args.estimates, analysis.graph, args.spread)
+        else:
+            estimates = spread_estimates(analysis.graph, args.spread)
+        sampler = three_point_sampler(*estimates, distribution=args.distribution)
+        result = simulate(analysis, sampler, args.scenarios, args.seed)
+    except ValueError as error:
+        printError(str(error))
+        return 1
+    print_simulation(result, analysis.project_duration)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
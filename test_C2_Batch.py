@@ -0,0 +1,57 @@
+# Tests du mode batch : résultats par tableau, erreurs isolées et fichiers de résultats complets.
+#
+# Usage :
+#   python -m pytest -q
+
+import json
+import os
+
+import pytest
+
+import C2_Batch as Batch
+from C2_Benchmark import write_table
+
+
+def read_results(directory):
+    # Résultats JSON d'un dossier (sans ses sous-dossiers), par nom de fichier
+    return {name: json.load(open(os.path.join(directory, name))) for name in sorted(os.listdir(directory))
+            if name.endswith(".json")}
+
+
+def test_failing_table_does_not_stop_the_batch(tmp_path, monkeypatch):
+    def analyze_table(path, *args):
+        raise RuntimeError(f"échec de {os.path.basename(path)}")
+
+    monkeypatch.setattr(Batch, "analyze_table", analyze_table)
+    summary = Batch.process_table(str(tmp_path / "a.txt"), str(tmp_path))
+    assert summary["table"] == "a" and summary["status"] == "error"
+    assert read_results(tmp_path)["a.json"]["message"] == "échec de a.txt"
+
+
+def test_unserializable_result_leaves_a_complete_file(tmp_path):
+    result = {"table": "a", "path": "a.txt", "status": "ok", "seconds": 0.0, "value": object()}
+    summary = Batch.write_result(result, str(tmp_path))
+    assert summary["status"] == "error"
+    assert os.listdir(tmp_path) == ["a.json"]
+    assert read_results(tmp_path)["a.json"]["status"] == "error"
+
+
+@pytest.mark.parametrize("portfolio", [False, True])
+def test_run_batch(tmp_path, portfolio):
+    tables = tmp_path / "tables"
+    (tables / "b").mkdir(parents=True)
+    write_table(str(tables / "a.txt"), "random", 50)
+    write_table(str(tables / "b" / "a.txt"), "layers", 300)
+    (tables / "bad.txt").write_text("1 3\n2 x\n")
+    paths = Batch.find_tables([str(tables), str(tables / "b")])
+    output = tmp_path / "resultats"
+    summaries = Batch.run_batch(paths, str(output), workers=1, profile=True, portfolio=portfolio)
+    assert [summary["status"] for summary in summaries] == ["ok", "ok", "invalid"]
+    results = list(read_results(output).values()) + list(read_results(output / "b").values())
+    assert [result["status"] for result in results] == ["ok", "invalid", "ok"]
+    assert all("profile" in result for result in results)
+
+
+def test_output_collision_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Batch.get_output_dirs([str(tmp_path / "p.txt"), str(tmp_path / "p.dat")], str(tmp_path / "resultats"))
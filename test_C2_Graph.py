@@ -0,0 +1,101 @@
+# Tests du graphe d'ordonnancement : étiquettes des tâches et ordre topologique maintenu pendant l'ajout d'arcs.
+#
+# Usage :
+#   python -m pytest -q
+
+import random
+
+import pytest
+
+import C2_Profiling as Profiling
+from C2_Analysis import analyze_graph
+from C2_Graph import Graph, LabelIndex
+
+
+def reaches(successors, start, goal):
+    # Vrai si goal est atteignable depuis start (parcours en profondeur)
+    seen, stack = {start}, [start]
+    while stack:
+        node = stack.pop()
+        if node == goal:
+            return True
+        for successor in successors.get(node, ()):
+            if successor not in seen:
+                seen.add(successor)
+                stack.append(successor)
+    return False
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_maintained_order_rejects_exactly_the_cycles(seed):
+    rng = random.Random(seed)
+    n = 30
+    graph = Graph("dynamique")
+    for task in range(1, n + 1):
+        graph.add_node(task, rng.randint(1, 9))
+    order = graph.maintain_topological_order()
+    successors = {}
+    for _ in range(200):
+        u, v = rng.randint(1, n), rng.randint(1, n)
+        creates_cycle = reaches(successors, v, u)
+        try:
+            graph.add_edge(u, v)
+        except ValueError as error:
+            assert creates_cycle
+            assert f"L'arc {u} -> {v} crée un circuit" in str(error)
+            continue
+        assert not creates_cycle
+        successors.setdefault(u, set()).add(v)
+
+        # Chaque arc accepté va d'un nœud placé avant son extrémité
+        for source, targets in successors.items():
+            for target in targets:
+                assert order.position[graph.labels.index(source)] < order.position[graph.labels.index(target)]
+
+    # Le graphe construit arc par arc est acyclique et son tri complet donne tous les nœuds
+    _, _, cycle = graph.topological_sort()
+    assert cycle is None
+
+
+def test_cycle_is_reported_with_its_nodes():
+    graph = Graph("circuit")
+    for task in (1, 2, 3):
+        graph.add_node(task, 1)
+    graph.maintain_topological_order()
+    graph.add_edge(1, 2)
+    graph.add_edge(2, 3)
+    with pytest.raises(ValueError, match=r"crée un circuit : 3 -> 1 -> 2 -> 3"):
+        graph.add_edge(3, 1)
+    assert graph.number_of_edges == 2
+
+
+@pytest.mark.parametrize("arguments", [
+    {"tasks": [1, "a"], "durations": [3, 2], "sources": [1], "targets": ["a"]},
+    {"tasks": [1, 2], "durations": [3, 2], "sources": [1], "targets": ["a"]},
+    {"tasks": [1, 2], "durations": [3, 2], "edges": [(1, "a")]},
+])
+def test_mixed_labels_are_rejected(arguments):
+    with pytest.raises(ValueError, match="toutes entières ou toutes des chaînes"):
+        Graph.from_arrays("mixte", **arguments)
+
+
+def test_labels_keep_their_type():
+    graph = Graph.from_arrays("chaines", ["b", "a"], [3, 2], edges=[("a", "b")])
+    assert list(graph.labels.labels) == [0, "a", "b", "Omega"]
+    assert graph.get_successors_of(graph.labels.index("a")).tolist() == [graph.labels.index("b")]
+
+    # Les entiers ajoutés avec des chaînes restent des entiers
+    labels = LabelIndex([0])
+    labels.extend([1, "1"])
+    assert list(labels.labels) == [0, 1, "1"]
+    assert labels.lookup([1, "1"]).tolist() == [1, 2]
+
+
+def test_sort_counters_belong_to_the_sort():
+    # Le tri est calculé une fois : ses compteurs sont dans l'étape topological_sort, et nulle part ailleurs
+    graph = Graph.from_arrays("profil", [1, 2, 3, 4], [3, 2, 4, 1], [1, 1, 2, 3], [2, 3, 4, 4])
+    with Profiling.Profiler(trace_memory=False) as profiler:
+        analyze_graph(graph)
+    phases = [record for record in profiler.phases if "queue_pushes" in record["counters"]]
+    assert [record["phase"] for record in phases] == ["topological_sort"]
+    assert phases[0]["counters"] == {"elimination_rounds": 5, "queue_pushes": 6}
@@ -0,0 +1,61 @@
+# Tests de non-régression de l'affichage et de la sérialisation des résultats d'analyse.
+#
+# Usage :
+#   python -m pytest -q
+
+import contextlib
+import io
+import json
+
+from C2_Analysis import analyze_file
+from C2_Batch import get_result
+from C2_Benchmark import write_table
+from C2_Interface import (PATH_COUNT_MAX_DIGITS, PATH_MAX_NODES, PATHS_MAX_SHOWN, format_path_count, print_analysis,
+                          print_critical_paths)
+from C2_ResultCache import ResultCache
+
+
+def test_format_path_count():
+    assert format_path_count(12345) == 12345
+    assert format_path_count(10 ** PATH_COUNT_MAX_DIGITS - 1) == 10 ** PATH_COUNT_MAX_DIGITS - 1
+    assert format_path_count(10 ** PATH_COUNT_MAX_DIGITS) == f"1.00e+{PATH_COUNT_MAX_DIGITS}"
+    assert format_path_count(3 ** 10000) == "1.63e+4771"
+    assert format_path_count(10 ** 5000 - 1) == "9.99e+4999"
+
+
+def test_deep_tied_graph_path_count(tmp_path):
+    # 3^10000 chemins critiques : plus de chiffres que Python n'accepte d'en convertir en décimal
+    path = write_table(str(tmp_path / "tied.txt"), "tied", 30000)
+    cache = ResultCache(directory=str(tmp_path / "resultats"))
+    analysis = analyze_file(path, cache_dir=None, max_paths=3, result_cache=cache)
+    assert analysis.critical_paths.total_count() == 3 ** 10000
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        print_analysis(analysis)
+    assert "Énumération interrompue après 3 chemins critiques sur 1.63e+4771" in output.getvalue()
+
+    result = json.loads(json.dumps(get_result(analysis, path)))
+    assert result["number_of_critical_paths"] == "1.63e+4771"
+
+    # Le nombre exact est relu depuis le disque
+    cache.clear()
+    cached = analyze_file(path, cache_dir=None, max_paths=3, result_cache=cache)
+    assert cache.disk_hits == 1
+    assert cached.critical_paths.total_count() == 3 ** 10000
+
+
+def test_critical_paths_view_is_truncated(tmp_path):
+    # 3^1000 chemins critiques de 1002 nœuds : seuls PATHS_MAX_SHOWN chemins tronqués sont affichés
+    path = write_table(str(tmp_path / "tied.txt"), "tied", 3000)
+    analysis = analyze_file(path, cache_dir=None, max_paths=1000)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        first_path = print_critical_paths(analysis.critical_paths, analysis.graph.labels)
+    lines = [line for line in output.getvalue().splitlines() if line.startswith("> ")]
+    assert len(first_path) == 1002
+    assert len(lines) == PATHS_MAX_SHOWN
+    assert all(line.count("->") == PATH_MAX_NODES for line in lines)
+    assert f"({1002 - PATH_MAX_NODES} tâches non affichées)" in lines[0]
+    hidden = format_path_count(3 ** 1000 - PATHS_MAX_SHOWN)
+    assert f"... ({hidden} chemins critiques non affichés)" in output.getvalue()
@@ -0,0 +1,77 @@
+# Tests de non-régression des algorithmes d'ordonnancement (rangs, calendriers, chemins critiques).
+#
+# Usage :
+#   python -m pytest -q
+
+import itertools
+
+import numpy as np
+import pytest
+
+import C2_Main as Main
+from C2_Analysis import analyze_file, analyze_graph
+from C2_Benchmark import write_table
+from C2_Graph import Graph
+
+
+def random_graph(rng, n):
+    # Graphe aléatoire de n tâches, chacune dépendant de quelques tâches antérieures
+    sources, targets = [], []
+    for task in range(2, n + 1):
+        for pred in set(rng.integers(1, task, rng.integers(0, 3)).tolist()):
+            sources.append(pred)
+            targets.append(task)
+    return Graph.from_arrays("aleatoire", np.arange(1, n + 1), rng.integers(0, 10, n), sources, targets)
+
+
+def all_path_lengths(graph):
+    # Longueurs de tous les chemins de 0 à Omega, par énumération exhaustive
+    durations = graph.get_durations()
+    lengths = []
+    stack = [(0, 0)]
+    while stack:
+        node, length = stack.pop()
+        if node == graph.omega_node_id:
+            lengths.append(length)
+        for succ in graph.get_successors_of(node).tolist():
+            stack.append((succ, length + int(durations[node])))
+    return sorted(lengths, reverse=True)
+
+
+def test_near_critical_paths_are_the_longest_paths():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        graph = random_graph(rng, 12)
+        analysis = analyze_graph(graph, near_critical_paths=5)
+        lengths = [length for _, length, _ in analysis.near_critical_paths]
+        assert lengths == all_path_lengths(graph)[:5]
+        for path, length, slack in analysis.near_critical_paths:
+            assert path[0] == 0 and path[-1] == graph.omega_node_id
+            assert sum(int(graph.get_duration(node)) for node in path) == length
+            assert slack == analysis.project_duration - length
+
+
+def test_near_critical_paths_on_tied_graph(tmp_path):
+    # 3^15 chemins critiques ex aequo : chaque chemin sorti de la file doit être terminé avant
+    # d'explorer les autres préfixes de même borne (sinon la recherche ne se termine pas)
+    path = write_table(str(tmp_path / "tied.txt"), "tied", 45)
+    analysis = analyze_file(path, cache_dir=None, near_critical_paths=3, max_paths=10)
+    paths = analysis.near_critical_paths
+    assert [(length, slack) for _, length, slack in paths] == [(analysis.project_duration, 0)] * 3
+    assert len({tuple(path) for path, _, _ in paths}) == 3
+    assert all(a < b for a, b in itertools.pairwise(path for path, _, _ in paths))
+
+
+@pytest.mark.parametrize("shape", ["chain", "layers", "random", "tied"])
+def test_scalar_and_vectorized_levels_agree(tmp_path, monkeypatch, shape):
+    # Les niveaux étroits sont traités arc par arc, les larges en passes vectorisées : les deux
+    # traitements donnent les mêmes calendriers et les mêmes nombres de chemins critiques
+    path = write_table(str(tmp_path / f"{shape}.txt"), shape, 600)
+    results = []
+    for scalar_level_edges in (-1, Main.SCALAR_LEVEL_EDGES, 10 ** 9):
+        monkeypatch.setattr(Main, "SCALAR_LEVEL_EDGES", scalar_level_edges)
+        analysis = analyze_file(path, cache_dir=None)
+        from_alpha, to_omega = analysis.critical_paths.count_paths()
+        results.append((analysis.early_schedule.tolist(), analysis.late_schedule.tolist(), from_alpha.tolist(),
+                        to_omega.tolist()))
+    assert results[0] == results[1] == results[2]
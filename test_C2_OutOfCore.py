@@ -0,0 +1,78 @@
+# Tests de l'ordonnancement hors mémoire centrale : les colonnes écrites sur disque doivent être
+# identiques à celles de l'analyse en mémoire, avec ou sans partitionnement des arcs.
+#
+# Usage :
+#   python -m pytest -q
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+from C2_Analysis import analyze_file
+from C2_Benchmark import GENERATORS, write_table
+from C2_Export import TASK_FIELDS, task_columns, task_ids
+from C2_OutOfCore import schedule_file
+
+# Budgets mémoire (octets) : tampons d'arcs tenant en mémoire, et tampons de quelques arcs
+# (arcs répartis en nombreuses partitions, niveaux lus par blocs)
+MEMORY_BUDGETS = (1 << 20, 1000)
+
+
+def write_messy_table(path, rng):
+    # Tableau à étiquettes clairsemées, dans le désordre, avec arcs en double, tâches redéfinies,
+    # circuits et prédécesseurs inconnus occasionnels
+    labels = rng.sample(range(1, 1000), rng.randint(1, 30))
+    lines = []
+    for j, task in enumerate(labels):
+        preds = []
+        for _ in range(rng.randint(0, 3) if j else 0):
+            preds.append(rng.choice(labels[:j] if rng.random() < 0.9 else labels))
+        if rng.random() < 0.03:
+            preds.append(5000)
+        lines.append(" ".join(map(str, [task, rng.randint(0, 9)] + preds)))
+        if rng.random() < 0.05:
+            lines.append(f"{task} {rng.randint(0, 9)}")
+    rng.shuffle(lines)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def assert_same_as_analysis(path, output_dir, work_dir, memory_budget):
+    analysis = analyze_file(path, cache_dir=None, max_paths=0)
+    result = schedule_file(path, str(output_dir), memory_budget=memory_budget, work_dir=str(work_dir))
+    assert os.listdir(work_dir) == []
+    if not analysis.is_valid():
+        assert result.errors == analysis.errors
+        return
+    assert result.warnings == analysis.warnings
+    assert (result.cycle is None) == (analysis.cycle is None)
+    if result.cycle is not None:
+        # Le circuit renvoyé est bien un circuit du graphe
+        nodes = [analysis.graph.labels.index(label) for label in result.cycle]
+        for source, target in zip(nodes, nodes[1:] + nodes[:1]):
+            assert target in analysis.graph.get_successors_of(source).tolist()
+        return
+    if not analysis.is_scheduling_graph():
+        return
+    columns, expected = result.columns(), task_columns(analysis, task_ids(analysis))
+    for field in TASK_FIELDS:
+        assert np.array_equal(np.asarray(columns[field]), np.asarray(expected[field])), field
+    assert result.project_duration == analysis.project_duration
+
+
+@pytest.mark.parametrize("memory_budget", MEMORY_BUDGETS)
+def test_generated_tables(tmp_path, memory_budget):
+    for shape in GENERATORS:
+        path = write_table(str(tmp_path / f"{shape}.txt"), shape, 500)
+        assert_same_as_analysis(path, tmp_path / shape, tmp_path / "travail", memory_budget)
+
+
+@pytest.mark.parametrize("memory_budget", MEMORY_BUDGETS)
+def test_messy_tables(tmp_path, memory_budget):
+    rng = random.Random(5)
+    for i in range(40):
+        path = write_messy_table(str(tmp_path / f"t{i}.txt"), rng)
+        assert_same_as_analysis(path, tmp_path / f"t{i}", tmp_path / "travail", memory_budget)
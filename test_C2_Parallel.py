@@ -0,0 +1,80 @@
+# Tests du calcul en parallèle : rangs, calendriers et marges calculés par sous-projet dans des
+# processus de travail doivent être identiques à ceux du calcul en série.
+#
+# Usage :
+#   python -m pytest -q
+
+import random
+
+import numpy as np
+import pytest
+
+import C2_Parallel as Parallel
+from C2_Analysis import analyze_file
+from C2_Benchmark import write_table
+
+# Résultats comparés entre calcul en série et calcul en parallèle
+FIELDS = ("ranks", "ids", "early_schedule", "late_schedule", "total_margin", "free_margin")
+
+
+def write_projects(path, count, size, seed):
+    # Tableau de count sous-projets indépendants d'au plus size tâches, numérotés à la suite
+    rng = random.Random(seed)
+    lines, base = [], 0
+    for _ in range(count):
+        n = rng.randint(1, size)
+        for task in range(1, n + 1):
+            preds = sorted({base + rng.randint(1, task - 1) for _ in range(rng.randint(0, 2))} if task > 1 else ())
+            lines.append(" ".join(map(str, [base + task, rng.randint(0, 20)] + preds)))
+        base += n
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def assert_same_as_serial(path):
+    expected = analyze_file(path, cache_dir=None, max_paths=50)
+    got = analyze_file(path, cache_dir=None, max_paths=50, workers=2)
+    for field in FIELDS:
+        assert np.array_equal(getattr(got, field), getattr(expected, field)), field
+    assert got.project_duration == expected.project_duration
+    assert list(got.critical_paths) == list(expected.critical_paths)
+
+
+@pytest.mark.parametrize("count", [1, 2, 15, 60])
+def test_independent_projects_match_serial(tmp_path, monkeypatch, count):
+    monkeypatch.setattr(Parallel, "PARALLEL_MIN_NODES", 0)
+    assert_same_as_serial(write_projects(str(tmp_path / "projets.txt"), count, 30, count))
+
+
+@pytest.mark.parametrize("shape", ["chain", "layers", "random", "tied"])
+def test_connected_graph_matches_serial(tmp_path, monkeypatch, shape):
+    monkeypatch.setattr(Parallel, "PARALLEL_MIN_NODES", 0)
+    assert_same_as_serial(write_table(str(tmp_path / f"{shape}.txt"), shape, 300))
+
+
+def test_components(tmp_path):
+    path = write_projects(str(tmp_path / "projets.txt"), 20, 10, 0)
+    graph = analyze_file(path, cache_dir=None).graph
+    labels, count = Parallel.get_components(graph)
+    assert labels[0] == labels[graph.omega_node_id] == -1
+
+    # Même partition des tâches que par fusion d'ensembles arc par arc
+    sources, targets = graph.get_edges()
+    parent = list(range(len(labels)))
+
+    def find(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        if source != 0 and target != graph.omega_node_id:
+            parent[find(source)] = find(target)
+    tasks = range(1, graph.omega_node_id)
+    components = {}
+    for task in tasks:
+        components.setdefault(find(task), set()).add(labels[task])
+    assert count == len(components)
+    assert all(len(component) == 1 for component in components.values())
+    assert sorted(labels[list(tasks)].tolist())[-1] == count - 1
@@ -0,0 +1,47 @@
+# Tests de non-régression de la lecture des tableaux de contraintes et de leur cache binaire.
+#
+# Usage :
+#   python -m pytest -q
+
+import os
+
+import numpy as np
+
+from C2_Analysis import analyze_file
+from C2_Parser import GRAPH_CACHE_SUBDIR, load_constraints_table
+
+
+def test_undefined_predecessor_is_reported_from_cache(tmp_path):
+    # Le prédécesseur 257 ne tient pas sur un octet, contrairement aux numéros de tâche : la deuxième
+    # lecture, depuis le cache, doit signaler la même erreur que la première
+    path = tmp_path / "table.txt"
+    path.write_text("1 3\n2 8 257\n")
+    cache_dir = tmp_path / "cache"
+    for _ in range(2):
+        analysis = analyze_file(str(path), cache_dir=str(cache_dir))
+        assert not analysis.is_valid()
+        assert analysis.errors == [(None, "La tâche 257 a des successeurs mais n'est pas définie")]
+
+
+def test_graph_index_is_reused_from_cache(tmp_path):
+    # Le graphe relu depuis le cache (index CSR, durées, étiquettes) donne la même analyse que le graphe construit
+    path = tmp_path / "table.txt"
+    path.write_text("1 3\n2 4 1\n2 5 1\n3 2 2\n4 6 1 3\n")
+    cache_dir = tmp_path / "cache"
+    first, second = (analyze_file(str(path), cache_dir=str(cache_dir)) for _ in range(2))
+    table = load_constraints_table(str(path), str(cache_dir))
+    assert os.path.isdir(os.path.join(table.cache_entry, GRAPH_CACHE_SUBDIR))
+    assert all(getattr(table, field).dtype == np.int64 for field in ("tasks", "durations", "pred_ids"))
+    assert second.warnings == first.warnings
+    assert second.project_duration == first.project_duration == 16
+    assert np.array_equal(second.total_margin, first.total_margin)
+
+
+def test_nineteen_digit_ids_up_to_int64_max(tmp_path):
+    # Les numéros de 19 chiffres sont acceptés jusqu'au plus grand entier sur 64 bits, pas au-delà
+    path = tmp_path / "table.txt"
+    path.write_text("9223372036854775807 3\n1234567890123456789 4 9223372036854775807\n9223372036854775808 1\n")
+    table = load_constraints_table(str(path), cache_dir=None)
+    assert table.tasks.tolist() == [9223372036854775807, 1234567890123456789]
+    assert table.pred_ids.tolist() == [9223372036854775807]
+    assert table.errors == [(3, "9223372036854775808 1")]
@@ -0,0 +1,63 @@
+# Tests du portefeuille de projets : chaque analyse découpée du graphe commun doit être identique
+# à l'analyse séparée du même tableau (C2_Analysis.analyze_file).
+#
+# Usage :
+#   python -m pytest -q
+
+import glob
+import os
+import random
+
+import numpy as np
+
+from C2_Analysis import analyze_file
+from C2_Benchmark import GENERATORS, write_table
+from C2_Graph import Graph
+from C2_Portfolio import Portfolio, analyze_files
+
+# Tableaux de contraintes livrés avec le projet (circuits, durées négatives, ...)
+TABLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "C2_Tables", "*.txt")))
+
+
+def assert_same_analysis(got, expected):
+    assert got.name == expected.name
+    assert got.errors == expected.errors and got.warnings == expected.warnings
+    if expected.graph is None:
+        assert got.graph is None
+        return
+    assert np.array_equal(got.order, expected.order)
+    assert np.array_equal(got.level_offsets, expected.level_offsets)
+    assert (got.cycle is None and expected.cycle is None) or list(got.cycle) == list(expected.cycle)
+    assert got.negative_durations == expected.negative_durations
+    assert got.source_successors == expected.source_successors
+    for field in ("ranks", "ids", "early_schedule", "late_schedule", "total_margin", "free_margin"):
+        got_values, expected_values = getattr(got, field), getattr(expected, field)
+        assert (got_values is None and expected_values is None) or np.array_equal(got_values, expected_values)
+    assert got.project_duration == expected.project_duration
+    if expected.critical_paths is not None:
+        assert got.critical_paths.total_count() == expected.critical_paths.total_count()
+        assert list(got.critical_paths) == list(expected.critical_paths)
+
+
+def test_portfolio_matches_separate_analyses(tmp_path):
+    rng = random.Random(1)
+    paths = []
+    for i in range(100):
+        path = str(tmp_path / f"t{i}.txt")
+        paths.append(write_table(path, rng.choice(list(GENERATORS)), rng.randint(1, 40), i))
+    (tmp_path / "invalide.txt").write_text("1 3\n2 x\n")
+    paths += TABLES + [str(tmp_path / "invalide.txt")]
+    rng.shuffle(paths)
+
+    expected = [analyze_file(path, cache_dir=None, max_paths=100) for path in paths]
+    got = analyze_files(paths, cache_dir=None, max_paths=100)
+    assert len(got) == len(expected)
+    for got_analysis, expected_analysis in zip(got, expected):
+        assert_same_analysis(got_analysis, expected_analysis)
+
+
+def test_empty_portfolio():
+    assert Portfolio([]).analyze() == []
+    graph = Graph.from_arrays("seul", [1, 2], [3, 4], [1], [2])
+    (analysis,) = Portfolio([graph]).analyze()
+    assert analysis.project_duration == 7
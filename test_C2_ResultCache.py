@@ -0,0 +1,95 @@
+# Tests du cache des résultats d'analyse : succès et échecs, empreinte indépendante de l'ordre
+# des lignes, invalidation par modification du graphe, éviction LRU et relecture sur disque.
+#
+# Usage :
+#   python -m pytest -q
+
+import os
+import random
+
+import numpy as np
+
+from C2_Analysis import analyze_file
+from C2_Batch import get_result
+from C2_Benchmark import GENERATORS, write_table
+from C2_ResultCache import CachedResult, ResultCache
+
+
+def same_result(analysis, expected, path):
+    # Résultats sérialisés identiques (au nom du tableau près)
+    result, expected_result = get_result(analysis, path), get_result(expected, path)
+    result["table"] = expected_result["table"]
+    return result == expected_result
+
+
+def write_lines(path, lines):
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def entry(nbytes):
+    # Entrée de cache de nbytes octets
+    return CachedResult({"order": np.zeros(nbytes, dtype=np.uint8)}, 0, 1)
+
+
+def test_hits_and_misses(tmp_path):
+    cache = ResultCache()
+    for shape in GENERATORS:
+        path = write_table(str(tmp_path / f"{shape}.txt"), shape, 200)
+        expected = analyze_file(path, cache_dir=None)
+        for _ in range(2):
+            assert same_result(analyze_file(path, cache_dir=None, result_cache=cache), expected, path)
+
+        # Même tableau, lignes mélangées, sous un autre nom : même empreinte
+        lines = open(path).read().splitlines()
+        random.Random(1).shuffle(lines)
+        shuffled = write_lines(str(tmp_path / "melange.txt"), lines)
+        assert same_result(analyze_file(shuffled, cache_dir=None, result_cache=cache), expected, path)
+    assert (cache.misses, cache.hits) == (len(GENERATORS), 2 * len(GENERATORS))
+    assert len(cache) == len(GENERATORS)
+
+
+def test_modified_graph_is_a_miss(tmp_path):
+    cache = ResultCache()
+    original = write_lines(str(tmp_path / "a.txt"), ["1 3", "2 4 1", "3 5 1", "4 2 2 3"])
+    duration = write_lines(str(tmp_path / "b.txt"), ["1 3", "2 4 1", "3 6 1", "4 2 2 3"])
+    edge = write_lines(str(tmp_path / "c.txt"), ["1 3", "2 4 1", "3 5 2", "4 2 2 3"])
+    for path in (original, duration, edge):
+        analysis = analyze_file(path, cache_dir=None, result_cache=cache)
+        assert same_result(analysis, analyze_file(path, cache_dir=None), path)
+    assert (cache.misses, cache.hits) == (3, 0)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResultCache(max_bytes=300)
+    for digest in "abc":
+        cache.put(digest, entry(100))
+    assert cache.get("a") is not None
+    cache.put("d", entry(100))
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.get("b") is None
+    assert (cache.nbytes, cache.evictions) == (300, 1)
+
+    # Une entrée plus grande que le cache n'est pas gardée, et remplace l'ancienne entrée de même empreinte
+    cache.put("a", entry(400))
+    assert list(cache.entries) == ["c", "d"] and cache.nbytes == 200
+
+
+def test_entries_are_reloaded_from_disk(tmp_path):
+    directory = str(tmp_path / "resultats")
+    path = write_table(str(tmp_path / "layers.txt"), "layers", 300)
+    expected = analyze_file(path, cache_dir=None)
+    analyze_file(path, cache_dir=None, result_cache=ResultCache(directory=directory))
+
+    cache = ResultCache(max_bytes=0, directory=directory)
+    for _ in range(2):
+        assert same_result(analyze_file(path, cache_dir=None, result_cache=cache), expected, path)
+    assert (cache.disk_hits, cache.hits, len(cache)) == (2, 2, 0)
+
+    # Une entrée illisible est un échec, et l'analyse est refaite
+    (digest,) = os.listdir(directory)
+    os.remove(os.path.join(directory, digest, "meta.json"))
+    cache = ResultCache(directory=directory)
+    assert same_result(analyze_file(path, cache_dir=None, result_cache=cache), expected, path)
+    assert (cache.disk_hits, cache.misses) == (0, 1)
@@ -0,0 +1,114 @@
+# Tests du serveur d'analyse : réponses identiques au mode batch, requêtes par colonnes et requêtes
+# invalides, aller-retour sur une socket Unix (pipelining, ordre des réponses, limite des analyses).
+#
+# Usage :
+#   python -m pytest -q
+
+import asyncio
+import json
+
+import pytest
+
+import C2_Server as Server
+from C2_Analysis import analyze_file
+from C2_Batch import get_result
+from C2_Benchmark import GENERATORS, write_table
+
+# Petit tableau analysé par la boucle d'événements (voir C2_Server.is_inline)
+SMALL_TABLE = "1 3\n2 2 1\n3 4 1 2\n"
+
+
+def expected_response(path, name):
+    # Réponse attendue pour un tableau : résultat du mode batch, sans le chemin du fichier
+    result = get_result(analyze_file(path, cache_dir=None), path)
+    del result["path"]
+    result["table"] = name
+    return result
+
+
+def answer(request):
+    response = json.loads(Server.answer(json.dumps(request).encode()))
+    assert response.pop("seconds") >= 0
+    return response
+
+
+def test_answer(tmp_path):
+    path = write_table(str(tmp_path / "layers.txt"), "layers", 300)
+    response = answer({"id": 1, "name": "projet", "table": open(path).read()})
+    assert response.pop("id") == 1
+    assert response == expected_response(path, "projet")
+
+    response = answer({"id": "a", "tasks": [1, 2, 3], "durations": [3, 2, 4], "predecessors": [[], [1], [1, 2]],
+                       "max_paths": 5})
+    assert response["status"] == "ok" and response["project_duration"] == 9
+    assert response["critical_paths"] == [[1, 2, 3]] and not response["critical_paths_truncated"]
+
+
+@pytest.mark.parametrize("request_line", [
+    b"{pas du json", b"[1, 2]", json.dumps({"table": "1 3", "max_paths": -1}).encode(),
+    json.dumps({"tasks": [1, 2], "durations": [3]}).encode(),
+    json.dumps({"tasks": [1, 2], "durations": [3, 2.5]}).encode(),
+    json.dumps({"tasks": [2 ** 64], "durations": [3]}).encode(),
+    json.dumps({"tasks": [1], "durations": [[3]]}).encode(),
+])
+def test_invalid_requests_get_an_error(request_line):
+    response = json.loads(Server.answer(request_line))
+    assert response["status"] == "error" and response["message"]
+
+
+def test_invalid_tables_are_reported():
+    response = answer({"id": 2, "tasks": [1, 2], "durations": [3, 200]})
+    assert response["status"] == "invalid" and response["errors"] == [{"line": 2, "text": "2 200"}]
+    response = answer({"id": 3, "tasks": [1, 2], "durations": [3, 2], "predecessors": [[2], [1]]})
+    assert response["status"] == "cyclic" and response["cycle"]
+
+
+def test_round_trip(tmp_path):
+    paths = [write_table(str(tmp_path / f"{shape}.txt"), shape, 2000) for shape in GENERATORS]
+    requests = [{"id": i, "name": shape, "table": open(path).read()}
+                for i, (shape, path) in enumerate(zip(GENERATORS, paths))]
+    requests += [{"id": f"petit{i}", "table": SMALL_TABLE} for i in range(20)] + requests
+    socket = str(tmp_path / "C2.sock")
+
+    async def run():
+        server = Server.Server(workers=1, max_pipelined=4)
+        await server.start(socket)
+        try:
+            # Deux clients en même temps, chacun envoyant ses requêtes sans attendre les réponses
+            return await asyncio.gather(Server.send_requests(requests, path=socket),
+                                        Server.send_requests(requests[::-1], path=socket))
+        finally:
+            await server.close()
+
+    responses, reversed_responses = asyncio.run(run())
+    assert [response["id"] for response in responses] == [request["id"] for request in requests]
+    assert [response["id"] for response in reversed_responses[::-1]] == [request["id"] for request in requests]
+    expected = [expected_response(path, shape) for shape, path in zip(GENERATORS, paths)]
+    for response in responses + reversed_responses:
+        del response["seconds"]
+        request_id = response.pop("id")
+        if isinstance(request_id, int):
+            assert response == expected[request_id]
+        else:
+            assert response["status"] == "ok" and response["project_duration"] == 9
+
+
+def test_small_requests_wait_for_the_limit(tmp_path):
+    socket = str(tmp_path / "C2.sock")
+
+    async def run():
+        server = Server.Server(workers=1, max_concurrent=1)
+        await server.start(socket)
+        try:
+            # Toutes les analyses autorisées sont en cours : une petite requête attend aussi son tour
+            async with server.limit:
+                client = asyncio.ensure_future(Server.send_requests([{"id": 1, "table": SMALL_TABLE}], path=socket))
+                done, _ = await asyncio.wait([client], timeout=0.5)
+                assert not done
+            (response,) = await asyncio.wait_for(client, 10)
+            return response
+        finally:
+            await server.close()
+
+    response = asyncio.run(run())
+    assert response["id"] == 1 and response["project_duration"] == 9
@@ -0,0 +1,83 @@
+# Tests de la session « et si » : chaque modification incrémentale doit donner les mêmes
+# calendriers, marges et tâches critiques qu'une nouvelle analyse complète du graphe modifié.
+#
+# Usage :
+#   python -m pytest -q
+
+import random
+
+import pytest
+
+from C2_Analysis import analyze_graph
+from C2_Graph import Graph
+from C2_Session import Session
+
+
+def full_analysis(durations, edges):
+    # Analyse complète du graphe de tâches 1..n (n = len(durations)) et d'arcs edges
+    graph = Graph.from_arrays("session", list(range(1, len(durations) + 1)), durations,
+                              [u for u, _ in edges], [v for _, v in edges])
+    return analyze_graph(graph)
+
+
+def random_project(rng, n):
+    durations = [rng.randint(0, 9) for _ in range(n)]
+    edges = {(rng.randint(1, v - 1), v) for v in range(2, n + 1) for _ in range(rng.randint(0, 3))}
+    return durations, edges
+
+
+def assert_same_as_full_analysis(session, durations, edges):
+    analysis = full_analysis(durations, sorted(edges))
+    early, late = session.schedules()
+    assert early == analysis.early_schedule.tolist()
+    assert late == analysis.late_schedule.tolist()
+    assert session.project_duration() == analysis.project_duration
+    critical = [node for node in analysis.graph.node_ids if analysis.total_margin[node] == 0]
+    assert session.critical_tasks() == [analysis.graph.labels[node] for node in critical]
+    for task in range(1, len(durations) + 1):
+        assert session.total_margin(task) == analysis.total_margin[task]
+        assert session.free_margin(task) == analysis.free_margin[task]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_edits_match_full_analysis(seed):
+    rng = random.Random(seed)
+    for _ in range(10):
+        n = rng.randint(2, 25)
+        durations, edges = random_project(rng, n)
+        session = Session(full_analysis(durations, sorted(edges)))
+        for _ in range(20):
+            operation = rng.random()
+            if operation < 0.4:
+                task, duration = rng.randint(1, n), rng.randint(0, 9)
+                session.set_duration(task, duration)
+                durations[task - 1] = duration
+            elif operation < 0.75:
+                u, v = rng.randint(1, n), rng.randint(1, n)
+                try:
+                    session.add_edge(u, v)
+                except ValueError:
+                    # Arc existant ou circuit : la session n'a pas été modifiée
+                    assert_same_as_full_analysis(session, durations, edges)
+                    continue
+                edges.add((u, v))
+            elif edges:
+                u, v = rng.choice(sorted(edges))
+                session.remove_edge(u, v)
+                edges.discard((u, v))
+            assert_same_as_full_analysis(session, durations, edges)
+
+
+def test_invalid_edits_are_rejected():
+    session = Session(full_analysis([3, 4, 5], [(1, 2), (2, 3)]))
+    with pytest.raises(ValueError):
+        session.add_edge(3, 1)
+    with pytest.raises(ValueError):
+        session.add_edge(1, 2)
+    with pytest.raises(ValueError):
+        session.remove_edge(1, 3)
+    with pytest.raises(ValueError):
+        session.set_duration(2, -1)
+    with pytest.raises(ValueError):
+        session.set_duration(9, 1)
+    assert session.project_duration() == 12
@@ -0,0 +1,67 @@
+# Tests de la simulation Monte-Carlo : durées fixes, reproductibilité et découpage en blocs.
+#
+# Usage :
+#   python -m pytest -q
+
+import numpy as np
+import pytest
+
+from C2_Analysis import analyze_file
+from C2_Benchmark import write_table
+from C2_Simulation import simulate, three_point_sampler
+
+
+def fixed_sampler(durations):
+    # Tirage sans aléa : chaque scénario garde les durées du tableau
+    return lambda rng, count: np.repeat(durations[:, None].astype(np.float64), count, axis=1)
+
+
+def matrix_sampler(matrix):
+    # Tirage des colonnes successives d'une matrice nœuds × scénarios, quel que soit le découpage en blocs
+    state = {"next": 0}
+
+    def sampler(rng, count):
+        start = state["next"]
+        state["next"] += count
+        return matrix[:, start:start + count]
+
+    return sampler
+
+
+@pytest.mark.parametrize("shape", ["chain", "layers", "random", "tied"])
+def test_fixed_durations_give_the_analysis(tmp_path, shape):
+    path = write_table(str(tmp_path / f"{shape}.txt"), shape, 300)
+    analysis = analyze_file(path, cache_dir=None)
+    result = simulate(analysis, fixed_sampler(analysis.graph.get_durations()), scenarios=7)
+    assert result.scenarios == 7
+    assert np.all(result.completion_times == analysis.project_duration)
+    critical = (analysis.total_margin == 0).astype(np.float64)
+    assert np.array_equal(result.criticality, critical)
+
+
+def test_same_seed_same_result(tmp_path):
+    analysis = analyze_file(write_table(str(tmp_path / "random.txt"), "random", 200), cache_dir=None)
+    first, second = (simulate(analysis, scenarios=500, seed=3) for _ in range(2))
+    assert np.array_equal(first.completion_times, second.completion_times)
+    assert np.array_equal(first.criticality, second.criticality)
+    quantiles = list(first.quantiles().values())
+    assert quantiles == sorted(quantiles)
+    assert all(0 <= value <= 1 for _, value in first.most_critical())
+
+
+def test_chunks_do_not_change_the_result(tmp_path):
+    analysis = analyze_file(write_table(str(tmp_path / "layers.txt"), "layers", 200), cache_dir=None)
+    n = analysis.graph.get_number_of_nodes()
+    matrix = np.random.default_rng(0).uniform(0, 10, (n, 300))
+    matrix[0] = matrix[-1] = 0
+    whole = simulate(analysis, matrix_sampler(matrix), scenarios=300)
+    chunked = simulate(analysis, matrix_sampler(matrix), scenarios=300, chunk_bytes=8 * n * 7)
+    assert np.array_equal(whole.completion_times, chunked.completion_times)
+    assert np.array_equal(whole.criticality, chunked.criticality)
+
+
+def test_invalid_estimates_are_rejected():
+    with pytest.raises(ValueError):
+        three_point_sampler([2], [1], [3])
+    with pytest.raises(ValueError):
+        three_point_sampler([1], [2], [3], distribution="normale")